@@ -4,6 +4,7 @@ Arquitetura modular com funcionalidades REAIS implementadas
 """
 import streamlit as st
 import os
+import importlib
 from dotenv import load_dotenv
 
 # Importa sistema de autenticação
@@ -11,14 +12,21 @@ from auth.login import check_authentication
 
 # Importa componentes modulares
 from components.layout import setup_page_config, render_sidebar_navigation
-from modules.home import render_home_page, render_reels_tiktok_page
-from modules.react_real import render_react_page
-from modules.cerebro import show_cerebro_page
-from modules.dashboard import render_dashboard_page  # Nova página principal
-from modules.stalker import render_stalker_page
-from modules.raiox import render_raiox_page
 from utils.helpers import carregar_perfil, carregar_historico
 
+# Registro de páginas: nome -> (módulo, função de renderização)
+# Cada módulo só é importado na primeira vez em que a página é aberta, para que
+# whisper/torch, yt-dlp, selenium, bs4 e anthropic não atrasem o login e o Dashboard
+PAGINAS = {
+    "Dashboard": ("modules.dashboard", "render_dashboard_page"),  # Página principal
+    "Cérebro": ("modules.cerebro", "show_cerebro_page"),
+    "Reels e TikTok": ("modules.home", "render_reels_tiktok_page"),
+    "React": ("modules.react_real", "render_react_page"),
+    "Stalker": ("modules.stalker", "render_stalker_page"),
+    "Raio-X": ("modules.raiox", "render_raiox_page"),
+    "Histórico": ("modules.historico", "render_historico_page"),
+}
+
 st.markdown("""
 <style>
 
@@ -148,6 +156,14 @@ def initialize_session_state():
     api_key = os.getenv("ANTHROPIC_API_KEY")
     st.session_state["api_status"] = bool(api_key)
 
+def renderizar_pagina(nome):
+    """Importa (na primeira vez) o módulo da página e a renderiza"""
+    if nome not in PAGINAS:
+        return
+    
+    modulo, funcao = PAGINAS[nome]
+    getattr(importlib.import_module(modulo), funcao)()
+
 # Interface principal
 def main():
     """Função principal do aplicativo"""
@@ -162,21 +178,7 @@ def main():
     pagina_selecionada = render_sidebar_navigation()
     
     # Roteamento das páginas
-    if pagina_selecionada == "Dashboard":  # Página principal
-        render_dashboard_page()
-    elif pagina_selecionada == "Cérebro":
-        show_cerebro_page()
-    elif pagina_selecionada == "Reels e TikTok":
-        render_reels_tiktok_page()
-    elif pagina_selecionada == "React":
-        render_react_page()
-    elif pagina_selecionada == "Stalker":
-        render_stalker_page()
-    elif pagina_selecionada == "Raio-X":
-        render_raiox_page()
-    elif pagina_selecionada == "Histórico":
-        from modules.historico import render_historico_page
-        render_historico_page()
+    renderizar_pagina(pagina_selecionada)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+"""
+Benchmark da extração de HTML do web crawler
+Compara, sobre um corpus de páginas salvas, o caminho de referência
+(BeautifulSoup + html.parser) com o modo rápido (lxml, passada única)
+e aponta páginas em que os dois resultados divergem
+
+Uso:
+    python benchmark_extracao.py --baixar URL [URL ...]   # salva páginas no corpus
+    python benchmark_extracao.py                          # mede sobre o corpus salvo
+    python benchmark_extracao.py --sintetico 50           # corpus gerado (sem rede)
+    python benchmark_extracao.py --salvar                 # registra em data/benchmarks/extracao.jsonl
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime
+from urllib.parse import urlparse
+
+from utils.html_extracao import extrair_pagina, extrair_pagina_rapida, extracao_rapida_disponivel
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+DIRETORIO_CORPUS = os.path.join(RAIZ, "data", "benchmarks", "paginas")
+ARQUIVO_RESULTADOS = os.path.join(RAIZ, "data", "benchmarks", "extracao.jsonl")
+
+# URL de origem de cada página salva (para resolver links relativos)
+ARQUIVO_INDICE = "indice.json"
+
+
+def baixar_corpus(urls, diretorio):
+    """Baixa as páginas e as salva no corpus"""
+    import requests
+
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_indice = os.path.join(diretorio, ARQUIVO_INDICE)
+    indice = _ler_indice(diretorio)
+
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=15, headers={'User-Agent': 'Mozilla/5.0'})
+            response.raise_for_status()
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            continue
+
+        nome = f"{len(indice) + 1:03d}_{urlparse(url).netloc.replace(':', '_')}.html"
+        with open(os.path.join(diretorio, nome), "wb") as f:
+            f.write(response.content)
+        indice[nome] = url
+        print(f"✅ {url} → {nome} ({len(response.content) / 1024:.0f} KB)")
+
+    with open(caminho_indice, "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+
+
+def _ler_indice(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_INDICE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def carregar_corpus(diretorio):
+    """Lista de (url, bytes) das páginas salvas"""
+    indice = _ler_indice(diretorio)
+    paginas = []
+    for nome in sorted(os.listdir(diretorio)) if os.path.isdir(diretorio) else []:
+        if nome.endswith((".html", ".htm")):
+            with open(os.path.join(diretorio, nome), "rb") as f:
+                paginas.append((indice.get(nome, f"https://exemplo.com.br/{nome}"), f.read()))
+    return paginas
+
+
+def gerar_corpus_sintetico(quantidade, semente=42):
+    """Páginas no formato típico de blog/notícia (cabeçalho, menu, artigo, rodapé)"""
+    aleatorio = random.Random(semente)
+    palavras = ("direito trabalhista consumidor contrato empresa prazo processo audiência "
+                "advogado cliente indenização aposentadoria imóvel herança divórcio").split()
+
+    def frase(n):
+        return " ".join(aleatorio.choice(palavras) for _ in range(n))
+
+    paginas = []
+    for i in range(quantidade):
+        menu = "".join(f"<li><a href='/secao/{j}'>Seção {frase(2)}</a></li>" for j in range(40))
+        paragrafos = "".join(
+            f"<p>{frase(60)} <a href='/artigo/{i}-{j}'>{frase(4)}</a> {frase(30)}</p>"
+            f"<img src='/img/{i}-{j}.jpg' alt='{frase(3)}'>"
+            for j in range(aleatorio.randint(20, 60))
+        )
+        relacionados = "".join(f"<div class='card'><a href='https://outro.com/{j}'>{frase(5)}</a>"
+                               f"<img src='/thumb/{j}.jpg'></div>" for j in range(30))
+        html = (
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{frase(6)}</title>"
+            f"<style>{'.x{color:red}' * 200}</style><script>{'var a=1;' * 500}</script></head>"
+            f"<body><header><a href='/'>Início do portal</a><nav><ul>{menu}</ul></nav></header>"
+            f"<main><article class='post'><h1>{frase(8)}</h1>{paragrafos}"
+            f"<iframe src='https://www.youtube.com/embed/vid{i}?rel=0' title='{frase(3)}'></iframe>"
+            f"</article><aside>{relacionados}</aside></main>"
+            f"<footer>{frase(50)}<a href='/contato'>Fale conosco agora</a></footer></body></html>"
+        )
+        paginas.append((f"https://exemplo.com.br/artigo/{i}", html.encode("utf-8")))
+    return paginas
+
+
+def medir(funcao, paginas, repeticoes):
+    """Mediana (ms) do tempo para extrair todas as páginas do corpus"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for url, conteudo in paginas:
+            funcao(url, conteudo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 1)
+
+
+def divergencias(paginas):
+    """URLs em que os dois caminhos produzem resultados diferentes"""
+    return [url for url, conteudo in paginas
+            if extrair_pagina(url, conteudo) != extrair_pagina_rapida(url, conteudo)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extração de HTML: BeautifulSoup x lxml em passada única")
+    parser.add_argument("--corpus", default=DIRETORIO_CORPUS, help=f"Diretório das páginas (padrão: {DIRETORIO_CORPUS})")
+    parser.add_argument("--baixar", nargs="+", metavar="URL", help="Baixa as páginas para o corpus e sai")
+    parser.add_argument("--sintetico", type=int, metavar="N", help="Usa N páginas geradas em vez do corpus")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Passadas pelo corpus por modo (padrão: 5)")
+    parser.add_argument("--salvar", action="store_true", help=f"Acrescenta o resultado em {ARQUIVO_RESULTADOS}")
+    args = parser.parse_args()
+
+    if args.baixar:
+        baixar_corpus(args.baixar, args.corpus)
+        return 0
+
+    if not extracao_rapida_disponivel():
+        print("❌ lxml não instalado: o modo rápido não está disponível (pip install lxml)")
+        return 1
+
+    paginas = gerar_corpus_sintetico(args.sintetico) if args.sintetico else carregar_corpus(args.corpus)
+    if not paginas:
+        print(f"Corpus vazio em {args.corpus}: use --baixar URL ... ou --sintetico N")
+        return 1
+
+    tamanho_kb = sum(len(conteudo) for _, conteudo in paginas) / 1024
+    print(f"Corpus: {len(paginas)} páginas ({tamanho_kb:.0f} KB)")
+
+    repeticoes = max(1, args.repeticoes)
+    referencia_ms = medir(extrair_pagina, paginas, repeticoes)
+    rapido_ms = medir(extrair_pagina_rapida, paginas, repeticoes)
+    diferentes = divergencias(paginas)
+
+    print(f"{'BeautifulSoup':<14} {referencia_ms:>9.1f} ms  ({referencia_ms / len(paginas):.2f} ms/página)")
+    print(f"{'lxml (rápido)':<14} {rapido_ms:>9.1f} ms  ({rapido_ms / len(paginas):.2f} ms/página)")
+    print(f"Aceleração: {referencia_ms / rapido_ms:.1f}x")
+    if diferentes:
+        print(f"⚠️ {len(diferentes)} página(s) com resultado diferente: " + ", ".join(diferentes[:5]))
+
+    if args.salvar:
+        os.makedirs(os.path.dirname(ARQUIVO_RESULTADOS), exist_ok=True)
+        registro = {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "corpus": "sintetico" if args.sintetico else args.corpus,
+            "paginas": len(paginas),
+            "repeticoes": repeticoes,
+            "referencia_ms": referencia_ms,
+            "rapido_ms": rapido_ms,
+            "divergencias": len(diferentes)
+        }
+        with open(ARQUIVO_RESULTADOS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        print(f"Resultado registrado em {ARQUIVO_RESULTADOS}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
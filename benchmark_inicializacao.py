@@ -0,0 +1,129 @@
+"""
+Benchmark de inicialização a frio
+Mede, em processos Python novos, o tempo de importação do que cada tela
+precisa (login, Dashboard e demais páginas) e aponta quais dependências
+pesadas foram carregadas junto
+
+Uso:
+    python benchmark_inicializacao.py                # login e Dashboard
+    python benchmark_inicializacao.py --todas        # todas as páginas
+    python benchmark_inicializacao.py --salvar       # registra em data/benchmarks/inicializacao.jsonl
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+ARQUIVO_RESULTADOS = os.path.join(RAIZ, "data", "benchmarks", "inicializacao.jsonl")
+
+# Módulos carregados antes de qualquer página (app.py até o login)
+BASE_LOGIN = ["auth.login", "components.layout", "utils.helpers"]
+
+CENARIOS = {
+    "login": BASE_LOGIN,
+    "dashboard": BASE_LOGIN + ["modules.dashboard"],
+}
+
+PAGINAS = {
+    "cerebro": BASE_LOGIN + ["modules.cerebro"],
+    "reels_tiktok": BASE_LOGIN + ["modules.home"],
+    "react": BASE_LOGIN + ["modules.react_real"],
+    "stalker": BASE_LOGIN + ["modules.stalker"],
+    "raiox": BASE_LOGIN + ["modules.raiox"],
+    "historico": BASE_LOGIN + ["modules.historico"],
+}
+
+# Dependências que não deveriam aparecer no login nem no Dashboard
+DEPENDENCIAS_PESADAS = ["torch", "whisper", "yt_dlp", "selenium", "webdriver_manager", "bs4", "anthropic"]
+
+CODIGO_MEDICAO = """
+import sys, json, time, importlib
+inicio = time.perf_counter()
+for modulo in {modulos!r}:
+    importlib.import_module(modulo)
+duracao = time.perf_counter() - inicio
+pesadas = [nome for nome in {pesadas!r} if nome in sys.modules]
+print(json.dumps({{"segundos": duracao, "pesadas": pesadas}}))
+"""
+
+
+def medir(modulos, repeticoes):
+    """
+    Importa `modulos` em `repeticoes` processos novos
+
+    Returns:
+        Dict com mediana/mínimo em ms e dependências pesadas carregadas
+        (ou a mensagem de erro, se a importação falhar)
+    """
+    codigo = CODIGO_MEDICAO.format(modulos=modulos, pesadas=DEPENDENCIAS_PESADAS)
+    tempos = []
+    pesadas = []
+
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=RAIZ, capture_output=True, text=True
+        )
+        if processo.returncode != 0:
+            linhas = processo.stderr.strip().splitlines()
+            return {"erro": linhas[-1] if linhas else f"código {processo.returncode}"}
+
+        resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        tempos.append(resultado["segundos"] * 1000)
+        pesadas = resultado["pesadas"]
+
+    return {
+        "mediana_ms": round(statistics.median(tempos), 1),
+        "minimo_ms": round(min(tempos), 1),
+        "pesadas": pesadas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização a frio por página")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Processos por cenário (padrão: 5)")
+    parser.add_argument("--todas", action="store_true", help="Mede também as demais páginas")
+    parser.add_argument("--salvar", action="store_true", help=f"Acrescenta o resultado em {ARQUIVO_RESULTADOS}")
+    args = parser.parse_args()
+
+    cenarios = dict(CENARIOS)
+    if args.todas:
+        cenarios.update(PAGINAS)
+
+    resultados = {}
+    for nome, modulos in cenarios.items():
+        resultado = medir(modulos, max(1, args.repeticoes))
+        resultados[nome] = resultado
+
+        if "erro" in resultado:
+            print(f"{nome:<14} ❌ {resultado['erro']}")
+            continue
+
+        pesadas = ", ".join(resultado["pesadas"]) or "nenhuma"
+        print(f"{nome:<14} {resultado['mediana_ms']:>8.1f} ms (mín. {resultado['minimo_ms']:.1f})"
+              f"  | pesadas: {pesadas}")
+
+    if args.salvar:
+        os.makedirs(os.path.dirname(ARQUIVO_RESULTADOS), exist_ok=True)
+        registro = {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "repeticoes": args.repeticoes,
+            "resultados": resultados
+        }
+        with open(ARQUIVO_RESULTADOS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        print(f"Resultado registrado em {ARQUIVO_RESULTADOS}")
+
+    # Falha se login/Dashboard não importarem ou voltarem a carregar dependências pesadas
+    regressao = any("erro" in resultados[nome] or resultados[nome]["pesadas"] for nome in CENARIOS)
+    return 1 if regressao else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
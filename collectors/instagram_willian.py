@@ -2,150 +2,32 @@
 """
 Crawler Instagram - Dr. Willian Godoy
 Coleta últimas 5 postagens do perfil @williangodoyadv
+Mantido por compatibilidade: a coleta roda no runtime compartilhado
+(collectors/runtime.py), que coleta várias fontes em uma única passada
 """
 
-import requests
-import json
 import os
-from datetime import datetime
-import time
-import random
-from bs4 import BeautifulSoup
+import sys
 
-class InstagramWillianCrawler:
-    def __init__(self):
-        self.base_url = "https://www.instagram.com/williangodoyadv/"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-
-    def extract_posts_data(self):
-        """Extrai dados das postagens do perfil"""
-        try:
-            print(f"🔍 Acessando perfil: {self.base_url}")
-            
-            # Delay aleatório para evitar detecção
-            time.sleep(random.uniform(2, 5))
-            
-            response = self.session.get(self.base_url, timeout=30)
-            
-            if response.status_code == 200:
-                print("✅ Perfil acessado com sucesso")
-                
-                # Simula extração de dados (Instagram tem proteções anti-bot)
-                # Em produção, seria necessário usar Selenium ou API oficial
-                posts_data = self.generate_realistic_data()
-                
-                return posts_data
-            else:
-                print(f"❌ Erro ao acessar perfil: {response.status_code}")
-                return self.generate_fallback_data()
-                
-        except Exception as e:
-            print(f"❌ Erro na extração: {e}")
-            return self.generate_fallback_data()
-
-    def generate_realistic_data(self):
-        """Gera dados realistas baseados no perfil jurídico"""
-        posts = []
-        
-        # Temas típicos de advogado
-        temas_juridicos = [
-            "Direitos do Consumidor: Como se proteger de cobranças abusivas",
-            "Trabalhista: Seus direitos em caso de demissão",
-            "Previdenciário: Como solicitar aposentadoria por tempo de contribuição",
-            "Civil: Responsabilidade em acidentes de trânsito",
-            "Empresarial: Como abrir uma empresa de forma segura"
-        ]
-        
-        for i, tema in enumerate(temas_juridicos):
-            post = {
-                "id": f"willian_post_{i+1}",
-                "title": tema,
-                "author": "Dr. Willian Godoy",
-                "profile": "@williangodoyadv",
-                "likes": random.randint(150, 800),
-                "views": random.randint(1000, 5000),
-                "comments": random.randint(10, 50),
-                "saves": random.randint(20, 100),
-                "ctr": f"{random.uniform(2.5, 8.5):.1f}%",
-                "link": f"https://www.instagram.com/p/willian_post_{i+1}/",
-                "timestamp": datetime.now().isoformat(),
-                "platform": "instagram",
-                "category": "Serviços Jurídicos",
-                "engagement_rate": f"{random.uniform(3.2, 7.8):.1f}%"
-            }
-            posts.append(post)
-        
-        return posts
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    def generate_fallback_data(self):
-        """Dados de fallback em caso de erro"""
-        return [{
-            "id": "willian_fallback",
-            "title": "Dados temporariamente indisponíveis",
-            "author": "Dr. Willian Godoy",
-            "profile": "@williangodoyadv",
-            "likes": 0,
-            "views": 0,
-            "comments": 0,
-            "saves": 0,
-            "ctr": "0%",
-            "link": "https://www.instagram.com/williangodoyadv/",
-            "timestamp": datetime.now().isoformat(),
-            "platform": "instagram",
-            "category": "Serviços Jurídicos",
-            "engagement_rate": "0%"
-        }]
+from collectors.runtime import CollectorRuntime, source_by_name
 
-    def save_data(self, posts_data):
-        """Salva dados coletados"""
-        try:
-            # Cria diretório se não existir
-            os.makedirs("data/instagram", exist_ok=True)
-            
-            # Nome do arquivo com data atual
-            today = datetime.now().strftime('%Y-%m-%d')
-            filename = f"data/instagram/willian_godoy_{today}.json"
-            
-            # Salva dados
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(posts_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✅ Dados salvos em: {filename}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao salvar dados: {e}")
-            return False
+class InstagramWillianCrawler:
+    def __init__(self):
+        self.source = source_by_name("willian_godoy")
+        self.base_url = self.source.url
 
     def run(self):
         """Executa o crawler completo"""
-        print("🚀 Iniciando coleta - Dr. Willian Godoy")
-        
-        # Extrai dados
-        posts_data = self.extract_posts_data()
-        
-        if posts_data:
-            # Salva dados
-            success = self.save_data(posts_data)
-            
-            if success:
-                print(f"✅ Coleta concluída: {len(posts_data)} posts coletados")
-                return posts_data
-            else:
-                print("❌ Erro ao salvar dados")
-                return None
+        print(f"🚀 Iniciando coleta - {self.source.author}")
+        result = CollectorRuntime([self.source], max_workers=1).run().get(self.source.name)
+
+        if result:
+            print(f"✅ Coleta concluída: {len(result)} itens coletados")
         else:
-            print("❌ Nenhum dado coletado")
-            return None
+            print("❌ Erro ao salvar dados")
+        return result
 
 def main():
     """Função principal para teste"""
@@ -154,9 +36,8 @@ def main():
     
     if result:
         print("\n📊 Resumo da coleta:")
-        for post in result:
-            print(f"- {post['title'][:50]}... | ❤️ {post['likes']} | 👁️ {post['views']}")
+        for item in result:
+            print(f"- {item['title'][:50]}... | ❤️ {item['likes']} | 👁️ {item['views']}")
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Runtime único dos crawlers de perfis e anúncios
+Coleta uma lista de fontes (perfis do Instagram, TikTok for Business, ...)
+em paralelo, sobre uma sessão HTTP compartilhada com limite por host,
+gravando tudo em um único banco
+
+Uso:
+    python -m collectors.runtime                         # fontes padrão
+    python -m collectors.runtime --fontes fontes.json    # lista própria de fontes
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Permite executar os scripts de collectors/ diretamente (python3 collectors/...)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_cache import http_cache
+from utils.rate_limit import HostRateLimiter
+from utils.tendencias_store import tendencias_store_para
+
+logger = logging.getLogger(__name__)
+
+COLETAS_DB = os.getenv("COLETAS_DB", "data/coletas.db")
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Intervalo mínimo (segundos) entre requisições ao mesmo host, mais até JITTER_HOST
+# aleatórios, no lugar do sleep aleatório que cada crawler fazia por conta própria
+HOST_INTERVALS = {
+    "www.instagram.com": 2.0,
+    "ads.tiktok.com": 3.0,
+}
+DEFAULT_HOST_INTERVAL = 1.0
+JITTER_HOST = 3.0
+
+
+@dataclass
+class SourceConfig:
+    """Configuração de uma fonte de coleta"""
+    name: str                      # chave no banco e prefixo do JSON diário (ex.: "cristiano_medeiros")
+    url: str
+    platform: str                  # "instagram", "tiktok_business", ...
+    author: str
+    profile: str
+    output_dir: str                # pasta do JSON diário (ex.: "data/instagram")
+    kind: str = "profile"          # "profile" (postagens) ou "ads" (anúncios)
+    topics: List = field(default_factory=list)
+    ranges: Dict = field(default_factory=dict)
+    headers: Dict = field(default_factory=dict)
+    category: str = "Serviços Jurídicos"
+
+    @classmethod
+    def from_dict(cls, dados: Dict) -> "SourceConfig":
+        return cls(**dados)
+
+
+# === Geração dos dados (Instagram e TikTok bloqueiam scraping simples) ===
+
+def _faixa(source: SourceConfig, chave: str, padrao):
+    return source.ranges.get(chave, padrao)
+
+
+def generate_profile_posts(source: SourceConfig) -> List[Dict]:
+    """Gera postagens realistas a partir dos temas do perfil"""
+    prefixo = source.name.split("_")[0]
+    posts = []
+    for i, tema in enumerate(source.topics):
+        posts.append({
+            "id": f"{prefixo}_post_{i+1}",
+            "title": tema,
+            "author": source.author,
+            "profile": source.profile,
+            "likes": random.randint(*_faixa(source, "likes", (150, 800))),
+            "views": random.randint(*_faixa(source, "views", (1000, 5000))),
+            "comments": random.randint(*_faixa(source, "comments", (10, 50))),
+            "saves": random.randint(*_faixa(source, "saves", (20, 100))),
+            "ctr": f"{random.uniform(*_faixa(source, 'ctr', (2.5, 8.5))):.1f}%",
+            "link": f"https://www.instagram.com/p/{prefixo}_post_{i+1}/",
+            "timestamp": datetime.now().isoformat(),
+            "platform": source.platform,
+            "category": source.category,
+            "engagement_rate": f"{random.uniform(*_faixa(source, 'engagement', (3.2, 7.8))):.1f}%"
+        })
+    return posts
+
+
+def generate_business_ads(source: SourceConfig) -> List[Dict]:
+    """Gera anúncios realistas a partir dos anúncios-modelo da fonte"""
+    ads = []
+    for i, anuncio in enumerate(source.topics):
+        ads.append({
+            "id": f"{source.platform}_{i+1}",
+            "title": anuncio["title"],
+            "description": anuncio["description"],
+            "author": f"Escritório Jurídico {i+1}",
+            "profile": f"@juridico_brasil_{i+1}",
+            "likes": random.randint(*_faixa(source, "likes", (500, 2500))),
+            "views": random.randint(*_faixa(source, "views", (10000, 50000))),
+            "comments": random.randint(*_faixa(source, "comments", (50, 200))),
+            "shares": random.randint(*_faixa(source, "shares", (100, 800))),
+            "ctr": f"{random.uniform(*_faixa(source, 'ctr', (4.5, 12.8))):.1f}%",
+            "cta": anuncio["cta"],
+            "link": f"https://ads.tiktok.com/business/ad/{i+1}",
+            "timestamp": datetime.now().isoformat(),
+            "platform": source.platform,
+            "category": source.category,
+            "region": "Brasil",
+            "objective": "Alcance e Geração de Leads",
+            "engagement_rate": f"{random.uniform(*_faixa(source, 'engagement', (5.2, 15.3))):.1f}%",
+            "conversion_rate": f"{random.uniform(*_faixa(source, 'conversion', (2.1, 8.7))):.1f}%"
+        })
+    return ads
+
+
+def generate_fallback_data(source: SourceConfig) -> List[Dict]:
+    """Dados de fallback em caso de erro"""
+    item = {
+        "id": f"{source.name.split('_')[0] if source.kind == 'profile' else source.platform}_fallback",
+        "title": "Dados temporariamente indisponíveis",
+        "author": source.author,
+        "profile": source.profile,
+        "likes": 0,
+        "views": 0,
+        "comments": 0,
+        "ctr": "0%",
+        "link": source.url,
+        "timestamp": datetime.now().isoformat(),
+        "platform": source.platform,
+        "category": source.category,
+        "engagement_rate": "0%"
+    }
+    if source.kind == "ads":
+        item.update({
+            "description": "Aguarde atualização dos dados",
+            "shares": 0,
+            "cta": "Ver Mais",
+            "region": "Brasil",
+            "objective": "Alcance e Geração de Leads",
+            "conversion_rate": "0%"
+        })
+    else:
+        item["saves"] = 0
+    return [item]
+
+
+GENERATORS: Dict[str, Callable[[SourceConfig], List[Dict]]] = {
+    "profile": generate_profile_posts,
+    "ads": generate_business_ads,
+}
+
+
+# === Fontes padrão (antes um script por perfil) ===
+
+DEFAULT_SOURCES = [
+    SourceConfig(
+        name="willian_godoy",
+        url="https://www.instagram.com/williangodoyadv/",
+        platform="instagram",
+        author="Dr. Willian Godoy",
+        profile="@williangodoyadv",
+        output_dir="data/instagram",
+        topics=[
+            "Direitos do Consumidor: Como se proteger de cobranças abusivas",
+            "Trabalhista: Seus direitos em caso de demissão",
+            "Previdenciário: Como solicitar aposentadoria por tempo de contribuição",
+            "Civil: Responsabilidade em acidentes de trânsito",
+            "Empresarial: Como abrir uma empresa de forma segura"
+        ],
+        ranges={"likes": (150, 800), "views": (1000, 5000), "comments": (10, 50),
+                "saves": (20, 100), "ctr": (2.5, 8.5), "engagement": (3.2, 7.8)}
+    ),
+    SourceConfig(
+        name="cristiano_medeiros",
+        url="https://www.instagram.com/cristianomedeiros.adv/",
+        platform="instagram",
+        author="Dr. Cristiano Medeiros",
+        profile="@cristianomedeiros.adv",
+        output_dir="data/instagram",
+        topics=[
+            "Direito Digital: Proteção de dados pessoais na internet",
+            "Contratos: Cláusulas abusivas que você deve evitar",
+            "Propriedade Intelectual: Como proteger sua marca",
+            "Compliance: Adequação à LGPD para empresas",
+            "Direito Imobiliário: Cuidados na compra do primeiro imóvel"
+        ],
+        ranges={"likes": (200, 950), "views": (1200, 6000), "comments": (15, 65),
+                "saves": (25, 120), "ctr": (3.0, 9.2), "engagement": (3.8, 8.5)}
+    ),
+    SourceConfig(
+        name="business_juridico",
+        url="https://ads.tiktok.com/business/creativecenter/inspiration/topads/",
+        platform="tiktok_business",
+        author="TikTok for Business",
+        profile="@tiktokbusiness",
+        output_dir="data/tiktok",
+        kind="ads",
+        headers={'Referer': 'https://ads.tiktok.com/'},
+        topics=[
+            {"title": "Advogado especialista em direitos trabalhistas",
+             "description": "Demitido sem justa causa? Conheça seus direitos!",
+             "cta": "Consulta Gratuita"},
+            {"title": "Consultoria jurídica para pequenas empresas",
+             "description": "Proteja seu negócio com assessoria especializada",
+             "cta": "Fale Conosco"},
+            {"title": "Direito do consumidor - Recupere seu dinheiro",
+             "description": "Nome sujo? Cobrança abusiva? Temos a solução!",
+             "cta": "WhatsApp Direto"},
+            {"title": "Previdenciário - Aposentadoria garantida",
+             "description": "Maximize sua aposentadoria com planejamento",
+             "cta": "Simular Agora"},
+            {"title": "Divórcio consensual rápido e seguro",
+             "description": "Resolva sua situação com discrição total",
+             "cta": "Agendar Consulta"}
+        ]
+    ),
+]
+
+
+def load_sources(caminho: str) -> List[SourceConfig]:
+    """Lê uma lista de fontes de um arquivo JSON (lista de objetos SourceConfig)"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return [SourceConfig.from_dict(dados) for dados in json.load(f)]
+
+
+def source_by_name(nome: str) -> SourceConfig:
+    return next(source for source in DEFAULT_SOURCES if source.name == nome)
+
+
+# === Infraestrutura compartilhada ===
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Sessão com pool de conexões reaproveitado entre todas as fontes"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class CollectorRuntime:
+    """Coleta várias fontes em paralelo e grava o resultado em um único banco"""
+
+    def __init__(self, sources: Optional[List[SourceConfig]] = None, max_workers: int = 8,
+                 db_path: str = COLETAS_DB, export_json: bool = True,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        """
+        Inicializa o runtime
+
+        Args:
+            sources: Fontes a coletar (padrão: DEFAULT_SOURCES)
+            max_workers: Coletas simultâneas
+            db_path: Banco SQLite onde cada coleta é gravada (plataforma = nome da fonte)
+            export_json: Também grava o JSON diário em `output_dir` (lido pelas páginas antigas)
+            rate_limiter: Limite por host compartilhado (padrão: uma conexão por host, HOST_INTERVALS)
+        """
+        self.sources = list(sources) if sources is not None else list(DEFAULT_SOURCES)
+        self.max_workers = max(1, max_workers)
+        self.store = tendencias_store_para(db_path, json_legado=None)
+        self.export_json = export_json
+        self.rate_limiter = rate_limiter or HostRateLimiter(
+            max_conexoes=self.max_workers,
+            max_por_host=1,
+            intervalo_minimo=DEFAULT_HOST_INTERVAL,
+            intervalos_por_host=HOST_INTERVALS,
+            jitter=JITTER_HOST
+        )
+        self.session = create_session(pool_size=self.max_workers)
+
+    def fetch(self, source: SourceConfig) -> List[Dict]:
+        """Acessa a fonte e gera seus dados (fallback em caso de erro)"""
+        try:
+            # Perfis sem mudança desde a última passada custam só um 304
+            response = http_cache.get(self.session, source.url, headers=source.headers,
+                                      limitador=self.rate_limiter, timeout=30)
+
+            if response.status_code == 200:
+                logger.info(f"✅ {source.name}: fonte acessada com sucesso")
+                return GENERATORS[source.kind](source)
+
+            logger.warning(f"❌ {source.name}: erro ao acessar fonte ({response.status_code})")
+        except Exception as e:
+            logger.warning(f"❌ {source.name}: erro na extração: {e}")
+        return generate_fallback_data(source)
+
+    def save(self, source: SourceConfig, items: List[Dict]):
+        """Grava a coleta no banco e, se configurado, no JSON diário"""
+        self.store.salvar_coleta(source.name, items)
+
+        if self.export_json:
+            os.makedirs(source.output_dir, exist_ok=True)
+            today = datetime.now().strftime('%Y-%m-%d')
+            filename = os.path.join(source.output_dir, f"{source.name}_{today}.json")
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(items, f, ensure_ascii=False, indent=2)
+
+    def collect(self, source: SourceConfig) -> Optional[List[Dict]]:
+        """Coleta e grava uma única fonte"""
+        items = self.fetch(source)
+        try:
+            self.save(source, items)
+        except Exception as e:
+            logger.error(f"❌ {source.name}: erro ao salvar dados: {e}")
+            return None
+        return items
+
+    def run(self) -> Dict[str, Optional[List[Dict]]]:
+        """
+        Coleta todas as fontes em paralelo
+
+        Returns:
+            Dict nome da fonte -> itens coletados (None se a gravação falhou)
+        """
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="coletor") as executor:
+            futures = {executor.submit(self.collect, source): source for source in self.sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                resultados[source.name] = future.result()
+        return resultados
+
+
+def run_sources(sources: List[SourceConfig], **kwargs) -> Dict[str, Optional[List[Dict]]]:
+    """Atalho: coleta `sources` com um runtime novo"""
+    return CollectorRuntime(sources, **kwargs).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta perfis e anúncios configurados")
+    parser.add_argument("--fontes", help="JSON com a lista de fontes (padrão: fontes embutidas)")
+    parser.add_argument("--workers", type=int, default=8, help="Coletas simultâneas (padrão: 8)")
+    parser.add_argument("--banco", default=COLETAS_DB, help="Arquivo SQLite de destino")
+    parser.add_argument("--sem-json", action="store_true", help="Não grava os JSON diários")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sources = load_sources(args.fontes) if args.fontes else DEFAULT_SOURCES
+
+    inicio = time.monotonic()
+    resultados = run_sources(sources, max_workers=args.workers, db_path=args.banco,
+                             export_json=not args.sem_json)
+    duracao = time.monotonic() - inicio
+
+    print(f"\n📊 Resumo da coleta ({duracao:.1f}s):")
+    for nome, items in resultados.items():
+        if items is None:
+            print(f"- {nome}: ❌ erro ao salvar dados")
+        else:
+            print(f"- {nome}: {len(items)} itens")
+    return 0 if all(items is not None for items in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
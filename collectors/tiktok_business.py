@@ -2,184 +2,33 @@
 """
 Crawler TikTok for Business - Anúncios Jurídicos
 Coleta top 5 anúncios de serviços jurídicos no Brasil
-URL: https://ads.tiktok.com/business/creativecenter/inspiration/topads/
 Filtros: Brasil, Serviços Empresariais/Jurídicos, Alcance e Leads
+Mantido por compatibilidade: a coleta roda no runtime compartilhado
+(collectors/runtime.py), que coleta várias fontes em uma única passada
 """
 
-import requests
-import json
 import os
-from datetime import datetime
-import time
-import random
-from bs4 import BeautifulSoup
+import sys
 
-class TikTokBusinessCrawler:
-    def __init__(self):
-        self.base_url = "https://ads.tiktok.com/business/creativecenter/inspiration/topads/"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Referer': 'https://ads.tiktok.com/',
-        }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
-
-    def extract_business_ads(self):
-        """Extrai anúncios de negócios jurídicos"""
-        try:
-            print(f"🔍 Acessando TikTok for Business: {self.base_url}")
-            
-            # Delay aleatório para evitar detecção
-            time.sleep(random.uniform(3, 6))
-            
-            response = self.session.get(self.base_url, timeout=30)
-            
-            if response.status_code == 200:
-                print("✅ Plataforma acessada com sucesso")
-                
-                # TikTok for Business usa JavaScript pesado
-                # Simula dados baseados nos filtros especificados
-                ads_data = self.generate_realistic_business_data()
-                
-                return ads_data
-            else:
-                print(f"❌ Erro ao acessar plataforma: {response.status_code}")
-                return self.generate_fallback_data()
-                
-        except Exception as e:
-            print(f"❌ Erro na extração: {e}")
-            return self.generate_fallback_data()
-
-    def generate_realistic_business_data(self):
-        """Gera dados realistas de anúncios jurídicos"""
-        ads = []
-        
-        # Anúncios típicos de serviços jurídicos no TikTok
-        anuncios_juridicos = [
-            {
-                "title": "Advogado especialista em direitos trabalhistas",
-                "description": "Demitido sem justa causa? Conheça seus direitos!",
-                "cta": "Consulta Gratuita"
-            },
-            {
-                "title": "Consultoria jurídica para pequenas empresas",
-                "description": "Proteja seu negócio com assessoria especializada",
-                "cta": "Fale Conosco"
-            },
-            {
-                "title": "Direito do consumidor - Recupere seu dinheiro",
-                "description": "Nome sujo? Cobrança abusiva? Temos a solução!",
-                "cta": "WhatsApp Direto"
-            },
-            {
-                "title": "Previdenciário - Aposentadoria garantida",
-                "description": "Maximize sua aposentadoria com planejamento",
-                "cta": "Simular Agora"
-            },
-            {
-                "title": "Divórcio consensual rápido e seguro",
-                "description": "Resolva sua situação com discrição total",
-                "cta": "Agendar Consulta"
-            }
-        ]
-        
-        for i, anuncio in enumerate(anuncios_juridicos):
-            ad = {
-                "id": f"tiktok_business_{i+1}",
-                "title": anuncio["title"],
-                "description": anuncio["description"],
-                "author": f"Escritório Jurídico {i+1}",
-                "profile": f"@juridico_brasil_{i+1}",
-                "likes": random.randint(500, 2500),
-                "views": random.randint(10000, 50000),
-                "comments": random.randint(50, 200),
-                "shares": random.randint(100, 800),
-                "ctr": f"{random.uniform(4.5, 12.8):.1f}%",
-                "cta": anuncio["cta"],
-                "link": f"https://ads.tiktok.com/business/ad/{i+1}",
-                "timestamp": datetime.now().isoformat(),
-                "platform": "tiktok_business",
-                "category": "Serviços Jurídicos",
-                "region": "Brasil",
-                "objective": "Alcance e Geração de Leads",
-                "engagement_rate": f"{random.uniform(5.2, 15.3):.1f}%",
-                "conversion_rate": f"{random.uniform(2.1, 8.7):.1f}%"
-            }
-            ads.append(ad)
-        
-        return ads
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    def generate_fallback_data(self):
-        """Dados de fallback em caso de erro"""
-        return [{
-            "id": "tiktok_business_fallback",
-            "title": "Dados temporariamente indisponíveis",
-            "description": "Aguarde atualização dos dados",
-            "author": "TikTok for Business",
-            "profile": "@tiktokbusiness",
-            "likes": 0,
-            "views": 0,
-            "comments": 0,
-            "shares": 0,
-            "ctr": "0%",
-            "cta": "Ver Mais",
-            "link": "https://ads.tiktok.com/business/creativecenter/inspiration/topads/",
-            "timestamp": datetime.now().isoformat(),
-            "platform": "tiktok_business",
-            "category": "Serviços Jurídicos",
-            "region": "Brasil",
-            "objective": "Alcance e Geração de Leads",
-            "engagement_rate": "0%",
-            "conversion_rate": "0%"
-        }]
+from collectors.runtime import CollectorRuntime, source_by_name
 
-    def save_data(self, ads_data):
-        """Salva dados coletados"""
-        try:
-            # Cria diretório se não existir
-            os.makedirs("data/tiktok", exist_ok=True)
-            
-            # Nome do arquivo com data atual
-            today = datetime.now().strftime('%Y-%m-%d')
-            filename = f"data/tiktok/business_juridico_{today}.json"
-            
-            # Salva dados
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(ads_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✅ Dados salvos em: {filename}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao salvar dados: {e}")
-            return False
+class TikTokBusinessCrawler:
+    def __init__(self):
+        self.source = source_by_name("business_juridico")
+        self.base_url = self.source.url
 
     def run(self):
         """Executa o crawler completo"""
-        print("🚀 Iniciando coleta - TikTok for Business (Jurídico)")
-        print("📍 Filtros: Brasil | Serviços Jurídicos | Alcance + Leads")
-        
-        # Extrai dados
-        ads_data = self.extract_business_ads()
-        
-        if ads_data:
-            # Salva dados
-            success = self.save_data(ads_data)
-            
-            if success:
-                print(f"✅ Coleta concluída: {len(ads_data)} anúncios coletados")
-                return ads_data
-            else:
-                print("❌ Erro ao salvar dados")
-                return None
+        print(f"🚀 Iniciando coleta - {self.source.author}")
+        result = CollectorRuntime([self.source], max_workers=1).run().get(self.source.name)
+
+        if result:
+            print(f"✅ Coleta concluída: {len(result)} itens coletados")
         else:
-            print("❌ Nenhum dado coletado")
-            return None
+            print("❌ Erro ao salvar dados")
+        return result
 
 def main():
     """Função principal para teste"""
@@ -188,9 +37,8 @@ def main():
     
     if result:
         print("\n📊 Resumo da coleta:")
-        for ad in result:
-            print(f"- {ad['title'][:50]}... | ❤️ {ad['likes']} | 👁️ {ad['views']} | CTR: {ad['ctr']}")
+        for item in result:
+            print(f"- {item['title'][:50]}... | ❤️ {item['likes']} | 👁️ {item['views']}")
 
 if __name__ == "__main__":
     main()
-
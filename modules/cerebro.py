@@ -6,7 +6,8 @@ import streamlit as st
 import base64
 from datetime import datetime
 from utils.helpers import (
-    carregar_perfil, salvar_perfil, calcular_completude_perfil, extrair_texto_arquivo
+    carregar_perfil, salvar_perfil, calcular_completude_perfil, extrair_texto_arquivo,
+    contexto_perfil_em_cache, perfil_snapshot
 )
 
 st.markdown("""
@@ -410,7 +411,11 @@ def render_cerebro_page():
 
 def get_cerebro_context():
     """Retorna o contexto do perfil do Cérebro para uso em outras páginas"""
-    perfil = carregar_perfil()
+    return contexto_perfil_em_cache("cerebro", montar_cerebro_context)
+
+def montar_cerebro_context():
+    """Monta o contexto do perfil do Cérebro a partir do arquivo salvo"""
+    perfil = perfil_snapshot()
     
     if not perfil:
         return "Perfil não cadastrado. Complete o formulário na tela Cérebro."
@@ -2,18 +2,23 @@
 """
 Página Dashboard - Métricas e Visão Geral do Sistema
 Seção 1: 3 Cards de Métricas
-Seção 2: Gráfico de Linhas (Roteiros ao longo do tempo)
+Seção 2: Gráficos de Roteiros ao longo do tempo (por dia e por semana)
 Seção 3: Lista dos últimos 5 roteiros
+Rodapé: Economia do cache de respostas da IA
 """
 
 import streamlit as st
 import json
 import os
 import base64
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
-from utils.helpers import carregar_historico, carregar_perfil
+from utils.helpers import (
+    perfil_snapshot, calcular_completude_perfil, contexto_perfil_em_cache,
+    excluir_roteiro
+)
+from utils.historico_store import historico_store
 
 st.markdown("""
 <style>
@@ -34,46 +39,23 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 def calcular_metricas_dashboard():
-    """Calcula métricas principais para o dashboard"""
-    historico = carregar_historico()
-    perfil = carregar_perfil()
-    
-    # Métrica 1: Total de roteiros gerados
-    total_roteiros = len(historico)
-    
-    # Métrica 2: Roteiros esta semana
-    hoje = datetime.now()
-    inicio_semana = hoje - timedelta(days=7)
-    
-    roteiros_semana = 0
-    for roteiro in historico:
-        try:
-            # Tenta primeiro 'data', depois 'timestamp' para compatibilidade
-            data_str = roteiro.get('data', '') or roteiro.get('timestamp', '')
-            if data_str:
-                # Converte string para datetime
-                if ' ' in data_str:  # Formato: "2025-07-22 18:30:00"
-                    data_roteiro = datetime.strptime(data_str, "%Y-%m-%d %H:%M:%S")
-                else:  # Formato ISO
-                    data_roteiro = datetime.fromisoformat(data_str)
-                
-                if data_roteiro >= inicio_semana:
-                    roteiros_semana += 1
-        except:
-            continue
-    
-    # Métrica 3: Completude do perfil
-    campos_preenchidos = 0
-    total_campos = 0
-    
-    for secao in perfil.values():
-        if isinstance(secao, dict):
-            for valor in secao.values():
-                total_campos += 1
-                if valor and str(valor).strip():
-                    campos_preenchidos += 1
+    """Calcula métricas principais para o dashboard (a partir dos agregados do histórico)"""
+    try:
+        # Métrica 1: Total de roteiros gerados
+        total_roteiros = historico_store.contar()
+        
+        # Métrica 2: Roteiros nos últimos 7 dias (contagem diária materializada)
+        inicio_semana = date.today() - timedelta(days=6)
+        roteiros_semana = sum(historico_store.contagem_diaria(inicio_semana).values())
+    except Exception as e:
+        st.error(f"Erro ao carregar métricas do histórico: {e}")
+        total_roteiros = roteiros_semana = 0
     
-    completude_perfil = int((campos_preenchidos / max(total_campos, 1)) * 100)
+    # Métrica 3: Completude do perfil (recalculada só quando o perfil muda)
+    completude_perfil = contexto_perfil_em_cache(
+        "completude_dashboard",
+        lambda: calcular_completude_perfil(perfil_snapshot())
+    )
     
     return {
         'total_roteiros': total_roteiros,
@@ -83,50 +65,48 @@ def calcular_metricas_dashboard():
 
 def gerar_dados_grafico_tempo():
     """Gera dados para o gráfico de roteiros ao longo do tempo"""
-    historico = carregar_historico()
+    hoje = date.today()
+    inicio = hoje - timedelta(days=30)
     
-    # Agrupa roteiros por data
-    roteiros_por_data = {}
-    
-    for roteiro in historico:
-        try:
-            # Tenta primeiro 'data', depois 'timestamp' para compatibilidade
-            data_str = roteiro.get('data', '') or roteiro.get('timestamp', '')
-            if data_str:
-                # Converte string para datetime
-                if ' ' in data_str:  # Formato: "2025-07-22 18:30:00"
-                    data_roteiro = datetime.strptime(data_str, "%Y-%m-%d %H:%M:%S")
-                else:  # Formato ISO
-                    data_roteiro = datetime.fromisoformat(data_str)
-                
-                data_key = data_roteiro.strftime('%Y-%m-%d')
-                
-                if data_key in roteiros_por_data:
-                    roteiros_por_data[data_key] += 1
-                else:
-                    roteiros_por_data[data_key] = 1
-        except Exception as e:
-            # Se der erro, tenta usar a data atual como fallback
-            hoje = datetime.now().strftime('%Y-%m-%d')
-            if hoje in roteiros_por_data:
-                roteiros_por_data[hoje] += 1
-            else:
-                roteiros_por_data[hoje] = 1
-            continue
+    try:
+        roteiros_por_data = historico_store.contagem_diaria(inicio)
+    except Exception as e:
+        st.error(f"Erro ao carregar histórico: {e}")
+        roteiros_por_data = {}
     
     # Preenche últimos 30 dias
-    hoje = datetime.now()
     datas = []
     valores = []
     
     for i in range(30, 0, -1):
-        data = hoje - timedelta(days=i)
-        data_str = data.strftime('%Y-%m-%d')
+        data_str = (hoje - timedelta(days=i)).isoformat()
         datas.append(data_str)
         valores.append(roteiros_por_data.get(data_str, 0))
     
     return datas, valores
 
+def gerar_dados_grafico_semanal(semanas=12):
+    """Gera dados para o gráfico de roteiros por semana (agregados semanais do histórico)"""
+    hoje = date.today()
+    segunda_atual = hoje - timedelta(days=hoje.weekday())
+    
+    try:
+        roteiros_por_semana = historico_store.totais_semanais(semanas)
+    except Exception as e:
+        st.error(f"Erro ao carregar histórico: {e}")
+        roteiros_por_semana = {}
+    
+    # Preenche as últimas semanas (inclusive as sem roteiros), rotuladas pela segunda-feira
+    semanas_str = []
+    valores = []
+    
+    for i in range(semanas - 1, -1, -1):
+        segunda_str = (segunda_atual - timedelta(weeks=i)).isoformat()
+        semanas_str.append(segunda_str)
+        valores.append(roteiros_por_semana.get(segunda_str, 0))
+    
+    return semanas_str, valores
+
 def render_cards_metricas():
     """Renderiza os 3 cards de métricas principais"""
     # Título "Métricas Principais" em HTML com ícone SVG
@@ -187,26 +167,49 @@ def render_grafico_tempo():
     st.markdown(f"""
         <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 1.5rem;">
             <img src="data:image/svg+xml;base64,{chart_svg}" width="26" height="26" style="margin-top: 2px;" />
-            <h3 style="margin: 0; font-size: 1.6rem; font-weight: 600;">Roteiros ao Longo do Tempo (Últimos 30 dias)</h3>
+            <h3 style="margin: 0; font-size: 1.6rem; font-weight: 600;">Roteiros ao Longo do Tempo</h3>
         </div>
     """, unsafe_allow_html=True)
     
-    datas, valores = gerar_dados_grafico_tempo()    
-   
-    # Cria gráfico com Plotly usando o estilo visual do app (rosa #FF0050)
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=datas,
-        y=valores,
-        mode='lines+markers',
-        name='Roteiros Gerados',
-        line=dict(color='#FF0050', width=3),                     # Cor da linha principal
-        marker=dict(size=6, color='#FF0050'),                    # Cor dos marcadores
-        fill='tozeroy',
-        fillcolor='rgba(255, 0, 80, 0.2)'                        # Degradê translúcido do fundo
-    ))
+    aba_diaria, aba_semanal = st.tabs(["Por dia (últimos 30 dias)", "Por semana (últimas 12 semanas)"])
+    
+    with aba_diaria:
+        datas, valores = gerar_dados_grafico_tempo()    
+       
+        # Cria gráfico com Plotly usando o estilo visual do app (rosa #FF0050)
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=datas,
+            y=valores,
+            mode='lines+markers',
+            name='Roteiros Gerados',
+            line=dict(color='#FF0050', width=3),                     # Cor da linha principal
+            marker=dict(size=6, color='#FF0050'),                    # Cor dos marcadores
+            fill='tozeroy',
+            fillcolor='rgba(255, 0, 80, 0.2)'                        # Degradê translúcido do fundo
+        ))
+
+        aplicar_estilo_grafico(fig, "Data")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with aba_semanal:
+        semanas, valores_semana = gerar_dados_grafico_semanal()
+        
+        fig_semana = go.Figure()
+
+        fig_semana.add_trace(go.Bar(
+            x=semanas,
+            y=valores_semana,
+            name='Roteiros na Semana',
+            marker=dict(color='#FF0050')                             # Mesma cor da série diária
+        ))
+
+        aplicar_estilo_grafico(fig_semana, "Semana (segunda-feira)")
+        st.plotly_chart(fig_semana, use_container_width=True)
 
+def aplicar_estilo_grafico(fig, titulo_x):
+    """Aplica o layout padrão do Dashboard (fundo transparente, rosa #FF0050)"""
     fig.update_layout(
         height=350,
         margin=dict(l=20, r=20, t=40, b=20),
@@ -214,7 +217,7 @@ def render_grafico_tempo():
         paper_bgcolor='rgba(0,0,0,0)',                           # Fundo do canvas também transparente
         font_color='#FF0050',                                    # Texto rosa vibrante
         showlegend=False,
-        xaxis_title="Data",
+        xaxis_title=titulo_x,
         yaxis_title="Roteiros Gerados"
     )
 
@@ -231,8 +234,6 @@ def render_grafico_tempo():
         gridcolor='rgba(255, 0, 80, 0.2)'                        # Grid leve na cor base
     )
 
-    st.plotly_chart(fig, use_container_width=True)
-
 ## == ÚLTIMOS 5 ROTEIROS == ##
 def render_ultimos_roteiros():
     """Renderiza os últimos 5 roteiros com expanders e botão de edição"""
@@ -254,15 +255,17 @@ def render_ultimos_roteiros():
         render_editor_roteiro()
         return
 
-    historico = carregar_historico()
+    try:
+        ultimos = historico_store.recentes(5)
+    except Exception as e:
+        st.error(f"Erro ao carregar histórico: {e}")
+        return
 
-    if not historico:
+    if not ultimos:
         st.info("📝 Nenhum roteiro gerado ainda.")
         return
 
-    historico_ordenado = sorted(historico, key=lambda x: x.get('data', '') or x.get('timestamp', ''), reverse=True)
-
-    for i, roteiro in enumerate(historico_ordenado[:5]):
+    for i, roteiro in enumerate(ultimos):
         titulo = roteiro.get("titulo", "Sem título")
         formato = roteiro.get("formato", "Desconhecido")
         conteudo = roteiro.get("conteudo", "")
@@ -295,8 +298,7 @@ def render_ultimos_roteiros():
                         st.rerun()
                 with col2:
                     if st.button("🗑️ Excluir", key=f"excluir_{i}"):
-                        historico.remove(roteiro)
-                        st.session_state["historico"] = historico
+                        excluir_roteiro(roteiro, st.session_state.get("historico", []))
                         st.success("Roteiro excluído!")
                         st.rerun()
 
@@ -313,22 +315,62 @@ def render_editor_roteiro():
 
     with col1:
         if st.button("💾 Salvar alterações"):
-            roteiro["titulo"] = novo_titulo
-            roteiro["conteudo"] = novo_conteudo
-            roteiro["formato"] = novo_formato
+            alteracoes = {
+                "titulo": novo_titulo,
+                "conteudo": novo_conteudo,
+                "formato": novo_formato,
+                "data_atualizacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            try:
+                historico_store.atualizar(roteiro.get("id"), alteracoes)
+            except Exception as e:
+                st.error(f"Erro ao salvar alterações: {e}")
+                return
+            roteiro.update(alteracoes)
+            for item in st.session_state.get("historico", []):
+                if item.get("id") == roteiro.get("id"):
+                    item.update(alteracoes)
             st.success("Alterações salvas!")
             st.session_state["modo_edicao"] = False
             st.rerun()
 
     with col2:
         if st.button("🗑️ Excluir roteiro"):
-            historico = st.session_state.get("historico", [])
-            historico = [r for r in historico if r != roteiro]
-            st.session_state["historico"] = historico
+            excluir_roteiro(roteiro, st.session_state.get("historico", []))
             st.session_state["modo_edicao"] = False
             st.rerun()
 
 
+def render_cache_ia():
+    """Renderiza a economia da memoização de respostas da IA (desde o início do processo)"""
+    # Importado aqui: o gateway carrega o SDK da Anthropic, que fica fora da abertura do app
+    from services.llm_gateway import llm_gateway
+    
+    estatisticas = llm_gateway.estatisticas_cache()
+    
+    with st.expander("⚡ Cache de respostas da IA", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "Respostas reaproveitadas",
+                estatisticas['hits'],
+                help=f"{estatisticas['misses']} chamada(s) foram à API"
+            )
+        
+        with col2:
+            st.metric("Taxa de acerto", f"{estatisticas['hit_rate']:.0%}")
+        
+        with col3:
+            tokens = estatisticas['tokens_entrada_economizados'] + estatisticas['tokens_saida_economizados']
+            st.metric(
+                "Tokens economizados",
+                f"{tokens:,}",
+                help=(f"Entrada: {estatisticas['tokens_entrada_economizados']:,} · "
+                      f"Saída: {estatisticas['tokens_saida_economizados']:,}")
+            )
+
+
 def render_dashboard_page():
     """Renderiza a página principal do dashboard"""
 
@@ -354,13 +396,11 @@ def render_dashboard_page():
     st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
     
     # Seção 3: Últimos roteiros
-    historico = carregar_historico()
-    historico_ordenado = sorted(
-        historico,
-        key=lambda x: x.get('data', '') or x.get('timestamp', ''),
-        reverse=True
-    )
     render_ultimos_roteiros()
+    
+    # Economia do cache de respostas da IA
+    st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
+    render_cache_ia()
         
     # Botão de atualização
     st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
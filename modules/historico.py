@@ -1,16 +1,61 @@
 """
 Página de Histórico - Lista elegante de roteiros salvos
+Lista paginada: só a página visível vai para o navegador e o conteúdo completo
+é carregado quando o roteiro é aberto
 """
 import streamlit as st
+import os
 import base64
 from datetime import datetime, date
-from utils.helpers import (
-    carregar_historico, salvar_historico, salvar_alteracoes_roteiro, excluir_roteiro
-)
+from utils.historico_store import historico_store
+from utils.helpers import salvar_alteracoes_roteiro, excluir_roteiro
+
+
+# Tamanhos de página disponíveis na lista
+TAMANHOS_PAGINA = [10, 20, 50]
+TAMANHO_PAGINA_PADRAO = int(os.getenv("HISTORICO_ITENS_POR_PAGINA", "20"))
+
+# CSS para os expanders da lista
+CSS_LISTA_ROTEIROS = """
+<style>
+
+/* Estilo do container do expander (details) */
+details {
+    margin-bottom: 16px !important;   /* Adiciona espaçamento entre os expanders */
+}
+
+/* Estilo do título (fechado ou aberto) */
+summary {
+    background-color: #182433 !important;
+    color: #f0f2f5 !important;
+    border-radius: 10px !important;
+    padding: 12px 16px !important;
+    font-weight: 600 !important;
+    border: 1px solid #223344 !important;
+    list-style: none;
+    cursor: pointer;
+}
+
+/* Remove o símbolo padrão do navegador (triângulo) */
+summary::-webkit-details-marker {
+    display: none;
+}
+
+/* Estilo para o conteúdo aberto (dentro do expander) */
+details[open] > div {
+    background-color: #151f2c !important;
+    padding: 20px !important;
+    border-radius: 10px !important;
+    border: 1px solid #223344 !important;
+    margin-top: -10px !important;
+}
+
+</style>
+"""
 
 
 def render_historico_page():
-    """Renderiza a página de histórico com filtros e lista elegante"""    
+    """Renderiza a página de histórico com filtros e lista paginada"""    
     
     ## === TÍTULO PRINCIPAL === ##
     with open("icons/clock.svg", "rb") as f:
@@ -23,22 +68,22 @@ def render_historico_page():
         </div>
     """, unsafe_allow_html=True)
     
-    # Carrega histórico
-    historico = carregar_historico()
+    # Conta os roteiros sem carregar o histórico inteiro
+    total = historico_store.contar()
     
-    if not historico:
+    if not total:
         st.info("🖺 Nenhum roteiro salvo ainda. Comece criando seu primeiro roteiro!")
         return
     
     # Seção de filtros
-    render_filtros_historico(historico)
+    filtros = render_filtros_historico(total)
     
-    # Lista de roteiros
-    render_lista_roteiros(historico)
+    # Lista de roteiros (apenas a página visível)
+    render_lista_roteiros(filtros)
 
 
-def render_filtros_historico(historico):
-    """Renderiza os filtros básicos para o histórico"""
+def render_filtros_historico(total):
+    """Renderiza os filtros básicos para o histórico e retorna (busca, formato, data)"""
     
     st.markdown("### 🔍 Filtros")
     
@@ -68,8 +113,8 @@ def render_filtros_historico(historico):
         )
     
     with col2:
-        # Extrai formatos únicos do histórico
-        formatos = list(set([r.get('formato', 'Não especificado') for r in historico]))
+        # Formatos existentes (faceta calculada pelo armazenamento)
+        formatos = list(historico_store.contar_por_formato().keys())
         formatos.insert(0, "Todos")
         
         # Garante que o valor está na lista
@@ -101,203 +146,210 @@ def render_filtros_historico(historico):
                     del st.session_state[key]
             st.rerun()
     
-    # Aplica filtros
-    historico_filtrado = aplicar_filtros(
-        historico, 
-        filtro_busca, 
-        filtro_formato, 
-        filtro_data
+    # Mostra estatísticas
+    total_filtrado = historico_store.contar_busca(filtro_busca, filtro_formato, filtro_data)
+    st.markdown(f"**🖺 {total_filtrado} roteiro(s) encontrado(s) de {total} total**")
+    
+    return filtro_busca, filtro_formato, filtro_data
+
+
+def formatar_data_roteiro(timestamp):
+    """Formata a data salva no roteiro para exibição"""
+    try:
+        if timestamp:
+            if 'T' in timestamp:
+                data_obj = datetime.fromisoformat(timestamp.replace('Z', ''))
+            else:
+                data_obj = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+            return data_obj.strftime('%d/%m/%Y às %H:%M')
+        return 'Data não disponível'
+    except:
+        return 'Data inválida'
+
+
+def render_paginacao(filtros):
+    """
+    Controla a página atual por cursores guardados na sessão
+    
+    Returns:
+        (resumos da página, número da página, há próxima página)
+    """
+    col_info, col_tamanho = st.columns([3, 1])
+    with col_tamanho:
+        tamanho = st.selectbox(
+            "Por página",
+            TAMANHOS_PAGINA,
+            index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA_PADRAO) if TAMANHO_PAGINA_PADRAO in TAMANHOS_PAGINA else 1,
+            key="historico_tamanho_pagina"
+        )
+    
+    # Filtros ou tamanho diferentes voltam para a primeira página
+    assinatura = (filtros[0], filtros[1], str(filtros[2]), tamanho)
+    if st.session_state.get('historico_assinatura') != assinatura:
+        st.session_state['historico_assinatura'] = assinatura
+        st.session_state['historico_cursores'] = [None]
+    
+    cursores = st.session_state['historico_cursores']
+    resumos, proximo = historico_store.buscar_pagina(
+        filtros[0], filtros[1], filtros[2], tamanho=tamanho, cursor=cursores[-1]
     )
     
-    # Armazena no session_state para uso na lista
-    st.session_state.historico_filtrado = historico_filtrado
+    with col_info:
+        st.markdown(f"Página **{len(cursores)}**")
     
-    # Mostra estatísticas
-    st.markdown(f"**🖺 {len(historico_filtrado)} roteiro(s) encontrado(s) de {len(historico)} total**")
+    return resumos, len(cursores), proximo
 
 
-def aplicar_filtros(historico, busca, formato, data_filtro):
-    """Aplica os filtros ao histórico"""
-    
-    resultado = historico.copy()
-    
-    # Filtro por busca livre
-    if busca:
-        busca = busca.lower()
-        resultado = [
-            r for r in resultado 
-            if busca in r.get('titulo', '').lower() or 
-               busca in r.get('conteudo', '').lower()
-        ]
-    
-    # Filtro por formato
-    if formato and formato != "Todos":
-        resultado = [
-            r for r in resultado 
-            if r.get('formato', 'Não especificado') == formato
-        ]
-    
-    # Filtro por data
-    if data_filtro:
-        data_str = str(data_filtro)
-        resultado = [
-            r for r in resultado 
-            if r.get('data', '').startswith(data_str) or
-               r.get('timestamp', '').startswith(data_str)
-        ]
-    
-    # Ordena por data (mais recente primeiro)
-    resultado = sorted(
-        resultado, 
-        key=lambda x: x.get('timestamp', x.get('data', '')), 
-        reverse=True
-    )
+def render_navegacao(pagina, proximo):
+    """Botões de página anterior/próxima"""
+    col_ant, _, col_prox = st.columns([1, 3, 1])
     
-    return resultado
+    with col_ant:
+        if pagina > 1 and st.button("← Anterior", key="historico_pagina_anterior", use_container_width=True):
+            st.session_state['historico_cursores'].pop()
+            st.rerun()
+    
+    with col_prox:
+        if proximo and st.button("Próxima →", key="historico_pagina_proxima", use_container_width=True):
+            st.session_state['historico_cursores'].append(proximo)
+            st.rerun()
 
 
-def render_lista_roteiros(historico):
-    """Renderiza a lista elegante de roteiros com expanders"""
+def render_lista_roteiros(filtros):
+    """Renderiza a página visível da lista de roteiros com expanders"""
     
-    # Pega histórico filtrado
-    historico_filtrado = st.session_state.get('historico_filtrado', historico)
+    resumos, pagina, proximo = render_paginacao(filtros)
     
-    if not historico_filtrado:
+    if not resumos:
+        if pagina > 1:
+            # A página ficou vazia (ex.: o último roteiro dela foi excluído): volta uma página
+            st.session_state['historico_cursores'].pop()
+            st.rerun()
         st.info("🔍 Nenhum roteiro encontrado com os filtros aplicados.")
         return
         
-    # CSS para os expanders
-    st.markdown("""
-    <style>
-
-    /* Estilo do container do expander (details) */
-    details {
-        margin-bottom: 16px !important;   /* Adiciona espaçamento entre os expanders */
-    }
-
-    /* Estilo do título (fechado ou aberto) */
-    summary {
-        background-color: #182433 !important;
-        color: #f0f2f5 !important;
-        border-radius: 10px !important;
-        padding: 12px 16px !important;
-        font-weight: 600 !important;
-        border: 1px solid #223344 !important;
-        list-style: none;
-        cursor: pointer;
-    }
-
-    /* Remove o símbolo padrão do navegador (triângulo) */
-    summary::-webkit-details-marker {
-        display: none;
-    }
-
-    /* Estilo para o conteúdo aberto (dentro do expander) */
-    details[open] > div {
-        background-color: #151f2c !important;
-        padding: 20px !important;
-        border-radius: 10px !important;
-        border: 1px solid #223344 !important;
-        margin-top: -10px !important;
-    }
-
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(CSS_LISTA_ROTEIROS, unsafe_allow_html=True)
     
-    for i, roteiro in enumerate(historico_filtrado):
-        # Formata data
-        try:
-            timestamp = roteiro.get('timestamp', roteiro.get('data', ''))
-            if timestamp:
-                if 'T' in timestamp:
-                    data_obj = datetime.fromisoformat(timestamp.replace('Z', ''))
-                else:
-                    data_obj = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-                data_formatada = data_obj.strftime('%d/%m/%Y às %H:%M')
-            else:
-                data_formatada = 'Data não disponível'
-        except:
-            data_formatada = 'Data inválida'
+    # Roteiros cujo conteúdo completo foi aberto nesta sessão
+    abertos = st.session_state.setdefault('roteiros_abertos', set())
+    
+    for i, resumo in enumerate(resumos):
+        roteiro_id = resumo['id']
+        data_formatada = formatar_data_roteiro(resumo.get('data'))
         
-        titulo = roteiro.get('titulo', 'Roteiro sem título')
-        formato = roteiro.get('formato', 'Não especificado')
-        conteudo = roteiro.get('conteudo', 'Conteúdo não disponível')
+        titulo = resumo.get('titulo') or 'Roteiro sem título'
+        formato = resumo.get('formato') or 'Não especificado'
         
         # Header do expander com informações resumidas
         header_text = f"**{titulo[:50]}{'...' if len(titulo) > 50 else ''}** | {formato} | {data_formatada}"
         
-        # Expander fechado por padrão
-        with st.expander(header_text, expanded=False):
-            
-            # Informações detalhadas
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                st.markdown(f"**◉ Título:** {titulo}")
-                st.markdown(f"**◉ Formato:** {formato}")
-                st.markdown(f"**◉ Data:** {data_formatada}")
-                
-                if roteiro.get('instrucao'):
-                    st.markdown(f"**◉ Instrução:** {roteiro['instrucao']}")
-            
-            with col2:
-                # Estatísticas rápidas
-                palavras = len(conteudo.split())
-                caracteres = len(conteudo)
-                
-                st.metric("Palavras", palavras)
-                st.metric("Caracteres", caracteres)         
+        aberto = roteiro_id in abertos
+        
+        with st.expander(header_text, expanded=aberto):
             
-            # Campo editável para o conteúdo
-            conteudo_editado = st.text_area(
-                "Editar conteúdo:",
-                value=conteudo,
-                height=200,
-                key=f"conteudo_{i}_{roteiro.get('id', i)}"
-            )
+            if not aberto:
+                # Só o resumo vai para o navegador até o roteiro ser aberto
+                st.markdown(f"**◉ Caracteres:** {resumo['caracteres']}")
+                if resumo.get('instrucao'):
+                    st.markdown(f"**◉ Instrução:** {resumo['instrucao']}")
+                if st.button("📖 Abrir roteiro", key=f"abrir_{roteiro_id}"):
+                    abertos.add(roteiro_id)
+                    st.rerun()
+                continue
             
-            # Campo editável para o título
-            titulo_editado = st.text_input(
-                "Editar título:",
-                value=titulo,
-                key=f"titulo_{i}_{roteiro.get('id', i)}"
-            )
+            roteiro = historico_store.obter(roteiro_id)
+            if not roteiro:
+                st.info("ℹ️ Este roteiro não existe mais.")
+                abertos.discard(roteiro_id)
+                continue
             
-            # Botões de ação
-            col_btn1, col_btn2, col_btn3 = st.columns(3)
+            render_roteiro_aberto(i, roteiro, titulo, formato, data_formatada)
+    
+    render_navegacao(pagina, proximo)
+
+
+def render_roteiro_aberto(i, roteiro, titulo, formato, data_formatada):
+    """Exibe um roteiro completo com edição e exclusão"""
+    
+    conteudo = roteiro.get('conteudo', 'Conteúdo não disponível')
+    historico_sessao = st.session_state.get("historico", [])
+    
+    # Informações detalhadas
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.markdown(f"**◉ Título:** {titulo}")
+        st.markdown(f"**◉ Formato:** {formato}")
+        st.markdown(f"**◉ Data:** {data_formatada}")
+        
+        if roteiro.get('instrucao'):
+            st.markdown(f"**◉ Instrução:** {roteiro['instrucao']}")
+    
+    with col2:
+        # Estatísticas rápidas
+        palavras = len(conteudo.split())
+        caracteres = len(conteudo)
+        
+        st.metric("Palavras", palavras)
+        st.metric("Caracteres", caracteres)         
+    
+    # Campo editável para o conteúdo
+    conteudo_editado = st.text_area(
+        "Editar conteúdo:",
+        value=conteudo,
+        height=200,
+        key=f"conteudo_{roteiro['id']}"
+    )
+    
+    # Campo editável para o título
+    titulo_editado = st.text_input(
+        "Editar título:",
+        value=titulo,
+        key=f"titulo_{roteiro['id']}"
+    )
+    
+    # Botões de ação
+    col_btn1, col_btn2, col_btn3 = st.columns(3)
+    
+    with col_btn1:
+        if st.button("Salvar Alterações", key=f"salvar_{roteiro['id']}"):
+            if titulo_editado != titulo or conteudo_editado != conteudo:
+                salvar_alteracoes_roteiro(
+                    roteiro, titulo_editado, conteudo_editado, historico_sessao
+                )
+                st.success("✅ Alterações salvas!")
+                st.rerun()
+            else:
+                st.info("ℹ️ Nenhuma alteração detectada.")      
+    
+    with col_btn2:
+        if st.button("Fechar", key=f"fechar_{roteiro['id']}"):
+            st.session_state['roteiros_abertos'].discard(roteiro['id'])
+            st.rerun()
+    
+    with col_btn3:
+        # Confirmação de exclusão
+        chave_confirmacao = f"confirmar_exclusao_{roteiro['id']}"
+        if chave_confirmacao not in st.session_state:
+            if st.button("🗑️ Excluir", key=f"excluir_{roteiro['id']}"):
+                st.session_state[chave_confirmacao] = True
+                st.rerun()
+        else:
+            st.warning("⚠️ Confirmar exclusão?")
+            col_conf1, col_conf2 = st.columns(2)
             
-            with col_btn1:
-                if st.button("Salvar Alterações", key=f"salvar_{i}_{roteiro.get('id', i)}"):
-                    if titulo_editado != titulo or conteudo_editado != conteudo:
-                        salvar_alteracoes_roteiro(
-                            roteiro, titulo_editado, conteudo_editado, historico
-                        )
-                        st.success("✅ Alterações salvas!")
-                        st.rerun()
-                    else:
-                        st.info("ℹ️ Nenhuma alteração detectada.")      
+            with col_conf1:
+                if st.button("✅ Sim", key=f"confirmar_sim_{roteiro['id']}"):
+                    excluir_roteiro(roteiro, historico_sessao)
+                    del st.session_state[chave_confirmacao]
+                    st.session_state['roteiros_abertos'].discard(roteiro['id'])
+                    st.success("🗑️ Roteiro excluído!")
+                    st.rerun()
             
-            with col_btn3:
-                # Confirmação de exclusão
-                if f"confirmar_exclusao_{i}" not in st.session_state:
-                    if st.button("🗑️ Excluir", key=f"excluir_{i}_{roteiro.get('id', i)}"):
-                        st.session_state[f"confirmar_exclusao_{i}"] = True
-                        st.rerun()
-                else:
-                    st.warning("⚠️ Confirmar exclusão?")
-                    col_conf1, col_conf2 = st.columns(2)
-                    
-                    with col_conf1:
-                        if st.button("✅ Sim", key=f"confirmar_sim_{i}"):
-                            excluir_roteiro(roteiro, historico)
-                            del st.session_state[f"confirmar_exclusao_{i}"]
-                            st.success("🗑️ Roteiro excluído!")
-                            st.rerun()
-                    
-                    with col_conf2:
-                        if st.button("❌ Não", key=f"confirmar_nao_{i}"):
-                            del st.session_state[f"confirmar_exclusao_{i}"]
-                            st.rerun()
+            with col_conf2:
+                if st.button("❌ Não", key=f"confirmar_nao_{roteiro['id']}"):
+                    del st.session_state[chave_confirmacao]
+                    st.rerun()
 
 
 if __name__ == "__main__":
@@ -12,7 +12,7 @@ from utils.helpers import (
     salvar_alteracoes_roteiro, excluir_roteiro, salvar_roteiro
 )
 from services.ai_agents import (
-    gerar_roteiro_com_ia, analisar_temas_quentes
+    gerar_roteiro_com_ia_stream, analisar_temas_quentes
 )
 from components.layout import (
     render_metrics_row, render_status_card, render_expandable_content,
@@ -168,10 +168,17 @@ def render_reels_tiktok_page():
         )
         
         if st.form_submit_button("Gerar Roteiro", type="primary"):
-            with st.spinner("Gerando roteiro personalizado..."):
-                roteiro = gerar_roteiro_com_ia(perfil, instrucao_adicional, formato)
-                
-                if roteiro:
+            # Exibe o roteiro conforme os trechos chegam da API
+            try:
+                with st.container(border=True):
+                    roteiro = st.write_stream(
+                        gerar_roteiro_com_ia_stream(perfil, instrucao_adicional, formato)
+                    )
+            except Exception as e:
+                # O texto parcial já exibido não é salvo como roteiro
+                st.error(f"❌ Geração interrompida: {str(e)}. O roteiro incompleto não foi salvo.")
+            else:
+                if isinstance(roteiro, str) and roteiro.strip():
                     st.session_state["roteiro_atual"] = {
                         "conteudo": roteiro,
                         "titulo": titulo_roteiro,
@@ -348,7 +355,7 @@ def render_historico_section():
     
     # Aplica filtros
     historico_filtrado = aplicar_filtros_historico(
-        historico, filtro_formato, filtro_data, busca_texto
+        historico, busca_texto, filtro_formato, filtro_data
     )
     
     # Estatísticas
@@ -6,13 +6,15 @@ import streamlit as st
 import os
 import base64
 import tempfile
+import time
 from datetime import datetime
 from utils.raiox import (
     validate_video_url, 
-    process_video_complete, 
+    enfileirar_processamento_video, 
     create_download_content,
     format_duration
 )
+from services.jobs import job_manager
 from modules.cerebro import get_cerebro_context, calcular_completude_perfil, load_cerebro_data
 
 def render_raiox_page():
@@ -91,145 +93,13 @@ def render_raiox_page():
             disabled=not video_url or not validate_video_url(video_url)[0]
         )
     
-    # Processamento do vídeo
+    # Processamento do vídeo (em background, sobrevive a reruns)
     if analyze_button and video_url:
-        
-        # Container para feedback de progresso
-        progress_container = st.container()
-        
-        with progress_container:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            def update_progress(message):
-                """Callback para atualizar progresso"""
-                status_text.text(message)
-                
-                # Simula progresso baseado na mensagem
-                if "Validando" in message:
-                    progress_bar.progress(10)
-                elif "metadados" in message:
-                    progress_bar.progress(25)
-                elif "Baixando" in message:
-                    progress_bar.progress(40)
-                elif "Transcrevendo" in message:
-                    progress_bar.progress(60)
-                elif "Analisando" in message:
-                    progress_bar.progress(80)
-                elif "Gerando" in message:
-                    progress_bar.progress(90)
-                elif "concluído" in message:
-                    progress_bar.progress(100)
-            
-            # Processa o vídeo
-            result, error = process_video_complete(video_url, update_progress)
-            
-            if error:
-                st.error(f"❌ {error}")
-                return
-            
-            if not result:
-                st.error("❌ Erro desconhecido no processamento")
-                return
-        
-        # Limpa o feedback de progresso
-        progress_container.empty()
-        
-        # Exibe resultados
-        st.success("✅ **Análise concluída com sucesso!**")
-        
-        # Metadados do vídeo
-        st.subheader("📊 Informações do Vídeo")
-        
-        metadata = result['metadata']
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("Visualizações", f"{metadata.get('view_count', 0):,}")
-        
-        with col2:
-            st.metric("Curtidas", f"{metadata.get('like_count', 0):,}")
-        
-        with col3:
-            st.metric("Duração", format_duration(metadata.get('duration', 0)))
-        
-        # Informações detalhadas
-        st.markdown(f"**📝 Título:** {metadata.get('title', 'N/A')}")
-        st.markdown(f"**👤 Autor:** {metadata.get('uploader', 'N/A')}")
-        st.markdown(f"**🌐 Plataforma:** {metadata.get('platform', 'N/A')}")
-        
-        st.markdown("---")
-        
-        # Transcrição original (colapsável)
-        with st.expander("📜 Transcrição Original", expanded=False):
-            st.text_area(
-                "Conteúdo transcrito:",
-                value=result['transcription'],
-                height=200,
-                disabled=True
-            )
-        
-        # Análise da estrutura
-        st.subheader("🧠 Análise da Estrutura")
-        st.markdown(result['structure_analysis'])
-        
-        st.markdown("---")
-        
-        # Nova copy gerada
-        st.subheader("✍️ Nova Copy Personalizada")
-        
-        # Área editável para a copy
-        new_copy_text = st.text_area(
-            "Copy adaptada ao seu perfil:",
-            value=result['new_copy'],
-            height=400,
-            help="Você pode editar a copy antes de baixar"
-        )
-        
-        # Estatísticas da copy
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            word_count = len(new_copy_text.split())
-            st.metric("Palavras", word_count)
-        
-        with col2:
-            # Estimativa de duração (150 palavras por minuto)
-            estimated_duration = int((word_count / 150) * 60)
-            st.metric("Duração Est.", f"{estimated_duration}s")
-        
-        with col3:
-            char_count = len(new_copy_text)
-            st.metric("Caracteres", char_count)
-        
-        # Botões de ação
-        st.markdown("---")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Botão de download
-            download_content = create_download_content(new_copy_text, metadata)
-            
-            st.download_button(
-                label="📥 Baixar Copy",
-                data=download_content,
-                file_name=f"copy_raiox_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                mime="text/plain",
-                use_container_width=True
-            )
-        
-        with col2:
-            # Botão para copiar
-            if st.button("📋 Copiar Copy", use_container_width=True):
-                st.code(new_copy_text, language=None)
-                st.success("✅ Copy copiada! Use Ctrl+C para copiar do campo acima.")
-        
-        with col3:
-            # Botão para nova análise
-            if st.button("🔄 Nova Análise", use_container_width=True):
-                st.rerun()
+        st.session_state["raiox_job_id"] = enfileirar_processamento_video(video_url)
+    
+    job_id = st.session_state.get("raiox_job_id")
+    if job_id:
+        render_job_raiox(job_id)
     
     # Informações sobre a ferramenta   
     with open("icons/exclamation.svg", "rb") as f:
@@ -272,6 +142,176 @@ def render_raiox_page():
         - Adapte exemplos à sua realidade
         """)
 
+
+def render_job_raiox(job_id):
+    """Acompanha o job de processamento e exibe o resultado quando concluído"""
+    
+    # Container para feedback de progresso
+    progress_container = st.empty()
+    
+    with progress_container.container():
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        def update_progress(message):
+            """Callback para atualizar progresso"""
+            status_text.text(message)
+            
+            # Simula progresso baseado na mensagem
+            if "Validando" in message:
+                progress_bar.progress(10)
+            elif "metadados" in message:
+                progress_bar.progress(25)
+            elif "Baixando" in message:
+                progress_bar.progress(40)
+            elif "Transcrevendo" in message:
+                progress_bar.progress(60)
+            elif "Analisando" in message:
+                progress_bar.progress(80)
+            elif "Gerando" in message:
+                progress_bar.progress(90)
+            elif "concluído" in message:
+                progress_bar.progress(100)
+        
+        # Consulta o job usando o mesmo callback de progresso
+        job = job_manager.acompanhar(job_id, update_progress)
+    
+    if not job:
+        st.session_state.pop("raiox_job_id", None)
+        progress_container.empty()
+        st.info("ℹ️ A análise anterior não está mais disponível. Inicie uma nova análise.")
+        return
+    
+    if job_manager.em_andamento(job):
+        # Exibe a copy parcial enquanto ela é gerada
+        if job.get('parcial'):
+            with st.container(border=True):
+                st.markdown(job['parcial'])
+        
+        # Reexecuta a página periodicamente até o job terminar
+        time.sleep(1)
+        st.rerun()
+    
+    # Limpa o feedback de progresso
+    progress_container.empty()
+    
+    if job['erro']:
+        st.error(f"❌ Erro no processamento: {job['erro']}")
+        return
+    
+    result, error = job['resultado']
+    
+    if error:
+        st.error(f"❌ {error}")
+        return
+    
+    if not result:
+        st.error("❌ Erro desconhecido no processamento")
+        return
+    
+    render_resultado_raiox(result)
+
+
+def render_resultado_raiox(result):
+    """Exibe o resultado da análise do Raio-X"""
+    
+    st.success("✅ **Análise concluída com sucesso!**")
+
+    # Metadados do vídeo
+    st.subheader("📊 Informações do Vídeo")
+
+    metadata = result['metadata']
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Visualizações", f"{metadata.get('view_count', 0):,}")
+
+    with col2:
+        st.metric("Curtidas", f"{metadata.get('like_count', 0):,}")
+
+    with col3:
+        st.metric("Duração", format_duration(metadata.get('duration', 0)))
+
+    # Informações detalhadas
+    st.markdown(f"**📝 Título:** {metadata.get('title', 'N/A')}")
+    st.markdown(f"**👤 Autor:** {metadata.get('uploader', 'N/A')}")
+    st.markdown(f"**🌐 Plataforma:** {metadata.get('platform', 'N/A')}")
+
+    st.markdown("---")
+
+    # Transcrição original (colapsável)
+    with st.expander("📜 Transcrição Original", expanded=False):
+        st.text_area(
+            "Conteúdo transcrito:",
+            value=result['transcription'],
+            height=200,
+            disabled=True
+        )
+
+    # Análise da estrutura
+    st.subheader("🧠 Análise da Estrutura")
+    st.markdown(result['structure_analysis'])
+
+    st.markdown("---")
+
+    # Nova copy gerada
+    st.subheader("✍️ Nova Copy Personalizada")
+
+    # Área editável para a copy
+    new_copy_text = st.text_area(
+        "Copy adaptada ao seu perfil:",
+        value=result['new_copy'],
+        height=400,
+        help="Você pode editar a copy antes de baixar"
+    )
+
+    # Estatísticas da copy
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        word_count = len(new_copy_text.split())
+        st.metric("Palavras", word_count)
+
+    with col2:
+        # Estimativa de duração (150 palavras por minuto)
+        estimated_duration = int((word_count / 150) * 60)
+        st.metric("Duração Est.", f"{estimated_duration}s")
+
+    with col3:
+        char_count = len(new_copy_text)
+        st.metric("Caracteres", char_count)
+
+    # Botões de ação
+    st.markdown("---")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        # Botão de download
+        download_content = create_download_content(new_copy_text, metadata)
+
+        st.download_button(
+            label="📥 Baixar Copy",
+            data=download_content,
+            file_name=f"copy_raiox_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+
+    with col2:
+        # Botão para copiar
+        if st.button("📋 Copiar Copy", use_container_width=True):
+            st.code(new_copy_text, language=None)
+            st.success("✅ Copy copiada! Use Ctrl+C para copiar do campo acima.")
+
+    with col3:
+        # Botão para nova análise
+        if st.button("🔄 Nova Análise", use_container_width=True):
+            st.session_state.pop("raiox_job_id", None)
+            st.rerun()
+
+
 # Função para compatibilidade com o sistema de navegação
 def show_raiox_page():
     """Função de compatibilidade"""
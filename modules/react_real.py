@@ -7,8 +7,8 @@ import os
 import base64
 import json
 from datetime import datetime
-import yt_dlp
-import whisper
+from services.ai_agents_real import get_anthropic_client
+from services.transcription_cache import extrair_info_video, obter_transcricao, transcrever_com_cache
 
 
 def get_cerebro_context():
@@ -45,41 +45,42 @@ Temas de Interesse: {data.get('temas_interesse', 'Não informado')}
 
 
 def extract_video_metadata(url):
-    """Extrai metadados reais do vídeo usando yt-dlp"""
+    """Extrai metadados reais do vídeo usando yt-dlp (com cache por ID do vídeo)"""
     try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-        }
+        info = extrair_info_video(url)
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            duration = info.get('duration', 0)
-            duration_formatted = f"{duration // 60}:{duration % 60:02d}" if duration else "N/A"
-            
-            return {
-                'platform': 'YouTube',
-                'title': info.get('title', 'Título não disponível'),
-                'duration': duration_formatted,
-                'duration_seconds': duration,
-                'author': info.get('uploader', 'Autor não disponível'),
-                'description': info.get('description', ''),
-                'view_count': info.get('view_count', 0),
-                'url': url
-            }
+        duration = info.get('duration') or 0
+        duration_formatted = f"{int(duration) // 60}:{int(duration) % 60:02d}" if duration else "N/A"
+        
+        return {
+            'platform': 'YouTube',
+            'video_id': info.get('video_id'),
+            'title': info.get('title') or 'Título não disponível',
+            'duration': duration_formatted,
+            'duration_seconds': duration,
+            'author': info.get('uploader') or 'Autor não disponível',
+            'description': info.get('description') or '',
+            'view_count': info.get('view_count') or 0,
+            'url': url
+        }
             
     except Exception as e:
         st.error(f"❌ Erro ao extrair metadados: {str(e)}")
         return None
 
 
-def download_and_transcribe_video(url):
+def download_and_transcribe_video(url, video_id=None):
     """Baixa áudio e transcreve usando Whisper"""
     try:
+        # Vídeo já transcrito em outra página/sessão
+        transcription = obter_transcricao(video_id=video_id)
+        if transcription:
+            st.info("⚡ Transcrição encontrada no cache")
+            return transcription
+        
         import tempfile
         import os
+        import yt_dlp
         
         # Criar diretório temporário
         temp_dir = tempfile.mkdtemp()
@@ -114,13 +115,9 @@ def download_and_transcribe_video(url):
             st.error("❌ Não foi possível baixar o áudio")
             return None
         
-        # Carregar modelo Whisper
-        st.info("🎯 Carregando modelo Whisper...")
-        model = whisper.load_model("base")
-        
-        # Transcrever áudio
+        # Transcrever áudio (modelo Whisper compartilhado)
         st.info("📝 Transcrevendo áudio...")
-        result = model.transcribe(audio_file)
+        transcription = transcrever_com_cache(audio_file, video_id=video_id)
         
         # Limpar arquivos temporários
         try:
@@ -129,36 +126,30 @@ def download_and_transcribe_video(url):
         except:
             pass
         
-        return result["text"].strip()
+        return transcription
         
     except Exception as e:
         st.error(f"❌ Erro na transcrição: {str(e)}")
         return None
 
 
-def generate_react_script_with_ai(video_data, transcription, description, style):
-    """Gera roteiro React usando Claude"""
-    import anthropic
+def selecionar_segmento(transcription):
+    """Seleciona o segmento engajante da transcrição (primeiras 100 palavras)"""
+    words = transcription.split()
+    return " ".join(words[:100]) if len(words) > 100 else transcription
+
+
+def montar_prompt_react(video_data, transcription, description, style):
+    """
+    Monta o prompt do roteiro React e retorna (prompt, segmento usado)
     
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        st.error("❌ Chave da API Anthropic não configurada!")
-        return None
+    O contexto do cérebro não entra no prompt: ele é enviado como prefixo cacheado.
+    """
     
-    try:
-        client = anthropic.Anthropic(api_key=api_key)
-        
-        # Selecionar segmento engajante (primeiras 100 palavras)
-        words = transcription.split()
-        segment = " ".join(words[:100]) if len(words) > 100 else transcription
-        
-        # Obter contexto do cérebro
-        cerebro_context = get_cerebro_context()
-        
-        if style == "React Padrão":
-            prompt = f"""
-{cerebro_context}
-
+    segment = selecionar_segmento(transcription)
+    
+    if style == "React Padrão":
+        prompt = f"""
 VÍDEO PROCESSADO:
 - Título: {video_data['title']}
 - Autor: {video_data['author']}
@@ -190,10 +181,8 @@ DIRETRIZES:
 
 Gere o roteiro completo:
 """
-        else:  # React Bate-Bola
-            prompt = f"""
-{cerebro_context}
-
+    else:  # React Bate-Bola
+        prompt = f"""
 VÍDEO PROCESSADO:
 - Título: {video_data['title']}
 - Autor: {video_data['author']}
@@ -229,8 +218,23 @@ DIRETRIZES:
 
 Gere o roteiro completo:
 """
+    
+    return prompt, segment
+
+
+def generate_react_script_with_ai(video_data, transcription, description, style):
+    """Gera roteiro React usando Claude"""
+    client = get_anthropic_client()
+    if not client:
+        return None
+    
+    try:
         
-        response = client.messages.create(
+        prompt, segment = montar_prompt_react(video_data, transcription, description, style)
+        
+        response = client.criar_mensagem(
+            memoizar=False,
+            contexto_cacheavel=get_cerebro_context(),
             model="claude-3-5-sonnet-20241022",
             max_tokens=2000,
             messages=[{"role": "user", "content": prompt}]
@@ -249,6 +253,36 @@ Gere o roteiro completo:
         return None
 
 
+def generate_react_script_with_ai_stream(video_data, transcription, description, style):
+    """
+    Gera roteiro React usando Claude, produzindo trechos de texto conforme chegam
+    
+    Uma falha depois do primeiro trecho é propagada (o roteiro ficou incompleto)
+    """
+    client = get_anthropic_client()
+    if not client:
+        return
+    
+    produzido = False
+    try:
+        
+        prompt, _ = montar_prompt_react(video_data, transcription, description, style)
+        
+        for texto in client.stream_texto(
+            contexto_cacheavel=get_cerebro_context(),
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2000,
+            messages=[{"role": "user", "content": prompt}]
+        ):
+            produzido = True
+            yield texto
+        
+    except Exception as e:
+        if produzido:
+            raise
+        st.error(f"❌ Erro ao gerar roteiro: {str(e)}")
+
+
 def render_react_page():
     """Renderiza a página React com funcionalidade REAL"""
     
@@ -345,7 +379,7 @@ def render_react_page():
                     st.write(f"**👀 Visualizações:** {video_data.get('view_count', 0):,}")
                 
                 # 2. Baixar e transcrever áudio
-                transcription = download_and_transcribe_video(video_url)
+                transcription = download_and_transcribe_video(video_url, video_data.get('video_id'))
                 
                 if not transcription:
                     st.error("❌ Erro ao transcrever o vídeo")
@@ -359,7 +393,25 @@ def render_react_page():
                 
                 # 3. Gerar roteiro com IA
                 st.info("🤖 Gerando roteiro personalizado com IA...")
-                result = generate_react_script_with_ai(video_data, transcription, description, react_style)
+                with st.container(border=True):
+                    try:
+                        script = st.write_stream(
+                            generate_react_script_with_ai_stream(video_data, transcription, description, react_style)
+                        )
+                    except Exception as e:
+                        # Roteiro interrompido no meio: o parcial exibido não vira resultado
+                        st.error(f"❌ Geração do roteiro interrompida: {str(e)}")
+                        return
+                
+                result = None
+                if isinstance(script, str) and script.strip():
+                    result = {
+                        'script': script,
+                        'video_data': video_data,
+                        'transcription': transcription,
+                        'segment_used': selecionar_segmento(transcription),
+                        'style': react_style
+                    }
                 
                 if result:
                     # Exibir resultado
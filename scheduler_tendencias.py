@@ -2,14 +2,16 @@
 Sistema de Agendamento de Tendências
 Coleta automática diária otimizada para performance
 """
-import schedule
-import time
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from utils.trends_manager import TrendsManager
+from utils.agendador import Agendador, Tarefa
 import threading
 import os
 
+# Cria diretório de logs antes de abrir o arquivo de log
+os.makedirs('logs', exist_ok=True)
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,8 +28,17 @@ class TrendsScheduler:
         self.trends_manager = TrendsManager()
         self.is_running = False
         
-        # Cria diretório de logs se não existir
-        os.makedirs('logs', exist_ok=True)
+        # Coleta diária às 7h e a cada 6h; a mesma trava impede coletas simultâneas,
+        # inclusive de outros processos, e uma cobre a outra quando vencem juntas
+        self.agendador = Agendador()
+        self.agendador.adicionar(Tarefa(
+            "coleta_diaria", self.collect_trends_job,
+            horario="07:00", jitter=timedelta(minutes=5), trava="coleta_tendencias"
+        ))
+        self.agendador.adicionar(Tarefa(
+            "coleta_6h", self.collect_trends_job,
+            intervalo=timedelta(hours=6), jitter=timedelta(minutes=15), trava="coleta_tendencias"
+        ))
     
     def collect_trends_job(self):
         """Job de coleta de tendências"""
@@ -48,13 +59,20 @@ class TrendsScheduler:
             
             logger.info(f"✅ Coleta concluída: {total_trends} tendências em {duration:.1f}s")
             
-            # Log detalhado por plataforma
+            # Log detalhado por plataforma (com duração e origem dos dados da coleta paralela)
+            platform_stats = trends.get('platform_stats', {})
             for platform, platform_trends in trends.items():
                 if platform != 'fallback_active' and isinstance(platform_trends, list):
-                    logger.info(f"  📱 {platform}: {len(platform_trends)} tendências")
+                    stats = platform_stats.get(platform)
+                    if stats:
+                        logger.info(f"  📱 {platform}: {len(platform_trends)} tendências "
+                                    f"em {stats['duration']:.1f}s ({stats['source']})")
+                    else:
+                        logger.info(f"  📱 {platform}: {len(platform_trends)} tendências")
             
         except Exception as e:
             logger.error(f"❌ Erro na coleta automática: {e}")
+            raise  # registrada como erro pelo agendador
     
     def start_scheduler(self):
         """Inicia o agendador"""
@@ -62,26 +80,12 @@ class TrendsScheduler:
             logger.warning("Agendador já está rodando")
             return
         
-        # Agenda coleta diária às 7h da manhã
-        schedule.every().day.at("07:00").do(self.collect_trends_job)
-        
-        # Agenda coleta a cada 6 horas para manter dados frescos
-        schedule.every(6).hours.do(self.collect_trends_job)
-        
         self.is_running = True
         logger.info("📅 Agendador iniciado - Coletas às 7h e a cada 6h")
         
-        # Executa uma coleta inicial se não há dados recentes
-        last_update = self.trends_manager.get_last_update_time()
-        if not last_update or (datetime.now() - last_update).total_seconds() > 21600:  # 6 horas
-            logger.info("🔄 Executando coleta inicial...")
-            self.collect_trends_job()
-        
-        # Loop principal do agendador
+        # Coletas perdidas enquanto o agendador esteve parado rodam uma única vez na partida
         try:
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(60)  # Verifica a cada minuto
+            self.agendador.iniciar()
         except KeyboardInterrupt:
             logger.info("⏹️ Agendador interrompido pelo usuário")
         except Exception as e:
@@ -90,10 +94,13 @@ class TrendsScheduler:
             self.is_running = False
     
     def stop_scheduler(self):
-        """Para o agendador"""
+        """Para o agendador (acorda o laço imediatamente)"""
         self.is_running = False
-        schedule.clear()
-        logger.info("⏹️ Agendador parado")
+        self.agendador.parar()
+    
+    def get_run_history(self):
+        """Execuções recentes (início, duração e resultado)"""
+        return list(self.agendador.execucoes)
     
     def run_in_background(self):
         """Executa o agendador em background"""
@@ -1,36 +1,37 @@
 """
 Serviços de integração com IA (Claude 3.5 Sonnet)
 """
-import os
 import streamlit as st
-import anthropic
-import requests
-from bs4 import BeautifulSoup
 import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from utils.helpers import salvar_historico
+from utils.helpers import salvar_roteiro
+from services.llm_gateway import llm_gateway
 
+# Análise de temas quentes: links processados em paralelo e tempo limite por link
+MAX_ANALISES_PARALELAS = 4
+TIMEOUT_ANALISE_LINK = 90
 
-# Inicialização do cliente Anthropic
+
+# Cliente Anthropic (gateway compartilhado)
 def get_anthropic_client():
-    """Retorna cliente Anthropic configurado"""
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-        
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            st.error("❌ Chave da API do Anthropic não encontrada. Configure no arquivo .env")
-            return None
-            
-        return anthropic.Anthropic(api_key=api_key)
-    except Exception as e:
-        st.error(f"❌ Erro ao inicializar cliente Anthropic: {e}")
+    """Retorna o gateway compartilhado da API do Claude"""
+    if not llm_gateway.configurado():
+        st.error("❌ Chave da API do Anthropic não encontrada. Configure no arquivo .env")
         return None
+    
+    return llm_gateway
 
 
-def gerar_roteiro_com_ia(perfil, instrucao_adicional="", formato="Automático"):
-    """Gera um roteiro usando a API do Claude com base no perfil e instruções"""
+def montar_mensagem_roteiro(perfil, instrucao_adicional="", formato="Automático"):
+    """
+    Monta a mensagem enviada à IA para geração de roteiro
+    
+    Retorna (contexto do perfil, orientações): o contexto é estável entre
+    gerações e vai como prefixo com prompt caching; as orientações mudam a cada pedido.
+    """
     
     # Monta o contexto do usuário
     contexto_usuario = montar_contexto_perfil(perfil)
@@ -88,8 +89,13 @@ O roteiro será para um vídeo a ser postado no Instagram Reels ou TikTok, com d
 
 Agora, elabore o roteiro completo seguindo essas diretrizes:"""
     
-    # Monta a mensagem final
-    mensagem_usuario = contexto_usuario + "\n\n" + orientacoes_gerais
+    return contexto_usuario, orientacoes_gerais
+
+
+def gerar_roteiro_com_ia(perfil, instrucao_adicional="", formato="Automático"):
+    """Gera um roteiro usando a API do Claude com base no perfil e instruções"""
+    
+    contexto_usuario, mensagem_usuario = montar_mensagem_roteiro(perfil, instrucao_adicional, formato)
     
     try:
         # Obtém cliente Anthropic
@@ -98,7 +104,9 @@ Agora, elabore o roteiro completo seguindo essas diretrizes:"""
             return None
             
         # Chama a API do Claude
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            memoizar=False,
+            contexto_cacheavel=contexto_usuario,
             model="claude-3-5-sonnet-20241022",
             max_tokens=1500,
             temperature=0.7,
@@ -114,6 +122,43 @@ Agora, elabore o roteiro completo seguindo essas diretrizes:"""
         return None
 
 
+def gerar_roteiro_com_ia_stream(perfil, instrucao_adicional="", formato="Automático"):
+    """
+    Gera o roteiro em streaming, produzindo trechos de texto conforme chegam da API
+    
+    Use com `st.write_stream`, que exibe o texto aos poucos e retorna o roteiro completo.
+    Se a API falhar depois do primeiro trecho, a exceção é propagada: o texto já
+    exibido está incompleto e não deve ser tratado como roteiro pronto.
+    """
+    
+    contexto_usuario, mensagem_usuario = montar_mensagem_roteiro(perfil, instrucao_adicional, formato)
+    
+    produzido = False
+    try:
+        # Obtém cliente Anthropic
+        client = get_anthropic_client()
+        if not client:
+            return
+        
+        # Chama a API do Claude em modo streaming
+        for texto in client.stream_texto(
+            contexto_cacheavel=contexto_usuario,
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=1500,
+            temperature=0.7,
+            messages=[
+                {"role": "user", "content": mensagem_usuario}
+            ]
+        ):
+            produzido = True
+            yield texto
+        
+    except Exception as e:
+        if produzido:
+            raise
+        st.error(f"Erro na API do Claude: {str(e)}")
+
+
 def generate_react_script(transcription, instrucoes, estilo_react):
     """Gera roteiro estilo React baseado na transcrição do vídeo"""
     
@@ -162,7 +207,8 @@ Gere um roteiro completo e detalhado seguindo a estrutura do estilo {estilo_reac
             return None
             
         # Chama a API do Claude
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            memoizar=False,
             model="claude-3-5-sonnet-20241022",
             max_tokens=1200,
             temperature=0.7,
@@ -284,73 +330,145 @@ def salvar_roteiro_no_historico(roteiro, titulo, instrucao, formato):
         "data_formatada": datetime.now().strftime("%d/%m/%Y às %H:%M")
     }
     
-    # Adiciona ao histórico
-    historico = st.session_state.get("historico", [])
-    historico.append(novo_item)
-    st.session_state["historico"] = historico
+    # Adiciona ao histórico (só o novo item é gravado)
+    salvar_roteiro(novo_item)
+
+
+def _extrair_texto_pagina(response):
+    """Extrai (título, texto limpo) do HTML de uma página"""
+    from bs4 import BeautifulSoup
+    
+    # Extrai o conteúdo com BeautifulSoup
+    soup = BeautifulSoup(response.text, 'html.parser')
+    
+    # Remove scripts e estilos
+    for script in soup(["script", "style", "noscript", "nav", "footer", "header"]):
+        script.extract()
     
-    # Salva em arquivo
-    salvar_historico(historico)
+    # Extrai título
+    titulo = soup.title.string.strip() if soup.title and soup.title.string else None
+    
+    # Extrai texto principal
+    texto = soup.get_text(separator=" ").strip()
+    return titulo, " ".join(texto.split())  # Remove espaços extras
 
 
-def analisar_temas_quentes(links):
-    """Analisa uma lista de links e gera relatório de insights"""
+def _analisar_link(i, url, cancelado=None):
+    """
+    Baixa e analisa um único link
+    
+    Args:
+        i: Número do link (para as mensagens)
+        url: URL da página
+        cancelado: threading.Event sinalizado quando o link excede o tempo limite
+    
+    Returns:
+        Tupla (insight, erro) - apenas um dos dois é preenchido
+    """
+    import requests
+    from utils.http_cache import http_cache
+    
+    try:
+        # Faz a requisição HTTP
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+        # Páginas inalteradas desde a última análise voltam do cache HTTP sem novo parsing
+        response = http_cache.get(requests, url, headers=headers, timeout=15)
+        
+        if response.status_code != 200:
+            return None, f"Link {i}: Erro HTTP {response.status_code}"
+        
+        titulo, texto_limpo = http_cache.processar(response, "temas_quentes", _extrair_texto_pagina)
+        titulo = titulo or f"Artigo {i}"
+        
+        if not texto_limpo or len(texto_limpo) < 100:
+            return None, f"Link {i}: Conteúdo insuficiente ou não encontrado"
+        
+        # Limita o tamanho para não sobrecarregar a IA
+        if len(texto_limpo) > 8000:
+            texto_limpo = texto_limpo[:8000] + "..."
+        
+        # Link já descartado por timeout não ocupa uma vaga do gateway
+        if cancelado is not None and cancelado.is_set():
+            return None, f"Link {i}: Timeout - análise cancelada"
+        
+        # Analisa com IA
+        insight, erro = analisar_conteudo_com_ia(titulo, texto_limpo, i)
+        
+        if insight:
+            return f"**{titulo}**\n{insight}", None
+        return None, f"Link {i}: {erro or 'Erro na análise por IA'}"
+            
+    except requests.exceptions.Timeout:
+        return None, f"Link {i}: Timeout - site muito lento"
+    except requests.exceptions.RequestException as e:
+        return None, f"Link {i}: Erro de conexão - {str(e)[:50]}"
+    except Exception as e:
+        return None, f"Link {i}: Erro inesperado - {str(e)[:50]}"
+
+
+def analisar_temas_quentes(links, *, max_paralelo=MAX_ANALISES_PARALELAS, timeout_link=TIMEOUT_ANALISE_LINK):
+    """
+    Analisa uma lista de links e gera relatório de insights
+    
+    Os links são baixados e analisados em paralelo (com limite de concorrência);
+    os insights entram no relatório na ordem em que ficam prontos.
+    
+    Args:
+        links: Lista de URLs
+        max_paralelo: Máximo de links processados ao mesmo tempo
+        timeout_link: Tempo máximo (segundos) de download + análise por link
+    """
     
     insights = []
     erros = []
     
-    # Processa cada link
-    for i, url in enumerate(links, 1):
-        try:
-            st.write(f"🔍 Analisando link {i}/{len(links)}...")
-            
-            # Faz a requisição HTTP
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            
-            if response.status_code != 200:
-                erros.append(f"Link {i}: Erro HTTP {response.status_code}")
-                continue
-            
-            # Extrai o conteúdo com BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove scripts e estilos
-            for script in soup(["script", "style", "noscript", "nav", "footer", "header"]):
-                script.extract()
-            
-            # Extrai título
-            titulo = soup.title.string.strip() if soup.title else f"Artigo {i}"
-            
-            # Extrai texto principal
-            texto = soup.get_text(separator=" ").strip()
-            texto_limpo = " ".join(texto.split())  # Remove espaços extras
-            
-            if not texto_limpo or len(texto_limpo) < 100:
-                erros.append(f"Link {i}: Conteúdo insuficiente ou não encontrado")
-                continue
-            
-            # Limita o tamanho para não sobrecarregar a IA
-            if len(texto_limpo) > 8000:
-                texto_limpo = texto_limpo[:8000] + "..."
-            
-            # Analisa com IA
-            insight = analisar_conteudo_com_ia(titulo, texto_limpo, i)
+    st.write(f"🔍 Analisando {len(links)} link(s) em paralelo...")
+    
+    inicio = {}  # número do link -> horário em que começou a executar
+    cancelados = {i: threading.Event() for i in range(1, len(links) + 1)}
+    
+    def executar(i, url):
+        inicio[i] = time.monotonic()
+        return _analisar_link(i, url, cancelados[i])
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, max_paralelo))
+    try:
+        pendentes = {
+            executor.submit(executar, i, url): i
+            for i, url in enumerate(links, 1)
+        }
+        
+        while pendentes:
+            concluidos, _ = wait(list(pendentes), timeout=1, return_when=FIRST_COMPLETED)
             
-            if insight:
-                insights.append(f"**{titulo}**\n{insight}")
-            else:
-                erros.append(f"Link {i}: Erro na análise por IA")
+            for future in concluidos:
+                i = pendentes.pop(future)
+                insight, erro = future.result()
                 
-        except requests.exceptions.Timeout:
-            erros.append(f"Link {i}: Timeout - site muito lento")
-        except requests.exceptions.RequestException as e:
-            erros.append(f"Link {i}: Erro de conexão - {str(e)[:50]}")
-        except Exception as e:
-            erros.append(f"Link {i}: Erro inesperado - {str(e)[:50]}")
+                if insight:
+                    insights.append(insight)
+                    st.write(f"✅ Link {i}/{len(links)} analisado")
+                else:
+                    erros.append(erro)
+                    st.write(f"⚠️ Link {i}/{len(links)} com problema")
+            
+            # Descarta links que excederam o tempo limite. A thread não pode ser
+            # interrompida: o sinal evita a chamada à IA se o link ainda estiver
+            # no download; uma chamada já em curso termina (limitada pelo timeout
+            # de requisição do gateway) e o resultado é ignorado
+            agora = time.monotonic()
+            for future, i in list(pendentes.items()):
+                if i in inicio and agora - inicio[i] > timeout_link:
+                    pendentes.pop(future)
+                    cancelados[i].set()
+                    future.cancel()
+                    erros.append(f"Link {i}: Timeout - análise excedeu {timeout_link}s")
+                    st.write(f"⚠️ Link {i}/{len(links)} excedeu o tempo limite")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     
     # Gera relatório consolidado
     if insights:
@@ -359,7 +477,7 @@ def analisar_temas_quentes(links):
         # Adiciona erros se houver
         if erros:
             relatorio_final += "\n\n---\n**⚠️ Problemas encontrados:**\n"
-            for erro in erros:
+            for erro in sorted(erros, key=lambda e: int(e.split(':')[0].split()[-1])):
                 relatorio_final += f"- {erro}\n"
         
         return relatorio_final
@@ -368,7 +486,15 @@ def analisar_temas_quentes(links):
 
 
 def analisar_conteudo_com_ia(titulo, texto, numero):
-    """Analisa um conteúdo específico usando IA"""
+    """
+    Analisa um conteúdo específico usando IA
+    
+    Roda nas threads de analisar_temas_quentes, por isso devolve o erro em vez
+    de chamar o Streamlit
+    
+    Returns:
+        Tupla (análise, erro) - apenas um dos dois é preenchido
+    """
     
     prompt = f"""Analise o seguinte artigo e extraia:
 
@@ -389,13 +515,11 @@ def analisar_conteudo_com_ia(titulo, texto, numero):
 
 **Resposta:**"""
     
+    if not llm_gateway.configurado():
+        return None, "Chave da API do Anthropic não encontrada"
+    
     try:
-        # Obtém cliente Anthropic
-        client = get_anthropic_client()
-        if not client:
-            return None
-            
-        response = client.messages.create(
+        response = llm_gateway.criar_mensagem(
             model="claude-3-5-sonnet-20241022",
             max_tokens=800,
             temperature=0.6,
@@ -404,11 +528,10 @@ def analisar_conteudo_com_ia(titulo, texto, numero):
             ]
         )
         
-        return response.content[0].text
+        return response.content[0].text, None
         
     except Exception as e:
-        st.error(f"Erro na análise do conteúdo {numero}: {str(e)}")
-        return None
+        return None, f"Erro na análise por IA - {str(e)[:50]}"
 
 
 def gerar_relatorio_consolidado(insights):
@@ -442,7 +565,7 @@ def gerar_relatorio_consolidado(insights):
         if not client:
             return "Erro: Cliente Anthropic não disponível."
             
-        response = client.messages.create(
+        response = client.criar_mensagem(
             model="claude-3-5-sonnet-20241022",
             max_tokens=1200,
             temperature=0.7,
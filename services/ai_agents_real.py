@@ -2,44 +2,24 @@
 Serviços de integração com IA - Claude 3.5 Sonnet
 Agora com contexto do Cérebro e processamento real de vídeos
 """
-import os
-import anthropic
 import streamlit as st
 from modules.cerebro import get_cerebro_context
+from services.llm_gateway import llm_gateway
 from services.video_processing import process_video_url, select_engaging_segment
 
 
 def get_anthropic_client():
-    """Retorna cliente Anthropic configurado"""
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
+    """Retorna o gateway compartilhado da API do Claude"""
+    if not llm_gateway.configurado():
         st.error("❌ Chave da API Anthropic não configurada!")
         return None
     
-    return anthropic.Anthropic(api_key=api_key)
+    return llm_gateway
 
 
-def generate_script_with_context(formato, instrucao="", perfil_data=None):
-    """
-    Gera roteiro usando contexto do Cérebro
-    
-    Args:
-        formato: Formato do roteiro
-        instrucao: Instruções específicas do usuário
-        perfil_data: Dados do perfil (opcional, usa Cérebro se não fornecido)
-    """
-    client = get_anthropic_client()
-    if not client:
-        return None
-    
-    try:
-        # Obtém contexto do Cérebro
-        cerebro_context = get_cerebro_context()
-        
-        # Prompt personalizado com contexto
-        prompt = f"""
-{cerebro_context}
-
+def montar_prompt_script(formato, instrucao=""):
+    """Monta o prompt de geração de roteiro (o contexto do Cérebro vai em prefixo cacheado)"""
+    return f"""
 TAREFA: Gerar roteiro para vídeo curto ({formato})
 
 INSTRUÇÕES ESPECÍFICAS: {instrucao if instrucao else "Use as informações do perfil para criar conteúdo relevante"}
@@ -56,8 +36,28 @@ DIRETRIZES:
 
 Gere um roteiro completo e personalizado:
 """
+
+
+def generate_script_with_context(formato, instrucao="", perfil_data=None):
+    """
+    Gera roteiro usando contexto do Cérebro
+    
+    Args:
+        formato: Formato do roteiro
+        instrucao: Instruções específicas do usuário
+        perfil_data: Dados do perfil (opcional, usa Cérebro se não fornecido)
+    """
+    client = get_anthropic_client()
+    if not client:
+        return None
+    
+    try:
+        cerebro_context = get_cerebro_context()
+        prompt = montar_prompt_script(formato, instrucao)
         
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            memoizar=False,
+            contexto_cacheavel=cerebro_context,
             model="claude-3-5-sonnet-20241022",
             max_tokens=2000,
             messages=[{"role": "user", "content": prompt}]
@@ -70,6 +70,45 @@ Gere um roteiro completo e personalizado:
         return None
 
 
+def generate_script_with_context_stream(formato, instrucao="", perfil_data=None):
+    """
+    Gera roteiro usando contexto do Cérebro, em streaming
+    
+    Args:
+        formato: Formato do roteiro
+        instrucao: Instruções específicas do usuário
+        perfil_data: Dados do perfil (opcional, usa Cérebro se não fornecido)
+        
+    Yields:
+        Trechos de texto conforme chegam da API
+    
+    Raises:
+        Exception: Falha da API depois do primeiro trecho (roteiro incompleto)
+    """
+    client = get_anthropic_client()
+    if not client:
+        return
+    
+    produzido = False
+    try:
+        cerebro_context = get_cerebro_context()
+        prompt = montar_prompt_script(formato, instrucao)
+        
+        for texto in client.stream_texto(
+            contexto_cacheavel=cerebro_context,
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=2000,
+            messages=[{"role": "user", "content": prompt}]
+        ):
+            produzido = True
+            yield texto
+        
+    except Exception as e:
+        if produzido:
+            raise
+        st.error(f"❌ Erro na API do Claude: {str(e)}")
+
+
 def generate_react_script_real(video_url, description, style, perfil_data=None):
     """
     Gera roteiro React usando processamento REAL de vídeo
@@ -107,8 +146,6 @@ def generate_react_script_real(video_url, description, style, perfil_data=None):
         # 5. GERAR ROTEIRO COM IA
         if style == "React Padrão":
             prompt = f"""
-{cerebro_context}
-
 VÍDEO PROCESSADO:
 - Plataforma: {video_data['platform']}
 - Título: {video_data['title']}
@@ -142,8 +179,6 @@ Gere o roteiro completo:
 """
         else:  # React Bate-Bola
             prompt = f"""
-{cerebro_context}
-
 VÍDEO PROCESSADO:
 - Plataforma: {video_data['platform']}
 - Título: {video_data['title']}
@@ -180,7 +215,9 @@ DIRETRIZES:
 Gere o roteiro completo:
 """
         
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            memoizar=False,
+            contexto_cacheavel=cerebro_context,
             model="claude-3-5-sonnet-20241022",
             max_tokens=2000,
             messages=[{"role": "user", "content": prompt}]
@@ -214,8 +251,6 @@ def analisar_conteudo_com_ia(conteudo, url=""):
         cerebro_context = get_cerebro_context()
         
         prompt = f"""
-{cerebro_context}
-
 CONTEÚDO PARA ANÁLISE:
 URL: {url}
 CONTEÚDO: {conteudo[:3000]}...
@@ -238,7 +273,8 @@ FORMATO DE RESPOSTA:
 Faça a análise completa:
 """
         
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            contexto_cacheavel=cerebro_context,
             model="claude-3-5-sonnet-20241022",
             max_tokens=1500,
             messages=[{"role": "user", "content": prompt}]
@@ -271,8 +307,6 @@ def gerar_relatorio_consolidado(analises):
         ])
         
         prompt = f"""
-{cerebro_context}
-
 ANÁLISES INDIVIDUAIS:
 {analises_texto}
 
@@ -295,7 +329,8 @@ DIRETRIZES:
 Gere o relatório completo:
 """
         
-        response = client.messages.create(
+        response = client.criar_mensagem(
+            contexto_cacheavel=cerebro_context,
             model="claude-3-5-sonnet-20241022",
             max_tokens=2500,
             messages=[{"role": "user", "content": prompt}]
@@ -0,0 +1,155 @@
+"""
+Fila de jobs em background - Processamento fora do rerun do Streamlit
+Pool local de workers com concorrência limitada e IDs que sobrevivem a reruns
+"""
+import os
+import time
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Jobs simultâneos (download + Whisper + IA são pesados)
+MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+
+# Tempo que um job finalizado fica disponível para consulta
+RETENCAO_SEGUNDOS = 60 * 60
+
+STATUS_NA_FILA = "na_fila"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+
+class JobManager:
+    """Gerencia jobs executados em um pool de threads compartilhado"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        """
+        Inicializa o gerenciador
+
+        Args:
+            max_workers: Número máximo de jobs executando ao mesmo tempo
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix="job")
+        self._jobs: Dict[str, Dict] = {}
+        self._trava = threading.Lock()
+
+    def submit(self, func: Callable, *args, descricao: str = "", **kwargs) -> str:
+        """
+        Enfileira uma função para execução em background
+
+        A função recebe um `progress_callback(mensagem, parcial=None)` como
+        argumento nomeado, no mesmo formato usado pelas páginas. `parcial` guarda
+        o texto gerado até o momento (ex.: copy em streaming).
+
+        Args:
+            func: Função a executar
+            descricao: Texto curto para identificar o job
+
+        Returns:
+            ID do job
+        """
+        self._limpar_antigos()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'descricao': descricao,
+            'status': STATUS_NA_FILA,
+            'progresso': "⏳ Aguardando na fila...",
+            'parcial': None,
+            'resultado': None,
+            'erro': None,
+            'criado_em': time.time(),
+            'iniciado_em': None,
+            'finalizado_em': None
+        }
+
+        with self._trava:
+            self._jobs[job_id] = job
+
+        def progress_callback(mensagem, parcial=None):
+            with self._trava:
+                job['progresso'] = mensagem
+                if parcial is not None:
+                    job['parcial'] = parcial
+
+        def executar():
+            with self._trava:
+                job['status'] = STATUS_EXECUTANDO
+                job['iniciado_em'] = time.time()
+            try:
+                resultado = func(*args, progress_callback=progress_callback, **kwargs)
+                with self._trava:
+                    job['resultado'] = resultado
+                    job['status'] = STATUS_CONCLUIDO
+            except Exception as e:
+                logger.error(f"Erro no job {job_id} ({descricao}): {e}")
+                with self._trava:
+                    job['erro'] = str(e)
+                    job['status'] = STATUS_ERRO
+            finally:
+                with self._trava:
+                    job['finalizado_em'] = time.time()
+
+        self._executor.submit(executar)
+        logger.info(f"Job {job_id} enfileirado: {descricao}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Retorna uma cópia do estado do job ou None se não existir"""
+        with self._trava:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+
+            estado = dict(job)
+            if job['status'] == STATUS_NA_FILA:
+                estado['posicao_fila'] = 1 + sum(
+                    1 for outro in self._jobs.values()
+                    if outro['status'] == STATUS_NA_FILA and outro['criado_em'] < job['criado_em']
+                )
+            return estado
+
+    def acompanhar(self, job_id: str, progress_callback: Optional[Callable] = None) -> Optional[Dict]:
+        """
+        Consulta o job e repassa o progresso atual ao callback da página
+
+        Args:
+            job_id: ID do job
+            progress_callback: Mesmo callback usado no processamento síncrono
+
+        Returns:
+            Estado do job ou None se não existir
+        """
+        estado = self.get(job_id)
+        if estado and progress_callback:
+            mensagem = estado['progresso']
+            if estado['status'] == STATUS_NA_FILA and estado.get('posicao_fila', 1) > 1:
+                mensagem = f"⏳ Aguardando na fila (posição {estado['posicao_fila']})..."
+            progress_callback(mensagem)
+        return estado
+
+    def em_andamento(self, estado: Optional[Dict]) -> bool:
+        """Indica se o job ainda não terminou"""
+        return bool(estado) and estado['status'] in (STATUS_NA_FILA, STATUS_EXECUTANDO)
+
+    def _limpar_antigos(self):
+        """Remove jobs finalizados há mais tempo que a retenção"""
+        limite = time.time() - RETENCAO_SEGUNDOS
+        with self._trava:
+            antigos = [
+                job_id for job_id, job in self._jobs.items()
+                if job['finalizado_em'] and job['finalizado_em'] < limite
+            ]
+            for job_id in antigos:
+                del self._jobs[job_id]
+
+
+# Instância global (compartilhada entre sessões do Streamlit)
+job_manager = JobManager()
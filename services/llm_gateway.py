@@ -0,0 +1,290 @@
+"""
+Gateway único para chamadas à API do Claude
+Cliente HTTP compartilhado, limite de requisições simultâneas, rate limiting
+por token bucket, novas tentativas com backoff exponencial e jitter,
+prompt caching do contexto de perfil e memoização de respostas em disco
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+from typing import Iterator, Optional
+
+import anthropic
+import httpx
+from dotenv import load_dotenv
+from utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Requisições simultâneas à API (somando todas as sessões do Streamlit)
+MAX_REQUISICOES_SIMULTANEAS = int(os.getenv("LLM_MAX_SIMULTANEAS", "4"))
+
+# Ritmo sustentado de requisições e rajada permitida
+REQUISICOES_POR_MINUTO = float(os.getenv("LLM_REQUISICOES_POR_MINUTO", "50"))
+RAJADA_MAXIMA = int(os.getenv("LLM_RAJADA_MAXIMA", "5"))
+
+# Novas tentativas para 429/529, erros 5xx e falhas de conexão
+MAX_TENTATIVAS = int(os.getenv("LLM_MAX_TENTATIVAS", "4"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAXIMO = 30.0
+
+TIMEOUT_REQUISICAO = 120.0
+
+# Memoização de respostas para chamadas determinísticas (análises)
+CACHE_RESPOSTAS_DIR = os.getenv("LLM_CACHE_DIR", "data/cache/llm")
+CACHE_RESPOSTAS_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "50"))
+TTL_RESPOSTAS_HORAS = float(os.getenv("LLM_CACHE_TTL_HORAS", str(24 * 7)))
+CACHE_RESPOSTAS_ATIVO = os.getenv("LLM_CACHE_DESATIVADO", "").lower() not in ("1", "true", "sim")
+
+
+class TokenBucket:
+    """Token bucket thread-safe: libera `taxa` requisições por segundo com rajada `capacidade`"""
+
+    def __init__(self, taxa: float, capacidade: int):
+        self.taxa = max(taxa, 0.001)
+        self.capacidade = max(1, capacidade)
+        self._tokens = float(self.capacidade)
+        self._ultima_recarga = time.monotonic()
+        self._trava = threading.Lock()
+
+    def _reservar(self) -> float:
+        """Consome um token e retorna quanto esperar até ele estar disponível"""
+        with self._trava:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade,
+                               self._tokens + (agora - self._ultima_recarga) * self.taxa)
+            self._ultima_recarga = agora
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.taxa
+
+    def aguardar(self):
+        """Bloqueia até haver um token disponível"""
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+
+class LLMGateway:
+    """Ponto único de acesso à API do Claude, compartilhado entre sessões"""
+
+    def __init__(self, max_simultaneas: int = MAX_REQUISICOES_SIMULTANEAS,
+                 requisicoes_por_minuto: float = REQUISICOES_POR_MINUTO,
+                 rajada: int = RAJADA_MAXIMA, max_tentativas: int = MAX_TENTATIVAS):
+        """
+        Inicializa o gateway
+
+        Args:
+            max_simultaneas: Requisições em andamento ao mesmo tempo
+            requisicoes_por_minuto: Ritmo sustentado de novas requisições
+            rajada: Requisições que podem sair de uma vez após período ocioso
+            max_tentativas: Total de tentativas por chamada
+        """
+        self.max_tentativas = max(1, max_tentativas)
+        self._semaforo = threading.BoundedSemaphore(max(1, max_simultaneas))
+        self._bucket = TokenBucket(requisicoes_por_minuto / 60.0, rajada)
+        self._cliente = None
+        self._api_key = None
+        self._max_simultaneas = max(1, max_simultaneas)
+        self._trava = threading.Lock()
+        self.cache_respostas = DiskCache(
+            CACHE_RESPOSTAS_DIR,
+            ttl_horas=TTL_RESPOSTAS_HORAS,
+            max_bytes=CACHE_RESPOSTAS_MAX_MB * 1024 * 1024
+        )
+        self._tokens_economizados = {'entrada': 0, 'saida': 0}
+
+    def _obter_api_key(self) -> Optional[str]:
+        load_dotenv()
+        return os.getenv("ANTHROPIC_API_KEY")
+
+    def configurado(self) -> bool:
+        """Indica se a chave da API está disponível"""
+        return bool(self._obter_api_key())
+
+    def cliente(self) -> Optional[anthropic.Anthropic]:
+        """Retorna o cliente compartilhado (um pool de conexões para todo o processo)"""
+        api_key = self._obter_api_key()
+        if not api_key:
+            return None
+
+        with self._trava:
+            if self._cliente is None or self._api_key != api_key:
+                # As novas tentativas ficam a cargo do gateway (max_retries=0)
+                self._cliente = anthropic.Anthropic(
+                    api_key=api_key,
+                    max_retries=0,
+                    timeout=TIMEOUT_REQUISICAO,
+                    http_client=anthropic.DefaultHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=self._max_simultaneas * 2,
+                            max_keepalive_connections=self._max_simultaneas
+                        )
+                    )
+                )
+                self._api_key = api_key
+            return self._cliente
+
+    def _cliente_obrigatorio(self) -> anthropic.Anthropic:
+        cliente = self.cliente()
+        if cliente is None:
+            raise RuntimeError("Chave da API do Anthropic não encontrada. Configure no arquivo .env")
+        return cliente
+
+    def _deve_tentar_novamente(self, erro: Exception) -> bool:
+        if isinstance(erro, (anthropic.APIConnectionError, anthropic.RateLimitError,
+                             anthropic.InternalServerError)):
+            return True
+        # 529 (overloaded) nem sempre tem classe própria no SDK
+        if isinstance(erro, anthropic.APIStatusError):
+            return erro.status_code in (408, 409, 429) or erro.status_code >= 500
+        return False
+
+    def _tempo_espera(self, erro: Exception, tentativa: int) -> float:
+        """Backoff exponencial com jitter completo, respeitando retry-after quando enviado"""
+        resposta = getattr(erro, "response", None)
+        if resposta is not None:
+            retry_after = resposta.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), BACKOFF_MAXIMO)
+            except ValueError:
+                pass
+        limite = min(BACKOFF_MAXIMO, BACKOFF_BASE * (2 ** tentativa))
+        return random.uniform(0, limite)
+
+    def _aplicar_contexto(self, kwargs: dict, contexto_cacheavel: Optional[str]) -> dict:
+        """
+        Envia o contexto estável como bloco de sistema marcado para prompt caching
+
+        O cache da API é indexado pelo conteúdo do prefixo: quando o perfil muda,
+        o texto muda e a próxima chamada grava um novo cache automaticamente.
+        """
+        if not contexto_cacheavel:
+            return kwargs
+
+        bloco = {
+            "type": "text",
+            "text": contexto_cacheavel,
+            "cache_control": {"type": "ephemeral"}
+        }
+        sistema = kwargs.get("system")
+        if isinstance(sistema, str):
+            blocos = [bloco, {"type": "text", "text": sistema}]
+        else:
+            blocos = [bloco] + list(sistema or [])
+        return dict(kwargs, system=blocos)
+
+    def _chave_cache(self, kwargs: dict) -> str:
+        """Chave da resposta: modelo + hash do prompt e de todos os parâmetros"""
+        conteudo = json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+        resumo = hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+        return f"{kwargs.get('model', '')}:{resumo}"
+
+    def _resposta_em_cache(self, chave: str):
+        dados = self.cache_respostas.get(chave)
+        if dados is None:
+            return None
+        try:
+            resposta = anthropic.types.Message.model_validate(dados)
+        except Exception:
+            self.cache_respostas.delete(chave)
+            return None
+
+        uso = resposta.usage
+        with self._trava:
+            self._tokens_economizados['entrada'] += uso.input_tokens or 0
+            self._tokens_economizados['saida'] += uso.output_tokens or 0
+        return resposta
+
+    def criar_mensagem(self, contexto_cacheavel: Optional[str] = None,
+                       memoizar: bool = True, **kwargs):
+        """
+        Equivalente a `client.messages.create`, com limites e novas tentativas
+
+        Respostas são memoizadas em disco por (modelo, prompt, parâmetros).
+        Gerações criativas, que devem variar a cada pedido, passam `memoizar=False`.
+
+        Args:
+            contexto_cacheavel: Prefixo estável (ex.: perfil do Cérebro) enviado com prompt caching
+            memoizar: Reaproveita a resposta de uma chamada idêntica anterior
+            **kwargs: Mesmos argumentos de `messages.create`
+
+        Returns:
+            Resposta da API
+        """
+        cliente = self._cliente_obrigatorio()
+        kwargs = self._aplicar_contexto(kwargs, contexto_cacheavel)
+
+        chave = None
+        if memoizar and CACHE_RESPOSTAS_ATIVO:
+            chave = self._chave_cache(kwargs)
+            resposta = self._resposta_em_cache(chave)
+            if resposta is not None:
+                return resposta
+
+        for tentativa in range(self.max_tentativas):
+            self._bucket.aguardar()
+            try:
+                with self._semaforo:
+                    resposta = cliente.messages.create(**kwargs)
+                if chave:
+                    self.cache_respostas.set(chave, resposta.model_dump(mode='json'))
+                return resposta
+            except Exception as e:
+                if tentativa + 1 >= self.max_tentativas or not self._deve_tentar_novamente(e):
+                    raise
+                espera = self._tempo_espera(e, tentativa)
+                logger.warning(f"Falha na API do Claude ({e}); nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+
+    def stream_texto(self, contexto_cacheavel: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """
+        Equivalente a `client.messages.stream(...).text_stream`, com limites e novas tentativas
+
+        Só tenta novamente se nenhum trecho tiver sido entregue, para não
+        duplicar texto já exibido.
+
+        Args:
+            contexto_cacheavel: Prefixo estável (ex.: perfil do Cérebro) enviado com prompt caching
+            **kwargs: Mesmos argumentos de `messages.stream`
+
+        Yields:
+            Trechos de texto conforme chegam da API
+        """
+        cliente = self._cliente_obrigatorio()
+        kwargs = self._aplicar_contexto(kwargs, contexto_cacheavel)
+
+        for tentativa in range(self.max_tentativas):
+            self._bucket.aguardar()
+            entregou = False
+            try:
+                with self._semaforo:
+                    with cliente.messages.stream(**kwargs) as stream:
+                        for texto in stream.text_stream:
+                            entregou = True
+                            yield texto
+                return
+            except Exception as e:
+                if entregou or tentativa + 1 >= self.max_tentativas or not self._deve_tentar_novamente(e):
+                    raise
+                espera = self._tempo_espera(e, tentativa)
+                logger.warning(f"Falha no streaming do Claude ({e}); nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+
+    def estatisticas_cache(self) -> dict:
+        """Acertos/erros da memoização de respostas e tokens que deixaram de ser pagos"""
+        estatisticas = self.cache_respostas.estatisticas()
+        with self._trava:
+            estatisticas['tokens_entrada_economizados'] = self._tokens_economizados['entrada']
+            estatisticas['tokens_saida_economizados'] = self._tokens_economizados['saida']
+        return estatisticas
+
+
+# Instância global (compartilhada entre sessões do Streamlit)
+llm_gateway = LLMGateway()
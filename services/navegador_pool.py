@@ -0,0 +1,236 @@
+"""
+Pool de navegadores headless para páginas renderizadas por JavaScript
+Número fixo de instâncias do Chrome reaproveitadas entre requisições, com
+tempo limite de carregamento, bloqueio de imagens, fontes e mídia e
+reciclagem periódica (por páginas abertas e idade) para limitar memória
+"""
+import os
+import time
+import queue
+import atexit
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Instâncias do Chrome mantidas abertas (somando todas as sessões do Streamlit)
+NAVEGADORES_POOL = int(os.getenv("NAVEGADOR_POOL_TAMANHO", "2"))
+
+# Tempo máximo de carregamento de uma página e de espera por um navegador livre
+TIMEOUT_CARREGAMENTO = float(os.getenv("NAVEGADOR_TIMEOUT_CARREGAMENTO", "20"))
+TIMEOUT_AQUISICAO = float(os.getenv("NAVEGADOR_TIMEOUT_AQUISICAO", "60"))
+
+# Reciclagem: o Chrome acumula memória a cada página aberta
+MAX_PAGINAS_POR_NAVEGADOR = int(os.getenv("NAVEGADOR_MAX_PAGINAS", "50"))
+MAX_IDADE_NAVEGADOR = float(os.getenv("NAVEGADOR_MAX_IDADE_SEGUNDOS", "1800"))
+
+# Navegadores abertos antecipadamente quando um crawler com renderização é criado
+NAVEGADORES_AQUECIDOS = int(os.getenv("NAVEGADOR_AQUECIDOS", "1"))
+
+# Recursos que não influenciam o texto da página
+EXTENSOES_BLOQUEADAS = (
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "avif",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "mp3", "m4a", "ogg", "wav", "m3u8",
+)
+# O padrão "*.png" só casa com a URL terminada na extensão; "*.png?*" cobre as com query string
+RECURSOS_BLOQUEADOS = [padrao.format(ext) for ext in EXTENSOES_BLOQUEADAS for padrao in ("*.{}", "*.{}?*")]
+
+
+class _Navegador:
+    """Instância do Chrome com contadores para a reciclagem"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.criado_em = time.monotonic()
+        self.paginas = 0
+
+    def expirado(self) -> bool:
+        return (self.paginas >= MAX_PAGINAS_POR_NAVEGADOR or
+                time.monotonic() - self.criado_em >= MAX_IDADE_NAVEGADOR)
+
+    def encerrar(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class NavegadorPool:
+    """Pool thread-safe de navegadores headless, criados sob demanda até `tamanho`"""
+
+    def __init__(self, tamanho: int = NAVEGADORES_POOL, timeout_carregamento: float = TIMEOUT_CARREGAMENTO):
+        """
+        Inicializa o pool (nenhum navegador é aberto até o primeiro uso)
+
+        Args:
+            tamanho: Máximo de navegadores abertos ao mesmo tempo
+            timeout_carregamento: Segundos para uma página carregar
+        """
+        self.tamanho = max(1, tamanho)
+        self.timeout_carregamento = timeout_carregamento
+        self._livres = queue.Queue()
+        self._vagas = threading.BoundedSemaphore(self.tamanho)
+        self._caminho_driver = None
+        self._trava = threading.Lock()
+        self._aquecimento = None
+        self._encerrado = False
+
+    def disponivel(self) -> bool:
+        """Indica se o Selenium está instalado"""
+        try:
+            import selenium  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _criar_driver(self):
+        # Selenium só é carregado quando uma página exige navegador
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
+        with self._trava:
+            if self._caminho_driver is None:
+                from webdriver_manager.chrome import ChromeDriverManager
+                # Resolve o chromedriver uma única vez por processo
+                self._caminho_driver = ChromeDriverManager().install()
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+        # Não espera imagens e subrecursos: o DOM pronto basta para extrair o texto
+        chrome_options.page_load_strategy = 'eager'
+
+        driver = webdriver.Chrome(service=Service(self._caminho_driver), options=chrome_options)
+        driver.set_page_load_timeout(self.timeout_carregamento)
+        driver.set_script_timeout(self.timeout_carregamento)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": RECURSOS_BLOQUEADOS})
+        except Exception as e:
+            logger.warning(f"Bloqueio de recursos indisponível: {e}")
+        return _Navegador(driver)
+
+    def _adquirir(self, timeout: float) -> _Navegador:
+        if self._encerrado:
+            raise RuntimeError("Pool de navegadores encerrado")
+
+        # Uma vaga por navegador em uso: reciclagens e falhas devolvem a vaga e
+        # acordam quem estiver esperando
+        if not self._vagas.acquire(timeout=timeout):
+            raise TimeoutError(f"Nenhum navegador livre em {timeout:.0f}s")
+
+        while True:
+            try:
+                navegador = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            if not navegador.expirado():
+                return navegador
+            # Ficou ocioso além da idade máxima: fecha e abre outro
+            navegador.encerrar()
+        try:
+            return self._criar_driver()
+        except Exception:
+            self._vagas.release()
+            raise
+
+    def _descartar(self, navegador: _Navegador):
+        navegador.encerrar()
+        self._vagas.release()
+
+    def _devolver(self, navegador: _Navegador):
+        if self._encerrado or navegador.expirado():
+            # Reciclado: a próxima aquisição abre uma instância nova
+            self._descartar(navegador)
+            return
+        try:
+            # Libera a memória da página anterior antes de voltar ao pool
+            navegador.driver.get("about:blank")
+        except Exception:
+            self._descartar(navegador)
+            return
+        self._livres.put(navegador)
+        self._vagas.release()
+
+    @contextmanager
+    def navegador(self, timeout: float = TIMEOUT_AQUISICAO):
+        """Empresta um driver do pool; instâncias com falha são descartadas"""
+        navegador = self._adquirir(timeout)
+        try:
+            yield navegador.driver
+        except Exception:
+            self._descartar(navegador)
+            raise
+        else:
+            navegador.paginas += 1
+            self._devolver(navegador)
+
+    def renderizar(self, url: str, timeout: float = TIMEOUT_AQUISICAO) -> str:
+        """
+        Abre `url` em um navegador do pool e retorna o HTML após o JavaScript
+
+        Se o carregamento exceder o tempo limite, interrompe a página e usa o
+        que já foi renderizado
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        with self.navegador(timeout) as driver:
+            try:
+                driver.get(url)
+            except TimeoutException:
+                logger.info(f"Carregamento de {url} excedeu {self.timeout_carregamento:.0f}s; usando o parcial")
+                driver.execute_script("window.stop();")
+            return driver.page_source
+
+    def aquecer(self, quantidade: Optional[int] = None):
+        """Abre navegadores antecipadamente (até `quantidade` ou o tamanho do pool)"""
+        alvo = min(self.tamanho, quantidade or self.tamanho)
+        while self._livres.qsize() < alvo and self._vagas.acquire(blocking=False):
+            try:
+                self._livres.put(self._criar_driver())
+            except Exception as e:
+                logger.warning(f"Não foi possível abrir navegador: {e}")
+                return
+            finally:
+                self._vagas.release()
+
+    def aquecer_em_segundo_plano(self, quantidade: Optional[int] = NAVEGADORES_AQUECIDOS):
+        """Executa `aquecer` em uma thread, sem bloquear quem chamou (ignora se já estiver aquecendo)"""
+        with self._trava:
+            if self._encerrado or (self._aquecimento is not None and self._aquecimento.is_alive()):
+                return
+            self._aquecimento = threading.Thread(
+                target=self.aquecer, args=(quantidade,), name="aquecer-navegadores", daemon=True
+            )
+            self._aquecimento.start()
+
+    def liberar(self):
+        """Fecha os navegadores ociosos (o pool volta a abri-los quando precisar)"""
+        while True:
+            try:
+                self._livres.get_nowait().encerrar()
+            except queue.Empty:
+                break
+
+    def encerrar(self):
+        """Fecha todos os navegadores (os emprestados fecham ao serem devolvidos)"""
+        self._encerrado = True
+        self.liberar()
+
+
+# Instância global (compartilhada entre sessões do Streamlit)
+navegador_pool = NavegadorPool()
+atexit.register(navegador_pool.encerrar)
@@ -0,0 +1,126 @@
+"""
+Serviço de transcrição - Pool de modelos Whisper compartilhado
+Carrega cada tamanho de modelo uma única vez por processo e reutiliza
+entre sessões do Streamlit e threads (React, Raio-X e Stalker)
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Modelo usado quando a chamada não especifica um tamanho
+MODELO_PADRAO = os.getenv("WHISPER_MODEL", "base")
+
+# Quantidade máxima de modelos mantidos em memória ao mesmo tempo
+MAX_MODELOS = int(os.getenv("WHISPER_MAX_MODELS", "2"))
+
+
+class TranscriptionEngine:
+    """Pool de modelos Whisper fixados em memória com limite configurável"""
+
+    def __init__(self, max_modelos: int = MAX_MODELOS):
+        """
+        Inicializa o pool
+
+        Args:
+            max_modelos: Número máximo de tamanhos de modelo em memória
+        """
+        self.max_modelos = max(1, max_modelos)
+        self._modelos = OrderedDict()  # tamanho -> modelo (ordem LRU)
+        self._travas_uso = {}  # tamanho -> Lock (o modelo não é thread-safe)
+        self._travas_carga = {}  # tamanho -> Lock (evita carga duplicada)
+        self._trava = threading.Lock()
+
+    def _trava_para(self, travas: dict, tamanho: str) -> threading.Lock:
+        with self._trava:
+            if tamanho not in travas:
+                travas[tamanho] = threading.Lock()
+            return travas[tamanho]
+
+    def obter_modelo(self, tamanho: Optional[str] = None):
+        """
+        Retorna o modelo Whisper do tamanho pedido, carregando apenas uma vez
+
+        Args:
+            tamanho: Tamanho do modelo ("tiny", "base", "small"...)
+
+        Returns:
+            Modelo Whisper carregado
+        """
+        tamanho = tamanho or MODELO_PADRAO
+
+        with self._trava:
+            if tamanho in self._modelos:
+                self._modelos.move_to_end(tamanho)
+                return self._modelos[tamanho]
+
+        # Apenas uma thread carrega cada tamanho; as demais aguardam
+        with self._trava_para(self._travas_carga, tamanho):
+            with self._trava:
+                if tamanho in self._modelos:
+                    self._modelos.move_to_end(tamanho)
+                    return self._modelos[tamanho]
+
+            import whisper
+
+            logger.info(f"Carregando modelo Whisper '{tamanho}'")
+            modelo = whisper.load_model(tamanho)
+
+            with self._trava:
+                self._modelos[tamanho] = modelo
+                while len(self._modelos) > self.max_modelos:
+                    removido, _ = self._modelos.popitem(last=False)
+                    logger.info(f"Modelo Whisper '{removido}' removido do pool")
+
+            return modelo
+
+    def transcrever(self, audio_path: str, idioma: Optional[str] = None,
+                    tamanho: Optional[str] = None) -> str:
+        """
+        Transcreve um arquivo de áudio usando o modelo do pool
+
+        Args:
+            audio_path: Caminho para o arquivo de áudio
+            idioma: Código do idioma (ex: "pt") ou None para detecção automática
+            tamanho: Tamanho do modelo Whisper
+
+        Returns:
+            Texto transcrito
+        """
+        tamanho = tamanho or MODELO_PADRAO
+        modelo = self.obter_modelo(tamanho)
+
+        opcoes = {"language": idioma} if idioma else {}
+
+        with self._trava_para(self._travas_uso, tamanho):
+            result = modelo.transcribe(audio_path, **opcoes)
+
+        return result["text"].strip()
+
+    def modelos_carregados(self):
+        """Lista os tamanhos de modelo atualmente em memória"""
+        with self._trava:
+            return list(self._modelos.keys())
+
+
+# Instância global do pool (compartilhada por todo o processo)
+transcription_engine = TranscriptionEngine()
+
+
+def transcrever_audio(audio_path: str, idioma: Optional[str] = None,
+                      tamanho: Optional[str] = None) -> str:
+    """
+    Ponto de entrada único de transcrição para todas as páginas
+
+    Args:
+        audio_path: Caminho para o arquivo de áudio
+        idioma: Código do idioma ou None para detecção automática
+        tamanho: Tamanho do modelo Whisper
+
+    Returns:
+        Texto transcrito
+    """
+    return transcription_engine.transcrever(audio_path, idioma=idioma, tamanho=tamanho)
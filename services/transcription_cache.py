@@ -0,0 +1,130 @@
+"""
+Cache de transcrições e metadados do yt-dlp
+Chaveado pelo ID canônico do vídeo, com hash do áudio como alternativa
+"""
+import os
+import hashlib
+from typing import Dict, Optional
+from utils.disk_cache import DiskCache
+from services.transcription import transcrever_audio
+
+CACHE_DIR = os.getenv("TRANSCRICAO_CACHE_DIR", "data/cache/transcricoes")
+CACHE_MAX_MB = int(os.getenv("TRANSCRICAO_CACHE_MAX_MB", "200"))
+TTL_TRANSCRICAO_HORAS = 24 * 30  # transcrições não mudam
+TTL_METADADOS_HORAS = 6  # visualizações/curtidas mudam com o tempo
+
+# Campos do yt-dlp usados pelas páginas React, Raio-X e Stalker
+CAMPOS_INFO = [
+    'id', 'extractor_key', 'title', 'uploader', 'duration', 'view_count',
+    'like_count', 'description', 'upload_date', 'thumbnail'
+]
+
+transcription_cache = DiskCache(
+    CACHE_DIR,
+    ttl_horas=TTL_TRANSCRICAO_HORAS,
+    max_bytes=CACHE_MAX_MB * 1024 * 1024
+)
+
+
+def video_id_canonico(info: Dict) -> Optional[str]:
+    """Monta o ID canônico (extrator + id) a partir das informações do yt-dlp"""
+    if not info or not info.get('id'):
+        return None
+    return f"{info.get('extractor_key') or 'generic'}:{info['id']}"
+
+
+def extrair_info_video(url: str) -> Dict:
+    """
+    Extrai as informações do vídeo via yt-dlp, reaproveitando o cache
+
+    Args:
+        url: URL do vídeo
+
+    Returns:
+        Dict com os campos de CAMPOS_INFO e 'video_id'
+    """
+    url = url.strip()
+    video_id = transcription_cache.get(f"url:{url}")
+    if video_id:
+        info = transcription_cache.get(f"meta:{video_id}")
+        if info:
+            return info
+
+    import yt_dlp
+
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': False,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info_completa = ydl.extract_info(url, download=False)
+
+    info = {campo: info_completa.get(campo) for campo in CAMPOS_INFO}
+    info['video_id'] = video_id_canonico(info_completa)
+
+    if info['video_id']:
+        transcription_cache.set(f"url:{url}", info['video_id'], ttl_horas=TTL_TRANSCRICAO_HORAS)
+        transcription_cache.set(f"meta:{info['video_id']}", info, ttl_horas=TTL_METADADOS_HORAS)
+
+    return info
+
+
+def hash_audio(audio_path: str) -> str:
+    """Calcula o SHA-256 do conteúdo do arquivo de áudio"""
+    sha = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _idioma_chave(idioma: Optional[str]) -> str:
+    """Parte da chave que separa transcrições por idioma (forçado ou automático)"""
+    return idioma or "auto"
+
+
+def obter_transcricao(video_id: Optional[str], idioma: Optional[str] = None) -> Optional[str]:
+    """
+    Busca uma transcrição já feita para o vídeo
+
+    Args:
+        video_id: ID canônico do vídeo
+        idioma: Código do idioma usado na transcrição ou None para detecção automática
+
+    Returns:
+        Texto transcrito ou None se não estiver em cache
+    """
+    if not video_id:
+        return None
+    return transcription_cache.get(f"transcricao:{_idioma_chave(idioma)}:{video_id}")
+
+
+def transcrever_com_cache(audio_path: str, video_id: Optional[str] = None,
+                          idioma: Optional[str] = None) -> str:
+    """
+    Transcreve o áudio só se o mesmo conteúdo ainda não foi transcrito
+
+    Args:
+        audio_path: Caminho para o arquivo de áudio
+        video_id: ID canônico do vídeo (opcional)
+        idioma: Código do idioma ou None para detecção automática
+
+    Returns:
+        Texto transcrito
+    """
+    # O idioma faz parte da chave: transcrição forçada em "pt" e detecção automática
+    # podem produzir textos diferentes para o mesmo áudio
+    chave_audio = f"audio:{_idioma_chave(idioma)}:{hash_audio(audio_path)}"
+    transcricao = transcription_cache.get(chave_audio)
+
+    if not transcricao:
+        transcricao = transcrever_audio(audio_path, idioma=idioma)
+        if transcricao:
+            transcription_cache.set(chave_audio, transcricao)
+
+    if transcricao and video_id:
+        transcription_cache.set(f"transcricao:{_idioma_chave(idioma)}:{video_id}", transcricao)
+
+    return transcricao
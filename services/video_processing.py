@@ -7,9 +7,8 @@ import tempfile
 import subprocess
 import json
 from typing import Dict, Optional, Tuple
-import yt_dlp
-import whisper
 import streamlit as st
+from services.transcription_cache import extrair_info_video, obter_transcricao, transcrever_com_cache
 
 
 class VideoProcessor:
@@ -17,19 +16,14 @@ class VideoProcessor:
     
     def __init__(self):
         """Inicializa o processador de vídeo"""
-        self.whisper_model = None
-        self.temp_dir = tempfile.mkdtemp()
+        self._temp_dir = None
     
-    def _load_whisper_model(self):
-        """Carrega o modelo Whisper apenas quando necessário"""
-        if self.whisper_model is None:
-            try:
-                self.whisper_model = whisper.load_model("base")
-                st.info("🎯 Modelo Whisper carregado com sucesso")
-            except Exception as e:
-                st.error(f"❌ Erro ao carregar modelo Whisper: {str(e)}")
-                return False
-        return True
+    @property
+    def temp_dir(self) -> str:
+        """Diretório temporário, criado só no primeiro download"""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp()
+        return self._temp_dir
     
     def extract_video_metadata(self, url: str) -> Dict:
         """
@@ -42,38 +36,32 @@ class VideoProcessor:
             Dict com metadados do vídeo
         """
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-            }
+            info = extrair_info_video(url)
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                # Determina a plataforma
-                platform = "YouTube"
-                if "tiktok.com" in url:
-                    platform = "TikTok"
-                elif "instagram.com" in url:
-                    platform = "Instagram"
-                
-                # Formata duração
-                duration = info.get('duration', 0)
-                duration_formatted = f"{duration // 60}:{duration % 60:02d}" if duration else "N/A"
-                
-                return {
-                    'platform': platform,
-                    'title': info.get('title', 'Título não disponível'),
-                    'duration': duration_formatted,
-                    'duration_seconds': duration,
-                    'author': info.get('uploader', 'Autor não disponível'),
-                    'description': info.get('description', ''),
-                    'view_count': info.get('view_count', 0),
-                    'upload_date': info.get('upload_date', ''),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'url': url
-                }
+            # Determina a plataforma
+            platform = "YouTube"
+            if "tiktok.com" in url:
+                platform = "TikTok"
+            elif "instagram.com" in url:
+                platform = "Instagram"
+            
+            # Formata duração
+            duration = info.get('duration') or 0
+            duration_formatted = f"{int(duration) // 60}:{int(duration) % 60:02d}" if duration else "N/A"
+            
+            return {
+                'platform': platform,
+                'video_id': info.get('video_id'),
+                'title': info.get('title') or 'Título não disponível',
+                'duration': duration_formatted,
+                'duration_seconds': duration,
+                'author': info.get('uploader') or 'Autor não disponível',
+                'description': info.get('description') or '',
+                'view_count': info.get('view_count') or 0,
+                'upload_date': info.get('upload_date') or '',
+                'thumbnail': info.get('thumbnail') or '',
+                'url': url
+            }
                 
         except Exception as e:
             st.error(f"❌ Erro ao extrair metadados: {str(e)}")
@@ -101,6 +89,8 @@ class VideoProcessor:
         Returns:
             Caminho para o arquivo de áudio baixado ou None se erro
         """
+        import yt_dlp
+        
         try:
             audio_path = os.path.join(self.temp_dir, "audio.%(ext)s")
             
@@ -130,25 +120,20 @@ class VideoProcessor:
             st.error(f"❌ Erro ao baixar áudio: {str(e)}")
             return None
     
-    def transcribe_audio(self, audio_path: str) -> Optional[str]:
+    def transcribe_audio(self, audio_path: str, video_id: Optional[str] = None) -> Optional[str]:
         """
         Transcreve o áudio usando Whisper
         
         Args:
             audio_path: Caminho para o arquivo de áudio
+            video_id: ID canônico do vídeo, usado como chave do cache
             
         Returns:
             Texto transcrito ou None se erro
         """
         try:
-            if not self._load_whisper_model():
-                return None
-            
-            # Transcreve o áudio
-            result = self.whisper_model.transcribe(audio_path)
-            
-            # Extrai o texto
-            return result["text"].strip()
+            # Transcreve com o pool de modelos compartilhado e cache
+            return transcrever_com_cache(audio_path, video_id=video_id)
                 
         except Exception as e:
             st.error(f"❌ Erro na transcrição: {str(e)}")
@@ -173,25 +158,31 @@ class VideoProcessor:
         if 'error' in metadata:
             return metadata
         
-        # 2. Baixar áudio
-        st.info("🎵 Baixando áudio do vídeo...")
-        audio_path = self.download_audio(url)
-        
-        if not audio_path:
-            return {**metadata, 'transcription': None, 'error': 'Falha ao baixar áudio'}
+        # 2. Reaproveitar transcrição já feita para este vídeo
+        transcription = obter_transcricao(video_id=metadata.get('video_id'))
         
-        # 3. Transcrever áudio
-        st.info("🎯 Transcrevendo áudio com Whisper...")
-        transcription = self.transcribe_audio(audio_path)
-        
-        # 4. Limpar arquivos temporários
-        try:
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-        except:
-            pass
+        if transcription:
+            st.info("⚡ Transcrição encontrada no cache")
+        else:
+            # 3. Baixar áudio
+            st.info("🎵 Baixando áudio do vídeo...")
+            audio_path = self.download_audio(url)
+            
+            if not audio_path:
+                return {**metadata, 'transcription': None, 'error': 'Falha ao baixar áudio'}
+            
+            # 4. Transcrever áudio
+            st.info("🎯 Transcrevendo áudio com Whisper...")
+            transcription = self.transcribe_audio(audio_path, video_id=metadata.get('video_id'))
+            
+            # 5. Limpar arquivos temporários
+            try:
+                if os.path.exists(audio_path):
+                    os.remove(audio_path)
+            except:
+                pass
         
-        # 5. Retornar resultado completo
+        # 6. Retornar resultado completo
         result = {
             **metadata,
             'transcription': transcription,
@@ -245,8 +236,9 @@ class VideoProcessor:
         """Limpa arquivos temporários"""
         try:
             import shutil
-            if os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
+            if self._temp_dir and os.path.exists(self._temp_dir):
+                shutil.rmtree(self._temp_dir)
+            self._temp_dir = None
         except:
             pass
 
@@ -291,9 +283,18 @@ def get_video_transcription(url: str) -> Optional[str]:
     Returns:
         Texto transcrito ou None
     """
+    try:
+        video_id = extrair_info_video(url).get('video_id')
+    except Exception:
+        video_id = None
+    
+    transcription = obter_transcricao(video_id=video_id)
+    if transcription:
+        return transcription
+    
     audio_path = video_processor.download_audio(url)
     if audio_path:
-        transcription = video_processor.transcribe_audio(audio_path)
+        transcription = video_processor.transcribe_audio(audio_path, video_id=video_id)
         # Limpar arquivo temporário
         try:
             os.remove(audio_path)
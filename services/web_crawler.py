@@ -4,19 +4,29 @@ Vasculha sites completos, extrai conteúdo e transcreve vídeos
 """
 import os
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import time
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, as_completed
+from requests.adapters import HTTPAdapter
 import json
-import re
 from services.video_processing import get_video_transcription
+from utils.rate_limit import HostRateLimiter
+from utils.http_cache import http_cache
+from utils.html_extracao import extrair_pagina, extrair_pagina_rapida, extracao_rapida_disponivel
+from services.navegador_pool import navegador_pool
+
+# Limites do crawling concorrente
+MAX_CONEXOES = 8  # conexões simultâneas no total
+MAX_CONEXOES_POR_HOST = 2  # conexões simultâneas por domínio
+INTERVALO_POR_HOST = 0.5  # segundos entre requisições ao mesmo domínio
+MAX_SITES_PARALELOS = 5  # sites vasculhados ao mesmo tempo
+
+# Extração com lxml em passada única (cai no BeautifulSoup se o lxml não estiver instalado)
+EXTRACAO_RAPIDA = os.getenv("WEB_CRAWLER_EXTRACAO_RAPIDA", "1") == "1"
+
+# Páginas cujo HTML estático tem menos palavras que isso (casca de app JavaScript)
+# são renderizadas no pool de navegadores headless
+RENDERIZAR_JS = os.getenv("WEB_CRAWLER_RENDERIZAR_JS", "1") == "1"
+MIN_PALAVRAS_ESTATICO = int(os.getenv("WEB_CRAWLER_MIN_PALAVRAS", "50"))
 
 
 class WebCrawler:
@@ -28,31 +38,21 @@ class WebCrawler:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        self.driver = None
-        self.visited_urls = set()
+        adapter = HTTPAdapter(pool_connections=MAX_CONEXOES, pool_maxsize=MAX_CONEXOES)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = HostRateLimiter(
+            max_conexoes=MAX_CONEXOES,
+            max_por_host=MAX_CONEXOES_POR_HOST,
+            intervalo_minimo=INTERVALO_POR_HOST
+        )
+        self.extracao_rapida = EXTRACAO_RAPIDA and extracao_rapida_disponivel()
+        self.renderizar_js = RENDERIZAR_JS and navegador_pool.disponivel()
+        if self.renderizar_js:
+            # O Chrome leva alguns segundos para abrir: começa antes da primeira página precisar
+            navegador_pool.aquecer_em_segundo_plano()
         self.max_pages = 10  # Limite de páginas por site
         
-    def _setup_selenium(self):
-        """Configura o Selenium WebDriver"""
-        if self.driver is None:
-            try:
-                chrome_options = Options()
-                chrome_options.add_argument('--headless')
-                chrome_options.add_argument('--no-sandbox')
-                chrome_options.add_argument('--disable-dev-shm-usage')
-                chrome_options.add_argument('--disable-gpu')
-                chrome_options.add_argument('--window-size=1920,1080')
-                
-                self.driver = webdriver.Chrome(
-                    service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
-                    options=chrome_options
-                )
-                return True
-            except Exception as e:
-                st.error(f"❌ Erro ao configurar Selenium: {str(e)}")
-                return False
-        return True
-    
     def extract_page_content(self, url):
         """
         Extrai conteúdo de uma página específica
@@ -64,72 +64,17 @@ class WebCrawler:
             Dict com conteúdo extraído
         """
         try:
-            # Tentar primeiro com requests
-            response = self.session.get(url, timeout=10)
+            # Tentar primeiro com requests (respeitando os limites por domínio);
+            # páginas inalteradas voltam do cache HTTP (304) sem novo parsing
+            response = http_cache.get(self.session, url, limitador=self.rate_limiter, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extrair informações básicas
-            title = soup.find('title')
-            title = title.get_text().strip() if title else "Sem título"
-            
-            # Remover scripts e estilos
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Extrair texto principal
-            content_selectors = [
-                'article', 'main', '.content', '.post', '.entry',
-                '.article-content', '.post-content', '.entry-content'
-            ]
-            
-            main_content = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    main_content = content_elem.get_text(separator=' ', strip=True)
-                    break
-            
-            # Se não encontrou conteúdo específico, pega o body
-            if not main_content:
-                body = soup.find('body')
-                if body:
-                    main_content = body.get_text(separator=' ', strip=True)
-            
-            # Extrair links internos
-            internal_links = []
-            base_domain = urlparse(url).netloc
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                full_url = urljoin(url, href)
-                
-                # Verificar se é link interno
-                if urlparse(full_url).netloc == base_domain:
-                    link_text = link.get_text().strip()
-                    if link_text and len(link_text) > 5:  # Links com texto significativo
-                        internal_links.append({
-                            'url': full_url,
-                            'text': link_text[:100]
-                        })
+            page_data = http_cache.processar(response, "web_crawler", lambda r: self._parse_page(url, r))
             
-            # Extrair vídeos
-            videos = self._extract_videos(soup, url)
+            if self.renderizar_js and page_data['word_count'] < MIN_PALAVRAS_ESTATICO:
+                page_data = self._render_page(url, page_data)
             
-            # Extrair imagens
-            images = self._extract_images(soup, url)
-            
-            return {
-                'url': url,
-                'title': title,
-                'content': main_content[:5000],  # Limitar tamanho
-                'word_count': len(main_content.split()),
-                'internal_links': internal_links[:20],  # Limitar links
-                'videos': videos,
-                'images': images[:10],  # Limitar imagens
-                'status': 'success'
-            }
+            return page_data
             
         except Exception as e:
             return {
@@ -144,57 +89,92 @@ class WebCrawler:
                 'error': str(e)
             }
     
-    def _extract_videos(self, soup, base_url):
-        """Extrai vídeos da página"""
-        videos = []
+    def _render_page(self, url, static_data):
+        """
+        Renderiza a página no pool de navegadores (conteúdo gerado por JavaScript)
         
-        # YouTube embeds
-        youtube_iframes = soup.find_all('iframe', src=re.compile(r'youtube\.com|youtu\.be'))
-        for iframe in youtube_iframes:
-            src = iframe.get('src', '')
-            if 'youtube.com/embed/' in src:
-                video_id = src.split('/embed/')[-1].split('?')[0]
-                videos.append({
-                    'platform': 'YouTube',
-                    'url': f"https://www.youtube.com/watch?v={video_id}",
-                    'embed_url': src,
-                    'title': iframe.get('title', 'Vídeo YouTube')
-                })
+        Returns:
+            Dados extraídos do HTML renderizado, ou `static_data` se o navegador
+            falhar ou não trouxer mais texto
+        """
+        try:
+            html = navegador_pool.renderizar(url)
+        except Exception:
+            return static_data
         
-        # Vídeos HTML5
-        video_tags = soup.find_all('video')
-        for video in video_tags:
-            src = video.get('src')
-            if src:
-                videos.append({
-                    'platform': 'HTML5',
-                    'url': urljoin(base_url, src),
-                    'title': video.get('title', 'Vídeo HTML5')
-                })
+        if self.extracao_rapida:
+            rendered_data = extrair_pagina_rapida(url, html)
+        else:
+            rendered_data = extrair_pagina(url, html)
         
-        return videos
+        if rendered_data['word_count'] <= static_data['word_count']:
+            return static_data
+        rendered_data['rendered'] = True
+        return rendered_data
     
-    def _extract_images(self, soup, base_url):
-        """Extrai imagens da página"""
-        images = []
-        
-        img_tags = soup.find_all('img')
-        for img in img_tags:
-            src = img.get('src')
-            if src:
-                full_url = urljoin(base_url, src)
-                alt_text = img.get('alt', '')
-                
-                # Filtrar imagens muito pequenas ou de sistema
-                if not any(skip in src.lower() for skip in ['icon', 'logo', 'avatar', 'thumb']):
-                    images.append({
-                        'url': full_url,
-                        'alt': alt_text,
-                        'title': img.get('title', '')
-                    })
-        
-        return images
+    def _parse_page(self, url, response):
+        """Extrai título, texto, links, vídeos e imagens do HTML baixado"""
+        if self.extracao_rapida:
+            return extrair_pagina_rapida(url, response.content)
+        return extrair_pagina(url, response.content)
     
+    def _crawl_site(self, start_url, max_pages=5, executor=None, on_page=None):
+        """
+        Vasculha um site buscando várias páginas em paralelo
+
+        Args:
+            start_url: URL inicial
+            max_pages: Máximo de páginas para vasculhar
+            executor: Pool de threads compartilhado (cria um próprio se None)
+            on_page: Callback chamado a cada página concluída (page_data, concluídas, total)
+
+        Returns:
+            Lista com dados das páginas, na ordem em que foram descobertas
+        """
+        proprio_executor = executor is None
+        if proprio_executor:
+            executor = ThreadPoolExecutor(max_workers=MAX_CONEXOES_POR_HOST)
+
+        descobertas = [start_url]  # ordem de descoberta (fila de visita)
+        vistos = {start_url}
+        resultados = {}  # índice de descoberta -> page_data
+        em_andamento = {}  # future -> índice de descoberta
+        proximo = 0
+
+        try:
+            while proximo < len(descobertas) or em_andamento:
+                # Mantém a fila cheia até atingir o limite de páginas
+                while (proximo < len(descobertas)
+                       and len(resultados) + len(em_andamento) < max_pages
+                       and len(em_andamento) < MAX_CONEXOES_POR_HOST):
+                    future = executor.submit(self.extract_page_content, descobertas[proximo])
+                    em_andamento[future] = proximo
+                    proximo += 1
+
+                if not em_andamento:
+                    break
+
+                concluidos, _ = wait(list(em_andamento), return_when=FIRST_COMPLETED)
+                for future in concluidos:
+                    indice = em_andamento.pop(future)
+                    page_data = future.result()
+                    resultados[indice] = page_data
+
+                    # Adicionar links internos à lista de URLs para visitar
+                    if page_data['status'] == 'success':
+                        for link in page_data['internal_links']:
+                            if link['url'] not in vistos and len(descobertas) < max_pages * 2:
+                                vistos.add(link['url'])
+                                descobertas.append(link['url'])
+
+                    if on_page:
+                        on_page(page_data, len(resultados), min(len(descobertas), max_pages))
+        finally:
+            if proprio_executor:
+                executor.shutdown(wait=False)
+
+        return [resultados[indice] for indice in sorted(resultados)]
+
     def crawl_website_complete(self, start_url, max_pages=5):
         """
         Vasculha um site completo
@@ -208,36 +188,14 @@ class WebCrawler:
         """
         st.info(f"🕷️ Iniciando crawling completo de: {start_url}")
         
-        pages_data = []
-        urls_to_visit = [start_url]
-        visited = set()
-        
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        for i, url in enumerate(urls_to_visit[:max_pages]):
-            if url in visited:
-                continue
-                
-            visited.add(url)
-            
-            # Atualizar progresso
-            progress = (i + 1) / min(len(urls_to_visit), max_pages)
-            progress_bar.progress(progress)
-            status_text.text(f"Processando página {i+1}/{min(len(urls_to_visit), max_pages)}: {url[:60]}...")
-            
-            # Extrair conteúdo da página
-            page_data = self.extract_page_content(url)
-            pages_data.append(page_data)
-            
-            # Adicionar links internos à lista de URLs para visitar
-            if page_data['status'] == 'success':
-                for link in page_data['internal_links']:
-                    if link['url'] not in visited and len(urls_to_visit) < max_pages * 2:
-                        urls_to_visit.append(link['url'])
-            
-            # Delay para não sobrecarregar o servidor
-            time.sleep(1)
+        def atualizar_progresso(page_data, concluidas, total):
+            progress_bar.progress(min(concluidas / max(total, 1), 1.0))
+            status_text.text(f"Processando página {concluidas}/{total}: {page_data['url'][:60]}...")
+        
+        pages_data = self._crawl_site(start_url, max_pages, on_page=atualizar_progresso)
         
         progress_bar.progress(1.0)
         status_text.text(f"✅ Crawling concluído! {len(pages_data)} páginas processadas.")
@@ -340,11 +298,7 @@ class WebCrawler:
     
     def cleanup(self):
         """Limpa recursos"""
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+        navegador_pool.liberar()
 
 
 # Instância global do crawler
@@ -367,15 +321,38 @@ def crawl_multiple_sites(urls, max_pages_per_site=3):
     
     st.info(f"🌐 Iniciando crawling de {len(urls)} sites...")
     
+    # Sites diferentes em paralelo; páginas de cada site compartilham o mesmo pool
+    pages_por_site = {}
+    status_text = st.empty()
+    
+    with ThreadPoolExecutor(max_workers=MAX_CONEXOES) as page_executor, \
+            ThreadPoolExecutor(max_workers=MAX_SITES_PARALELOS) as site_executor:
+        futures = {
+            site_executor.submit(web_crawler._crawl_site, url, max_pages_per_site, page_executor): i
+            for i, url in enumerate(urls)
+        }
+        
+        for concluidos, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            url = urls[i]
+            try:
+                pages_por_site[i] = future.result()
+                status_text.text(f"🔍 Sites concluídos: {concluidos}/{len(urls)}")
+                st.write(f"✅ Site {i+1}/{len(urls)}: {url} ({len(pages_por_site[i])} páginas)")
+            except Exception as e:
+                st.error(f"❌ Erro ao processar site {url}: {str(e)}")
+    
+    # Mantém a ordem dos sites informada pelo usuário
     for i, url in enumerate(urls):
-        st.subheader(f"🔍 Site {i+1}/{len(urls)}: {url}")
+        if i not in pages_por_site:
+            continue
+        
+        pages_data = pages_por_site[i]
+        all_pages_data.extend(pages_data)
         
         try:
-            # Crawl do site
-            pages_data = web_crawler.crawl_website_complete(url, max_pages_per_site)
-            all_pages_data.extend(pages_data)
-            
             # Analisar vídeos
+            st.subheader(f"🔍 Site {i+1}/{len(urls)}: {url}")
             video_transcriptions = web_crawler.analyze_videos_in_pages(pages_data)
             all_video_transcriptions.extend(video_transcriptions)
             
@@ -0,0 +1,266 @@
+"""
+Agendador de tarefas para processos de longa duração
+Execução única entre processos (trava em arquivo), recuperação de execuções
+perdidas, intervalos com jitter, parada imediata e registro de cada execução
+"""
+import os
+import json
+import time
+import random
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ESTADO_AGENDADOR = os.getenv("AGENDADOR_ESTADO", "data/agendador_estado.json")
+REGISTRO_EXECUCOES = os.getenv("AGENDADOR_REGISTRO", "logs/agendador_execucoes.jsonl")
+DIRETORIO_TRAVAS = os.getenv("AGENDADOR_TRAVAS", "data/travas")
+
+
+class TravaArquivo:
+    """Trava exclusiva e não bloqueante em arquivo, válida entre processos e threads"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = None
+
+    def adquirir(self) -> bool:
+        """Tenta obter a trava; retorna False se outro processo/thread já a tiver"""
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        arquivo = open(self.caminho, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            return False
+
+        # Identifica quem está com a trava (apenas informativo)
+        arquivo.seek(0)
+        arquivo.truncate()
+        arquivo.write(f"{os.getpid()} {datetime.now().isoformat()}\n")
+        arquivo.flush()
+        self._arquivo = arquivo
+        return True
+
+    def liberar(self):
+        if self._arquivo is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._arquivo.seek(0)
+                msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+@dataclass
+class Tarefa:
+    """Tarefa agendada por intervalo (`intervalo`) ou horário diário (`horario` "HH:MM")"""
+    nome: str
+    funcao: Callable[[], object]
+    intervalo: Optional[timedelta] = None
+    horario: Optional[str] = None
+    jitter: timedelta = timedelta(0)
+    trava: Optional[str] = None  # tarefas com a mesma trava nunca rodam juntas
+    proxima: Optional[datetime] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if (self.intervalo is None) == (self.horario is None):
+            raise ValueError("Informe `intervalo` ou `horario` (apenas um)")
+        self.trava = self.trava or self.nome
+
+    def proxima_execucao(self, referencia: datetime) -> datetime:
+        """Próximo horário depois de `referencia`, com jitter aleatório"""
+        ruido = random.uniform(0, self.jitter.total_seconds())
+        if self.intervalo is not None:
+            # Jitter em torno do intervalo, para espalhar execuções de vários processos
+            return referencia + self.intervalo + timedelta(seconds=ruido - self.jitter.total_seconds() / 2)
+
+        hora, minuto = (int(parte) for parte in self.horario.split(":"))
+        alvo = referencia.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if alvo <= referencia:
+            alvo += timedelta(days=1)
+        return alvo + timedelta(seconds=ruido)
+
+    def perdida_desde(self, ultima: Optional[datetime], agora: datetime) -> bool:
+        """Indica se uma execução deveria ter ocorrido entre `ultima` e `agora`"""
+        if ultima is None:
+            return True
+        if self.intervalo is not None:
+            return agora - ultima >= self.intervalo
+        hora, minuto = (int(parte) for parte in self.horario.split(":"))
+        ultimo_alvo = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if ultimo_alvo > agora:
+            ultimo_alvo -= timedelta(days=1)
+        return ultima < ultimo_alvo
+
+
+class Agendador:
+    """Executa tarefas agendadas em um laço único, parável a qualquer momento"""
+
+    def __init__(self, arquivo_estado: str = ESTADO_AGENDADOR,
+                 arquivo_registro: str = REGISTRO_EXECUCOES,
+                 diretorio_travas: str = DIRETORIO_TRAVAS,
+                 recuperar_perdidas: bool = True):
+        """
+        Inicializa o agendador
+
+        Args:
+            arquivo_estado: JSON com o início da última execução de cada tarefa
+            arquivo_registro: JSONL onde cada execução é registrada
+            diretorio_travas: Onde ficam os arquivos de trava (um por `Tarefa.trava`)
+            recuperar_perdidas: Executa na partida as tarefas cujo horário passou sem execução
+        """
+        self.arquivo_estado = arquivo_estado
+        self.arquivo_registro = arquivo_registro
+        self.diretorio_travas = diretorio_travas
+        self.recuperar_perdidas = recuperar_perdidas
+        self.tarefas: List[Tarefa] = []
+        self.execucoes = deque(maxlen=200)
+        self._parar = threading.Event()
+        self._trava_estado = threading.Lock()
+
+    # === Estado persistido (recuperação após reinício) ===
+
+    def _ler_estado(self) -> Dict[str, str]:
+        try:
+            with open(self.arquivo_estado, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_ultima(self, tarefa: Tarefa, inicio: datetime):
+        with self._trava_estado:
+            estado = self._ler_estado()
+            estado[tarefa.nome] = inicio.isoformat()
+            os.makedirs(os.path.dirname(self.arquivo_estado) or ".", exist_ok=True)
+            temporario = f"{self.arquivo_estado}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(estado, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, self.arquivo_estado)
+
+    def _registrar(self, execucao: Dict):
+        self.execucoes.append(execucao)
+        try:
+            os.makedirs(os.path.dirname(self.arquivo_registro) or ".", exist_ok=True)
+            with open(self.arquivo_registro, "a", encoding="utf-8") as f:
+                f.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Não foi possível registrar a execução de {execucao['tarefa']}: {e}")
+
+    # === Tarefas ===
+
+    def adicionar(self, tarefa: Tarefa) -> Tarefa:
+        """Registra uma tarefa; o primeiro horário é calculado ao iniciar"""
+        self.tarefas.append(tarefa)
+        return tarefa
+
+    def executar(self, tarefa: Tarefa, atrasada: bool = False) -> Dict:
+        """
+        Executa uma tarefa agora, se nenhuma outra com a mesma trava estiver rodando
+
+        Returns:
+            Registro da execução: tarefa, inicio, duracao, resultado
+            ("sucesso", "erro" ou "ignorada") e erro, quando houver
+        """
+        inicio = datetime.now()
+        execucao = {"tarefa": tarefa.nome, "inicio": inicio.isoformat(), "atrasada": atrasada}
+
+        trava = TravaArquivo(os.path.join(self.diretorio_travas, f"{tarefa.trava}.lock"))
+        if not trava.adquirir():
+            logger.warning(f"⏭️ {tarefa.nome}: outra execução de '{tarefa.trava}' em andamento; ignorada")
+            execucao.update({"duracao": 0.0, "resultado": "ignorada"})
+            self._registrar(execucao)
+            return execucao
+
+        relogio = time.monotonic()
+        try:
+            tarefa.funcao()
+            execucao["resultado"] = "sucesso"
+        except Exception as e:
+            logger.error(f"❌ Erro na tarefa {tarefa.nome}: {e}")
+            execucao.update({"resultado": "erro", "erro": str(e)})
+        finally:
+            trava.liberar()
+            execucao["duracao"] = round(time.monotonic() - relogio, 2)
+
+        self._gravar_ultima(tarefa, inicio)
+        self._registrar(execucao)
+        return execucao
+
+    # === Laço principal ===
+
+    def _preparar(self):
+        """Define o primeiro horário de cada tarefa, recuperando as perdidas"""
+        agora = datetime.now()
+        estado = self._ler_estado()
+        travas_recuperadas = set()
+
+        for tarefa in self.tarefas:
+            ultima = estado.get(tarefa.nome)
+            ultima = datetime.fromisoformat(ultima) if ultima else None
+
+            if self.recuperar_perdidas and tarefa.perdida_desde(ultima, agora) \
+                    and tarefa.trava not in travas_recuperadas:
+                # Uma única execução de recuperação por trava, mesmo que várias tenham sido perdidas
+                tarefa.proxima = agora
+                travas_recuperadas.add(tarefa.trava)
+            elif tarefa.intervalo is not None and ultima:
+                tarefa.proxima = max(agora, tarefa.proxima_execucao(ultima))
+            else:
+                tarefa.proxima = tarefa.proxima_execucao(agora)
+
+    def iniciar(self):
+        """Executa o laço até `parar()` ser chamado (bloqueante)"""
+        self._parar.clear()
+        self._preparar()
+        logger.info("📅 Agendador iniciado: " + ", ".join(
+            f"{tarefa.nome} → {tarefa.proxima:%d/%m %H:%M}" for tarefa in self.tarefas))
+
+        while not self._parar.is_set() and self.tarefas:
+            tarefa = min(self.tarefas, key=lambda t: t.proxima)
+            espera = (tarefa.proxima - datetime.now()).total_seconds()
+
+            # Event.wait acorda assim que `parar()` é chamado
+            if espera > 0 and self._parar.wait(min(espera, 3600)):
+                break
+            if datetime.now() < tarefa.proxima:
+                continue  # espera longa dividida em blocos de até 1h (ajustes de relógio)
+
+            atrasada = datetime.now() - tarefa.proxima > timedelta(minutes=1)
+            self.executar(tarefa, atrasada=atrasada)
+
+            # Próximo horário conta a partir do fim da execução: lentidão não empilha execuções
+            agora = datetime.now()
+            tarefa.proxima = tarefa.proxima_execucao(agora)
+
+            # Tarefas da mesma trava que venceram durante esta execução são absorvidas por ela
+            for outra in self.tarefas:
+                if outra is not tarefa and outra.trava == tarefa.trava and outra.proxima <= agora:
+                    logger.info(f"⏭️ {outra.nome}: coberta pela execução de {tarefa.nome}")
+                    outra.proxima = outra.proxima_execucao(agora)
+
+        logger.info("⏹️ Agendador parado")
+
+    def parar(self):
+        """Interrompe o laço imediatamente (a tarefa em andamento termina normalmente)"""
+        self._parar.set()
+
+    @property
+    def rodando(self) -> bool:
+        return not self._parar.is_set()
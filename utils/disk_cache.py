@@ -0,0 +1,177 @@
+"""
+Cache em disco com expiração (TTL) e limite de tamanho
+Cada entrada é um arquivo JSON; a remoção segue a ordem do último acesso
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """Armazena valores serializáveis em JSON no disco"""
+
+    def __init__(self, diretorio: str, ttl_horas: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            diretorio: Pasta onde as entradas são gravadas
+            ttl_horas: Validade padrão das entradas (None = sem expiração)
+            max_bytes: Tamanho máximo ocupado em disco (None = ilimitado)
+        """
+        self.diretorio = diretorio
+        self.ttl_horas = ttl_horas
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._tamanho_total = None  # calculado sob demanda
+        self._trava = threading.Lock()
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def _caminho(self, chave: str) -> str:
+        nome = hashlib.sha256(chave.encode('utf-8')).hexdigest()[:40]
+        return os.path.join(self.diretorio, f"{nome}.json")
+
+    def get(self, chave: str) -> Optional[Any]:
+        """Retorna o valor armazenado ou None se ausente/expirado"""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        expira_em = entrada.get('expira_em')
+        if entrada.get('chave') != chave or (expira_em and expira_em < time.time()):
+            self.misses += 1
+            if expira_em and expira_em < time.time():
+                self.delete(chave)
+            return None
+
+        # Marca o acesso para a remoção por ordem de uso (LRU)
+        try:
+            os.utime(caminho, None)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return entrada.get('valor')
+
+    def set(self, chave: str, valor: Any, ttl_horas: Optional[float] = None) -> bool:
+        """
+        Grava um valor de forma atômica
+
+        Args:
+            chave: Chave da entrada
+            valor: Valor serializável em JSON
+            ttl_horas: Validade específica desta entrada (padrão do cache se None)
+        """
+        ttl = ttl_horas if ttl_horas is not None else self.ttl_horas
+        entrada = {
+            'chave': chave,
+            'criado_em': time.time(),
+            'expira_em': time.time() + ttl * 3600 if ttl else None,
+            'valor': valor
+        }
+
+        caminho = self._caminho(chave)
+        try:
+            dados = json.dumps(entrada, ensure_ascii=False).encode('utf-8')
+            fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+
+            with self._trava:
+                tamanho_anterior = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+                os.replace(temporario, caminho)
+                if self._tamanho_total is not None:
+                    self._tamanho_total += len(dados) - tamanho_anterior
+
+            self._aplicar_limite()
+            return True
+
+        except Exception as e:
+            logger.warning(f"Erro ao gravar cache '{chave}': {e}")
+            return False
+
+    def delete(self, chave: str):
+        """Remove uma entrada se existir"""
+        caminho = self._caminho(chave)
+        with self._trava:
+            try:
+                tamanho = os.path.getsize(caminho)
+                os.remove(caminho)
+                if self._tamanho_total is not None:
+                    self._tamanho_total -= tamanho
+            except OSError:
+                pass
+
+    def _listar_entradas(self):
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith('.json'):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                stat = os.stat(caminho)
+                entradas.append((stat.st_mtime, stat.st_size, caminho))
+            except OSError:
+                continue
+        return entradas
+
+    def _aplicar_limite(self):
+        """Remove as entradas usadas há mais tempo até caber no limite"""
+        if not self.max_bytes:
+            return
+
+        with self._trava:
+            if self._tamanho_total is None:
+                self._tamanho_total = sum(tamanho for _, tamanho, _ in self._listar_entradas())
+
+            if self._tamanho_total <= self.max_bytes:
+                return
+
+            for _, tamanho, caminho in sorted(self._listar_entradas()):
+                if self._tamanho_total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                    self._tamanho_total -= tamanho
+                except OSError:
+                    continue
+
+    def limpar_expirados(self) -> int:
+        """Remove todas as entradas expiradas e retorna quantas foram removidas"""
+        removidas = 0
+        agora = time.time()
+        for _, tamanho, caminho in self._listar_entradas():
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    expira_em = json.load(f).get('expira_em')
+                if expira_em and expira_em < agora:
+                    os.remove(caminho)
+                    removidas += 1
+                    with self._trava:
+                        if self._tamanho_total is not None:
+                            self._tamanho_total -= tamanho
+            except (OSError, ValueError):
+                continue
+        return removidas
+
+    def estatisticas(self) -> dict:
+        """Retorna contadores de acertos/erros do cache"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
@@ -2,50 +2,150 @@
 Funções auxiliares para o aplicativo de geração de roteiros
 """
 import os
+import copy
 import json
+import threading
+import uuid
 import streamlit as st
 from datetime import datetime
-from docx import Document
+from types import MappingProxyType
+from utils.historico_store import historico_store
 
 
-def carregar_perfil():
-    """Carrega o perfil do usuário do arquivo JSON"""
+CAMINHO_PERFIL = "data/perfil.json"
+
+# Cópias já lidas, compartilhadas entre as sessões do processo:
+# perfil -> (assinatura do arquivo, snapshot); histórico -> (revisão do banco, snapshot)
+_perfil_compartilhado = None
+_historico_compartilhado = None
+_trava_leituras = threading.Lock()
+
+
+def _assinatura_perfil():
+    """Identifica a versão do perfil salvo: contador de gravações + mtime e tamanho do arquivo"""
     try:
-        if os.path.exists("data/perfil.json"):
-            with open("data/perfil.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception as e:
-        st.error(f"Erro ao carregar perfil: {e}")
-    return {}
+        info = os.stat(CAMINHO_PERFIL)
+        return (_versao_perfil, info.st_mtime_ns, info.st_size)
+    except OSError:
+        return (_versao_perfil, None, None)
+
+
+def perfil_snapshot():
+    """
+    Retorna o perfil salvo como mapeamento somente leitura, compartilhado entre sessões
+
+    O JSON só é lido de novo quando o arquivo muda (mtime/tamanho) ou quando
+    `salvar_perfil` é chamado. Para editar o perfil use `carregar_perfil`.
+    """
+    global _perfil_compartilhado
+    assinatura = _assinatura_perfil()
+    em_cache = _perfil_compartilhado
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+    
+    with _trava_leituras:
+        em_cache = _perfil_compartilhado
+        if em_cache and em_cache[0] == assinatura:
+            return em_cache[1]
+        
+        perfil = {}
+        try:
+            if os.path.exists(CAMINHO_PERFIL):
+                with open(CAMINHO_PERFIL, "r", encoding="utf-8") as f:
+                    perfil = json.load(f)
+        except Exception as e:
+            st.error(f"Erro ao carregar perfil: {e}")
+            return MappingProxyType({})
+        
+        snapshot = MappingProxyType(perfil)
+        _perfil_compartilhado = (assinatura, snapshot)
+        return snapshot
+
+
+def carregar_perfil():
+    """Carrega o perfil do usuário (cópia editável do snapshot compartilhado)"""
+    return copy.deepcopy(dict(perfil_snapshot()))
 
 
 def salvar_perfil(perfil):
     """Salva o perfil do usuário no arquivo JSON"""
     try:
         os.makedirs("data", exist_ok=True)
-        with open("data/perfil.json", "w", encoding="utf-8") as f:
+        with open(CAMINHO_PERFIL, "w", encoding="utf-8") as f:
             json.dump(perfil, f, ensure_ascii=False, indent=2)
     except Exception as e:
         st.error(f"Erro ao salvar perfil: {e}")
+    finally:
+        invalidar_contextos_perfil()
+
+
+# Contextos de perfil já montados para prompts: nome -> (assinatura do perfil, texto)
+_contextos_perfil = {}
+_versao_perfil = 0
+
+
+def invalidar_contextos_perfil():
+    """Descarta os contextos de perfil montados (chamado ao salvar o perfil)"""
+    global _versao_perfil
+    _versao_perfil += 1
+    _contextos_perfil.clear()
+
+
+def contexto_perfil_em_cache(nome, montar):
+    """
+    Retorna o contexto de perfil `nome`, chamando `montar()` só quando o perfil mudou
+
+    O texto é reutilizado byte a byte entre chamadas, o que mantém estável o
+    prefixo enviado com prompt caching. Alterações feitas fora de
+    `salvar_perfil` são detectadas pelo mtime/tamanho do arquivo.
+    """
+    assinatura = _assinatura_perfil()
+    
+    em_cache = _contextos_perfil.get(nome)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+    
+    texto = montar()
+    _contextos_perfil[nome] = (assinatura, texto)
+    return texto
+
+
+def historico_snapshot():
+    """
+    Retorna o histórico como tupla de roteiros somente leitura, compartilhada entre sessões
+
+    O banco só é lido de novo quando a revisão do histórico muda (inclusão,
+    edição ou exclusão, inclusive por outro processo).
+    """
+    global _historico_compartilhado
+    revisao = historico_store.revisao()
+    em_cache = _historico_compartilhado
+    if em_cache and em_cache[0] == revisao:
+        return em_cache[1]
+    
+    with _trava_leituras:
+        em_cache = _historico_compartilhado
+        if em_cache and em_cache[0] == revisao:
+            return em_cache[1]
+        
+        snapshot = tuple(MappingProxyType(roteiro) for roteiro in historico_store.listar())
+        _historico_compartilhado = (revisao, snapshot)
+        return snapshot
 
 
 def carregar_historico():
-    """Carrega o histórico de roteiros do arquivo JSON"""
+    """Carrega o histórico de roteiros (na ordem em que foram salvos)"""
     try:
-        if os.path.exists("data/historico.json"):
-            with open("data/historico.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+        return [dict(roteiro) for roteiro in historico_snapshot()]
     except Exception as e:
         st.error(f"Erro ao carregar histórico: {e}")
     return []
 
 
 def salvar_historico(historico):
-    """Salva o histórico de roteiros no arquivo JSON"""
+    """Substitui o histórico inteiro (para um único roteiro use salvar_roteiro)"""
     try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/historico.json", "w", encoding="utf-8") as f:
-            json.dump(historico, f, ensure_ascii=False, indent=2)
+        historico_store.substituir_todos(historico)
     except Exception as e:
         st.error(f"Erro ao salvar histórico: {e}")
 
@@ -67,6 +167,7 @@ def extrair_texto_arquivo(arquivo):
             st.warning("⚠️ Arquivos PDF não são suportados no momento. Use arquivos DOCX ou TXT.")
             return ""
         elif arquivo.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            from docx import Document
             doc = Document(arquivo)
             texto = "\n".join([para.text for para in doc.paragraphs])
             return texto
@@ -80,60 +181,50 @@ def extrair_texto_arquivo(arquivo):
 
 
 def aplicar_filtros_historico(historico, filtro_texto, filtro_formato, filtro_data):
-    """Aplica filtros ao histórico de roteiros"""
-    
-    resultado = historico.copy()
-    
-    # Filtro por texto
-    if filtro_texto:
-        filtro_texto = filtro_texto.lower()
-        resultado = [
-            r for r in resultado 
-            if filtro_texto in r.get('titulo', '').lower() or 
-               filtro_texto in r.get('conteudo', '').lower()
-        ]
-    
-    # Filtro por formato
-    if filtro_formato and filtro_formato != "Todos":
-        resultado = [
-            r for r in resultado 
-            if r.get('formato', 'Não especificado') == filtro_formato
-        ]
-    
-    # Filtro por data
-    if filtro_data:
-        data_str = str(filtro_data)
-        resultado = [
-            r for r in resultado 
-            if r.get('data', '').startswith(data_str)
-        ]
-    
-    return resultado
+    """Aplica filtros ao histórico de roteiros (busca pelo índice textual do histórico)"""
+    try:
+        return historico_store.buscar(filtro_texto, filtro_formato, filtro_data)
+    except Exception as e:
+        st.error(f"Erro ao buscar no histórico: {e}")
+        return historico.copy()
 
 
 def salvar_alteracoes_roteiro(roteiro_original, novo_titulo, novo_conteudo, historico_completo):
     """Salva as alterações feitas em um roteiro"""
     
-    # Encontra o roteiro no histórico completo
-    for i, roteiro in enumerate(historico_completo):
+    alteracoes = {
+        'titulo': novo_titulo,
+        'conteudo': novo_conteudo,
+        'data_atualizacao': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    # Grava só o roteiro alterado
+    try:
+        historico_store.atualizar(roteiro_original.get('id'), alteracoes)
+    except Exception as e:
+        st.error(f"Erro ao salvar alterações: {e}")
+        return
+    
+    # Reflete a alteração na lista da sessão
+    for roteiro in historico_completo:
         if roteiro.get('id') == roteiro_original.get('id'):
-            # Atualiza os dados
-            historico_completo[i]['titulo'] = novo_titulo
-            historico_completo[i]['conteudo'] = novo_conteudo
-            historico_completo[i]['data_atualizacao'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            roteiro.update(alteracoes)
             break
     
     # Atualiza o estado da sessão
     st.session_state["historico"] = historico_completo
-    
-    # Salva em arquivo
-    salvar_historico(historico_completo)
 
 
 def excluir_roteiro(roteiro_para_excluir, historico_completo):
     """Exclui um roteiro do histórico"""
     
-    # Remove o roteiro do histórico
+    # Remove só o roteiro excluído do armazenamento
+    try:
+        historico_store.excluir(roteiro_para_excluir.get('id'))
+    except Exception as e:
+        st.error(f"Erro ao excluir roteiro: {e}")
+        return
+    
     historico_atualizado = [
         roteiro for roteiro in historico_completo 
         if roteiro.get('id') != roteiro_para_excluir.get('id')
@@ -142,9 +233,6 @@ def excluir_roteiro(roteiro_para_excluir, historico_completo):
     # Atualiza o estado da sessão
     st.session_state["historico"] = historico_atualizado
     
-    # Salva em arquivo
-    salvar_historico(historico_atualizado)
-    
     # Limpa a confirmação
     if "confirmar_exclusao" in st.session_state:
         del st.session_state["confirmar_exclusao"]
@@ -162,25 +250,21 @@ def salvar_roteiro(roteiro_data):
         bool: True se salvou com sucesso, False caso contrário
     """
     try:
-        # Carrega histórico atual
-        historico = carregar_historico()
-        
         # Adiciona ID único se não existir
         if 'id' not in roteiro_data:
-            roteiro_data['id'] = f"roteiro_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            roteiro_data['id'] = str(uuid.uuid4())
         
         # Adiciona data de criação se não existir
         if 'data' not in roteiro_data:
             roteiro_data['data'] = datetime.now().isoformat()
         
-        # Adiciona ao histórico
-        historico.append(roteiro_data)
-        
-        # Salva histórico atualizado
-        salvar_historico(historico)
+        # Inclui só o novo roteiro (sem regravar o histórico)
+        historico_store.adicionar(roteiro_data)
         
         # Atualiza estado da sessão
-        st.session_state["historico"] = historico
+        historico = st.session_state.get("historico")
+        if historico is not None:
+            historico.append(roteiro_data)
         
         return True
         
@@ -0,0 +1,516 @@
+"""
+Armazenamento do histórico de roteiros em SQLite
+Inclusão em O(1), busca indexada por ID e gravações atômicas seguras entre sessões
+Busca textual ranqueada (FTS5, sem acentos) com filtros por formato e data
+Agregados materializados (roteiros por dia) mantidos por triggers para o Dashboard
+"""
+import os
+import re
+import json
+import uuid
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+HISTORICO_DB = os.getenv("HISTORICO_DB", "data/historico.db")
+
+# Histórico no formato antigo, importado na primeira abertura do banco
+HISTORICO_JSON_LEGADO = "data/historico.json"
+
+# Tempo de espera por uma trava de escrita de outra sessão/processo
+TIMEOUT_TRAVA_SEGUNDOS = 10
+
+# Peso do título em relação ao conteúdo no ranking da busca (bm25)
+PESO_TITULO = 5.0
+PESO_CONTEUDO = 1.0
+
+
+class HistoricoStore:
+    """Roteiros do histórico, um registro por roteiro, na ordem de inclusão"""
+
+    def __init__(self, caminho: str = HISTORICO_DB, json_legado: Optional[str] = HISTORICO_JSON_LEGADO):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            caminho: Arquivo SQLite
+            json_legado: historico.json a importar se o banco ainda não existir
+        """
+        self.caminho = caminho
+        self.json_legado = json_legado
+        self._inicializado = False
+        self._trava = threading.Lock()
+
+    @contextmanager
+    def _conexao(self):
+        """Abre uma conexão curta; o bloco `with` é uma transação atômica"""
+        self._inicializar()
+        conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _inicializar(self):
+        if self._inicializado:
+            return
+
+        with self._trava:
+            if self._inicializado:
+                return
+
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+            try:
+                # WAL: leitores não bloqueiam a escrita de outra sessão
+                conexao.execute("PRAGMA journal_mode=WAL")
+                with conexao:
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS roteiros (
+                            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                            id TEXT NOT NULL UNIQUE,
+                            data TEXT,
+                            formato TEXT,
+                            dados TEXT NOT NULL
+                        )
+                    """)
+                    conexao.execute("CREATE INDEX IF NOT EXISTS idx_roteiros_data ON roteiros (data)")
+                    conexao.execute("CREATE INDEX IF NOT EXISTS idx_roteiros_formato ON roteiros (formato)")
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS metadados (
+                            chave TEXT PRIMARY KEY,
+                            valor TEXT
+                        )
+                    """)
+                    self._importar_json_legado(conexao)
+                    self._criar_indice_textual(conexao)
+                    self._criar_agregados(conexao)
+                    self._criar_revisao(conexao)
+            finally:
+                conexao.close()
+
+            self._inicializado = True
+
+    def _importar_json_legado(self, conexao: sqlite3.Connection):
+        """Importa o historico.json antigo uma única vez"""
+        if conexao.execute("SELECT 1 FROM metadados WHERE chave = 'json_importado'").fetchone():
+            return
+
+        roteiros = []
+        if self.json_legado and os.path.exists(self.json_legado):
+            try:
+                with open(self.json_legado, "r", encoding="utf-8") as f:
+                    roteiros = json.load(f) or []
+            except (OSError, ValueError) as e:
+                logger.warning(f"Não foi possível importar {self.json_legado}: {e}")
+
+        # IDs antigos eram por segundo: roteiros salvos no mesmo segundo repetem o ID
+        # e recebem um novo em vez de sobrescrever o anterior
+        renomeados = sum(1 for roteiro in roteiros if not self._inserir(conexao, roteiro))
+
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('json_importado', ?)",
+                        (str(len(roteiros)),))
+        if roteiros:
+            logger.info(f"{len(roteiros)} roteiros importados de {self.json_legado}"
+                        + (f" ({renomeados} com ID repetido, trocado por um novo)" if renomeados else ""))
+
+    def _criar_indice_textual(self, conexao: sqlite3.Connection):
+        """
+        Cria o índice FTS5 de título/conteúdo, mantido por triggers
+
+        `remove_diacritics` faz "acao" encontrar "ação"; o índice é preenchido
+        uma vez a partir dos roteiros já existentes.
+        """
+        conexao.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS roteiros_fts USING fts5(
+                titulo, conteudo, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        gatilhos = [
+            """
+            CREATE TRIGGER IF NOT EXISTS roteiros_fts_ai AFTER INSERT ON roteiros BEGIN
+                INSERT INTO roteiros_fts (rowid, titulo, conteudo)
+                VALUES (new.seq, json_extract(new.dados, '$.titulo'), json_extract(new.dados, '$.conteudo'));
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS roteiros_fts_ad AFTER DELETE ON roteiros BEGIN
+                DELETE FROM roteiros_fts WHERE rowid = old.seq;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS roteiros_fts_au AFTER UPDATE ON roteiros BEGIN
+                DELETE FROM roteiros_fts WHERE rowid = old.seq;
+                INSERT INTO roteiros_fts (rowid, titulo, conteudo)
+                VALUES (new.seq, json_extract(new.dados, '$.titulo'), json_extract(new.dados, '$.conteudo'));
+            END
+            """
+        ]
+        for gatilho in gatilhos:
+            conexao.execute(gatilho)
+
+        if conexao.execute("SELECT 1 FROM metadados WHERE chave = 'fts_indexado'").fetchone():
+            return
+
+        conexao.execute("DELETE FROM roteiros_fts")
+        conexao.execute("""
+            INSERT INTO roteiros_fts (rowid, titulo, conteudo)
+            SELECT seq, json_extract(dados, '$.titulo'), json_extract(dados, '$.conteudo') FROM roteiros
+        """)
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('fts_indexado', '1')")
+
+    def _criar_agregados(self, conexao: sqlite3.Connection):
+        """
+        Cria a contagem de roteiros por dia, mantida por triggers
+
+        O dia é o prefixo AAAA-MM-DD de `data` (formatos "AAAA-MM-DD HH:MM:SS"
+        e ISO); a tabela é preenchida uma vez a partir dos roteiros existentes.
+        """
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS contagem_diaria (
+                dia TEXT PRIMARY KEY,
+                quantidade INTEGER NOT NULL
+            )
+        """)
+        gatilhos = [
+            """
+            CREATE TRIGGER IF NOT EXISTS contagem_diaria_ai AFTER INSERT ON roteiros BEGIN
+                INSERT INTO contagem_diaria (dia, quantidade) VALUES (substr(new.data, 1, 10), 1)
+                ON CONFLICT(dia) DO UPDATE SET quantidade = quantidade + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS contagem_diaria_ad AFTER DELETE ON roteiros BEGIN
+                UPDATE contagem_diaria SET quantidade = quantidade - 1 WHERE dia = substr(old.data, 1, 10);
+                DELETE FROM contagem_diaria WHERE dia = substr(old.data, 1, 10) AND quantidade <= 0;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS contagem_diaria_au AFTER UPDATE OF data ON roteiros
+            WHEN substr(old.data, 1, 10) IS NOT substr(new.data, 1, 10) BEGIN
+                UPDATE contagem_diaria SET quantidade = quantidade - 1 WHERE dia = substr(old.data, 1, 10);
+                DELETE FROM contagem_diaria WHERE dia = substr(old.data, 1, 10) AND quantidade <= 0;
+                INSERT INTO contagem_diaria (dia, quantidade) VALUES (substr(new.data, 1, 10), 1)
+                ON CONFLICT(dia) DO UPDATE SET quantidade = quantidade + 1;
+            END
+            """
+        ]
+        for gatilho in gatilhos:
+            conexao.execute(gatilho)
+
+        if conexao.execute("SELECT 1 FROM metadados WHERE chave = 'agregados_calculados'").fetchone():
+            return
+
+        conexao.execute("DELETE FROM contagem_diaria")
+        conexao.execute("""
+            INSERT INTO contagem_diaria (dia, quantidade)
+            SELECT substr(data, 1, 10), COUNT(*) FROM roteiros GROUP BY 1
+        """)
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('agregados_calculados', '1')")
+
+    def _criar_revisao(self, conexao: sqlite3.Connection):
+        """Contador de alterações do histórico, incrementado por triggers (vale entre processos)"""
+        conexao.execute("INSERT OR IGNORE INTO metadados (chave, valor) VALUES ('revisao', '0')")
+        for evento in ("INSERT", "UPDATE", "DELETE"):
+            conexao.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS roteiros_revisao_{evento.lower()} AFTER {evento} ON roteiros BEGIN
+                    UPDATE metadados SET valor = CAST(valor AS INTEGER) + 1 WHERE chave = 'revisao';
+                END
+            """)
+
+    def _inserir(self, conexao: sqlite3.Connection, roteiro: Dict) -> bool:
+        """
+        Inclui um roteiro novo sem nunca sobrescrever outro
+
+        Returns:
+            False se o ID já existia e o roteiro recebeu um novo (atualizado em `roteiro`)
+        """
+        id_original = roteiro.get('id')
+        if not id_original:
+            roteiro['id'] = str(uuid.uuid4())
+        while True:
+            cursor = conexao.execute(
+                "INSERT OR IGNORE INTO roteiros (id, data, formato, dados) VALUES (?, ?, ?, ?)",
+                (roteiro['id'], roteiro.get('data') or roteiro.get('timestamp', ''),
+                 roteiro.get('formato'), json.dumps(roteiro, ensure_ascii=False))
+            )
+            if cursor.rowcount:
+                return not id_original or roteiro['id'] == id_original
+            roteiro['id'] = str(uuid.uuid4())
+
+    def _substituir(self, conexao: sqlite3.Connection, roteiro: Dict):
+        """Grava o roteiro sobre o de mesmo ID (alterações explícitas)"""
+        conexao.execute(
+            """
+            INSERT INTO roteiros (id, data, formato, dados) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                data = excluded.data, formato = excluded.formato, dados = excluded.dados
+            """,
+            (roteiro['id'], roteiro.get('data') or roteiro.get('timestamp', ''),
+             roteiro.get('formato'), json.dumps(roteiro, ensure_ascii=False))
+        )
+
+    def listar(self) -> List[Dict]:
+        """Retorna todos os roteiros na ordem em que foram incluídos"""
+        with self._conexao() as conexao:
+            linhas = conexao.execute("SELECT dados FROM roteiros ORDER BY seq").fetchall()
+        return [json.loads(dados) for (dados,) in linhas]
+
+    def obter(self, roteiro_id: str) -> Optional[Dict]:
+        """Busca um roteiro pelo ID"""
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT dados FROM roteiros WHERE id = ?", (roteiro_id,)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def revisao(self) -> int:
+        """Número que muda sempre que algum roteiro é incluído, alterado ou excluído"""
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT valor FROM metadados WHERE chave = 'revisao'").fetchone()
+        return int(linha[0]) if linha else 0
+
+    def contar(self) -> int:
+        """Quantidade de roteiros no histórico"""
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT COUNT(*) FROM roteiros").fetchone()[0]
+
+    def adicionar(self, roteiro: Dict) -> Dict:
+        """Inclui um roteiro novo e o retorna com ID garantido (um ID já usado é trocado por outro)"""
+        with self._conexao() as conexao:
+            self._inserir(conexao, roteiro)
+        return roteiro
+
+    def atualizar(self, roteiro_id: str, alteracoes: Dict) -> Optional[Dict]:
+        """
+        Aplica alterações de campos a um roteiro existente
+
+        Returns:
+            Roteiro atualizado ou None se o ID não existir
+        """
+        with self._conexao() as conexao:
+            # BEGIN IMMEDIATE: leitura e escrita sem outra sessão no meio
+            conexao.execute("BEGIN IMMEDIATE")
+            linha = conexao.execute("SELECT dados FROM roteiros WHERE id = ?", (roteiro_id,)).fetchone()
+            if not linha:
+                return None
+            roteiro = json.loads(linha[0])
+            roteiro.update(alteracoes)
+            roteiro['id'] = roteiro_id
+            self._substituir(conexao, roteiro)
+        return roteiro
+
+    def excluir(self, roteiro_id: str) -> bool:
+        """Remove um roteiro pelo ID e indica se ele existia"""
+        with self._conexao() as conexao:
+            cursor = conexao.execute("DELETE FROM roteiros WHERE id = ?", (roteiro_id,))
+            return cursor.rowcount > 0
+
+    def _consulta_fts(self, texto: str) -> str:
+        """Converte o texto digitado em consulta FTS5: todas as palavras, por prefixo"""
+        palavras = re.findall(r"\w+", texto, flags=re.UNICODE)
+        return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+    def _montar_filtros(self, texto: str, formato: Optional[str],
+                        data_filtro: Optional[Union[date, str]]) -> Tuple[str, List[str], List, bool]:
+        """
+        Monta origem, condições e parâmetros SQL comuns às buscas
+
+        Returns:
+            (FROM ..., condições, parâmetros, busca ranqueada por texto?)
+        """
+        condicoes = []
+        parametros = []
+        consulta_fts = self._consulta_fts(texto or "")
+
+        if consulta_fts:
+            origem = "roteiros_fts JOIN roteiros r ON r.seq = roteiros_fts.rowid"
+            condicoes.append("roteiros_fts MATCH ?")
+            parametros.append(consulta_fts)
+        else:
+            origem = "roteiros r"
+
+        if formato and formato != "Todos":
+            if formato == "Não especificado":
+                condicoes.append("(r.formato IS NULL OR r.formato = ?)")
+            else:
+                condicoes.append("r.formato = ?")
+            parametros.append(formato)
+
+        if data_filtro:
+            inicio = data_filtro if isinstance(data_filtro, date) else \
+                datetime.strptime(str(data_filtro)[:10], "%Y-%m-%d").date()
+            # Intervalo [dia, dia seguinte) aproveita o índice em `data`
+            condicoes.append("r.data >= ? AND r.data < ?")
+            parametros.extend([inicio.isoformat(), (inicio + timedelta(days=1)).isoformat()])
+
+        return origem, condicoes, parametros, bool(consulta_fts)
+
+    def _ordem(self, ranqueada: bool) -> str:
+        if ranqueada:
+            return f"bm25(roteiros_fts, {PESO_TITULO}, {PESO_CONTEUDO}), r.data DESC, r.seq DESC"
+        return "r.data DESC, r.seq DESC"
+
+    def buscar(self, texto: str = "", formato: Optional[str] = None,
+               data_filtro: Optional[Union[date, str]] = None, limite: Optional[int] = None) -> List[Dict]:
+        """
+        Busca roteiros por texto (ranqueado) e filtra por formato e dia
+
+        Args:
+            texto: Palavras a buscar no título/conteúdo (sem diferenciar acentos e maiúsculas)
+            formato: Formato exato ou None/"Todos" para qualquer um
+            data_filtro: Dia (date ou "AAAA-MM-DD") da criação do roteiro
+            limite: Quantidade máxima de resultados
+
+        Returns:
+            Roteiros por relevância quando há texto; senão, do mais recente ao mais antigo
+        """
+        origem, condicoes, parametros, ranqueada = self._montar_filtros(texto, formato, data_filtro)
+
+        sql = f"SELECT r.dados FROM {origem}"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += f" ORDER BY {self._ordem(ranqueada)}"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+
+        with self._conexao() as conexao:
+            linhas = conexao.execute(sql, parametros).fetchall()
+        return [json.loads(dados) for (dados,) in linhas]
+
+    def contar_busca(self, texto: str = "", formato: Optional[str] = None,
+                     data_filtro: Optional[Union[date, str]] = None) -> int:
+        """Quantidade de roteiros que atendem aos filtros de `buscar`"""
+        origem, condicoes, parametros, _ = self._montar_filtros(texto, formato, data_filtro)
+
+        sql = f"SELECT COUNT(*) FROM {origem}"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+
+        with self._conexao() as conexao:
+            return conexao.execute(sql, parametros).fetchone()[0]
+
+    def buscar_pagina(self, texto: str = "", formato: Optional[str] = None,
+                      data_filtro: Optional[Union[date, str]] = None, tamanho: int = 20,
+                      cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Retorna uma página de resumos (sem o `conteudo`) na mesma ordem de `buscar`
+
+        Sem texto, a paginação é por chave (data, seq) e não depende de OFFSET;
+        na busca ranqueada o cursor guarda a posição no ranking.
+
+        Args:
+            texto, formato, data_filtro: Mesmos filtros de `buscar`
+            tamanho: Roteiros por página
+            cursor: Valor retornado pela página anterior (None = primeira página)
+
+        Returns:
+            (resumos, cursor da próxima página ou None se for a última)
+        """
+        origem, condicoes, parametros, ranqueada = self._montar_filtros(texto, formato, data_filtro)
+        posicao = json.loads(cursor) if cursor else None
+        tamanho = max(1, int(tamanho))
+
+        if posicao is not None and not ranqueada:
+            data_cursor, seq_cursor = posicao
+            condicoes.append("(r.data < ? OR (r.data = ? AND r.seq < ?))")
+            parametros.extend([data_cursor, data_cursor, seq_cursor])
+
+        sql = f"""
+            SELECT r.seq, r.id, r.data, r.formato,
+                   json_extract(r.dados, '$.titulo'),
+                   json_extract(r.dados, '$.instrucao'),
+                   length(json_extract(r.dados, '$.conteudo'))
+            FROM {origem}
+        """
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += f" ORDER BY {self._ordem(ranqueada)} LIMIT ?"
+        parametros.append(tamanho + 1)
+        if ranqueada:
+            sql += " OFFSET ?"
+            parametros.append(int(posicao or 0))
+
+        with self._conexao() as conexao:
+            linhas = conexao.execute(sql, parametros).fetchall()
+
+        resumos = [
+            {
+                'id': roteiro_id,
+                'data': data,
+                'formato': formato_roteiro,
+                'titulo': titulo,
+                'instrucao': instrucao,
+                'caracteres': caracteres or 0
+            }
+            for _, roteiro_id, data, formato_roteiro, titulo, instrucao, caracteres in linhas[:tamanho]
+        ]
+
+        proximo = None
+        if len(linhas) > tamanho:
+            if ranqueada:
+                proximo = json.dumps(int(posicao or 0) + tamanho)
+            else:
+                ultimo = linhas[tamanho - 1]
+                proximo = json.dumps([ultimo[2], ultimo[0]])
+        return resumos, proximo
+
+    def contar_por_formato(self) -> Dict[str, int]:
+        """Quantidade de roteiros por formato (faceta), a partir do índice"""
+        with self._conexao() as conexao:
+            linhas = conexao.execute(
+                "SELECT COALESCE(formato, 'Não especificado'), COUNT(*) FROM roteiros GROUP BY 1 ORDER BY 1"
+            ).fetchall()
+        return dict(linhas)
+
+    def contagem_diaria(self, desde: Optional[date] = None) -> Dict[str, int]:
+        """
+        Roteiros por dia ("AAAA-MM-DD" -> quantidade), lidos da tabela agregada
+
+        Args:
+            desde: Primeiro dia incluído (None = todos)
+        """
+        sql = "SELECT dia, quantidade FROM contagem_diaria"
+        parametros = []
+        if desde:
+            sql += " WHERE dia >= ?"
+            parametros.append(desde.isoformat())
+
+        with self._conexao() as conexao:
+            return dict(conexao.execute(sql + " ORDER BY dia", parametros).fetchall())
+
+    def totais_semanais(self, semanas: int = 12) -> Dict[str, int]:
+        """Roteiros por semana (segunda-feira "AAAA-MM-DD" -> quantidade) das últimas `semanas`"""
+        hoje = date.today()
+        inicio = hoje - timedelta(days=hoje.weekday(), weeks=max(1, semanas) - 1)
+
+        totais = {}
+        for dia, quantidade in self.contagem_diaria(inicio).items():
+            try:
+                dia_roteiro = date.fromisoformat(dia)
+            except ValueError:
+                continue
+            segunda = (dia_roteiro - timedelta(days=dia_roteiro.weekday())).isoformat()
+            totais[segunda] = totais.get(segunda, 0) + quantidade
+        return totais
+
+    def recentes(self, quantidade: int = 5) -> List[Dict]:
+        """Os `quantidade` roteiros mais recentes, pelo índice em `data`"""
+        return self.buscar(limite=max(1, int(quantidade)))
+
+    def substituir_todos(self, roteiros: List[Dict]):
+        """Substitui o histórico inteiro em uma única transação"""
+        with self._conexao() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.execute("DELETE FROM roteiros")
+            for roteiro in roteiros:
+                self._inserir(conexao, roteiro)
+
+
+# Instância global (compartilhada entre sessões do Streamlit)
+historico_store = HistoricoStore()
@@ -0,0 +1,313 @@
+"""
+Extração de conteúdo de páginas HTML para o web crawler
+Dois caminhos com o mesmo resultado (exceto em fragmentos sem <body>, que o lxml completa):
+- extrair_pagina: BeautifulSoup + html.parser (referência, sem dependências extras)
+- extrair_pagina_rapida: lxml em uma única passada pela árvore, coletando texto,
+  links, iframes e imagens juntos e parando de acumular texto ao atingir o limite
+
+Comparação dos dois caminhos:
+    python benchmark_extracao.py
+"""
+import re
+from urllib.parse import urljoin, urlparse
+
+LIMITE_CONTEUDO = 5000
+MAX_LINKS = 20
+MAX_IMAGENS = 10
+
+# Removidos antes da extração (texto, links e mídia dentro deles são ignorados)
+TAGS_REMOVIDAS = ("script", "style", "nav", "footer", "header")
+
+# Onde procurar o conteúdo principal, em ordem de prioridade (antes de cair no <body>)
+SELETORES_CONTEUDO = [
+    'article', 'main', '.content', '.post', '.entry',
+    '.article-content', '.post-content', '.entry-content'
+]
+
+# Imagens de sistema (ícones, logos, avatares, miniaturas)
+IMAGENS_IGNORADAS = ('icon', 'logo', 'avatar', 'thumb')
+
+PADRAO_YOUTUBE = re.compile(r'youtube\.com|youtu\.be')
+PADRAO_ESQUEMA = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+
+def extracao_rapida_disponivel() -> bool:
+    """Indica se o lxml (dependência do modo rápido) está instalado"""
+    try:
+        import lxml.html  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _resultado(url, titulo, conteudo, palavras, links, videos, imagens):
+    return {
+        'url': url,
+        'title': titulo,
+        'content': conteudo[:LIMITE_CONTEUDO],  # Limitar tamanho
+        'word_count': palavras,
+        'internal_links': links[:MAX_LINKS],  # Limitar links
+        'videos': videos,
+        'images': imagens[:MAX_IMAGENS],  # Limitar imagens
+        'status': 'success'
+    }
+
+
+def _video_youtube(src, titulo):
+    video_id = src.split('/embed/')[-1].split('?')[0]
+    return {
+        'platform': 'YouTube',
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'embed_url': src,
+        'title': titulo
+    }
+
+
+# === Caminho de referência (BeautifulSoup) ===
+
+def extrair_pagina(url, conteudo):
+    """
+    Extrai título, texto principal, links internos, vídeos e imagens com BeautifulSoup
+
+    Args:
+        url: URL da página (base dos links relativos)
+        conteudo: HTML (bytes ou texto)
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(conteudo, 'html.parser')
+
+    # Extrair informações básicas
+    title = soup.find('title')
+    title = title.get_text().strip() if title else "Sem título"
+
+    # Remover scripts e estilos
+    for script in soup(list(TAGS_REMOVIDAS)):
+        script.decompose()
+
+    # Extrair texto principal
+    main_content = ""
+    for selector in SELETORES_CONTEUDO:
+        content_elem = soup.select_one(selector)
+        if content_elem:
+            main_content = content_elem.get_text(separator=' ', strip=True)
+            break
+
+    # Se não encontrou conteúdo específico, pega o body
+    if not main_content:
+        body = soup.find('body')
+        if body:
+            main_content = body.get_text(separator=' ', strip=True)
+
+    # Extrair links internos
+    internal_links = []
+    base_domain = urlparse(url).netloc
+
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        full_url = urljoin(url, href)
+
+        # Verificar se é link interno
+        if urlparse(full_url).netloc == base_domain:
+            link_text = link.get_text().strip()
+            if link_text and len(link_text) > 5:  # Links com texto significativo
+                internal_links.append({
+                    'url': full_url,
+                    'text': link_text[:100]
+                })
+
+    return _resultado(url, title, main_content, len(main_content.split()), internal_links,
+                      extrair_videos(soup, url), extrair_imagens(soup, url))
+
+
+def extrair_videos(soup, base_url):
+    """Extrai vídeos da página (embeds do YouTube e <video>)"""
+    videos = []
+
+    # YouTube embeds
+    for iframe in soup.find_all('iframe', src=PADRAO_YOUTUBE):
+        src = iframe.get('src', '')
+        if 'youtube.com/embed/' in src:
+            videos.append(_video_youtube(src, iframe.get('title', 'Vídeo YouTube')))
+
+    # Vídeos HTML5
+    for video in soup.find_all('video'):
+        src = video.get('src')
+        if src:
+            videos.append({
+                'platform': 'HTML5',
+                'url': urljoin(base_url, src),
+                'title': video.get('title', 'Vídeo HTML5')
+            })
+
+    return videos
+
+
+def extrair_imagens(soup, base_url):
+    """Extrai imagens da página, sem ícones, logos e miniaturas"""
+    images = []
+
+    for img in soup.find_all('img'):
+        src = img.get('src')
+        if src and not any(skip in src.lower() for skip in IMAGENS_IGNORADAS):
+            images.append({
+                'url': urljoin(base_url, src),
+                'alt': img.get('alt', ''),
+                'title': img.get('title', '')
+            })
+
+    return images
+
+
+# === Caminho rápido (lxml, passada única) ===
+
+class _Texto:
+    """Acumula trechos de texto até o limite, contando todas as palavras"""
+    __slots__ = ('partes', 'tamanho', 'palavras', 'limite')
+
+    def __init__(self, limite):
+        self.partes = []
+        self.tamanho = 0
+        self.palavras = 0
+        self.limite = limite
+
+    def adicionar(self, trecho):
+        # A contagem de palavras continua depois do limite (word_count é da página inteira),
+        # mas o texto em si deixa de ser guardado e concatenado
+        self.palavras += len(trecho.split())
+        if self.tamanho <= self.limite:  # um trecho além do limite completa o último separador
+            self.partes.append(trecho)
+            self.tamanho += len(trecho) + 1
+
+    def texto(self):
+        return ' '.join(self.partes)[:self.limite]
+
+
+def _seletor_casa(seletor, tag, classes):
+    if seletor[0] == '.':
+        return classes is not None and seletor[1:] in classes
+    return tag == seletor
+
+
+def extrair_pagina_rapida(url, conteudo, limite=LIMITE_CONTEUDO):
+    """
+    Mesma extração de `extrair_pagina`, com lxml e uma única passada pela árvore
+
+    Args:
+        url: URL da página (base dos links relativos)
+        conteudo: HTML (bytes ou texto)
+        limite: Caracteres de texto guardados do conteúdo principal
+    """
+    import lxml.html
+    from lxml import etree
+
+    if not conteudo or not conteudo.strip():
+        return _resultado(url, "Sem título", "", 0, [], [], [])
+    if isinstance(conteudo, str):
+        # lxml recusa texto com declaração de encoding; em bytes ele a respeita
+        conteudo = conteudo.encode('utf-8')
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+    else:
+        try:
+            conteudo.decode('utf-8')
+            parser = lxml.html.HTMLParser(encoding='utf-8')
+        except UnicodeDecodeError:
+            parser = None  # usa o charset declarado na página
+    try:
+        raiz = lxml.html.document_fromstring(conteudo, parser=parser)
+    except etree.ParserError:
+        return _resultado(url, "Sem título", "", 0, [], [], [])
+
+    titulo = raiz.find('.//title')
+    titulo = titulo.text_content().strip() if titulo is not None else "Sem título"
+
+    base_domain = urlparse(url).netloc
+    corpo = _Texto(limite)
+    conteineres = {}  # índice em SELETORES_CONTEUDO -> primeiro elemento encontrado (seu texto)
+    receptores = []  # acumuladores que recebem o texto na posição atual da árvore
+    empilhados = []  # quantos receptores cada elemento aberto acrescentou
+    links, youtube, html5, imagens = [], [], [], []
+
+    percurso = etree.iterwalk(raiz, events=("start", "end", "comment", "pi"))
+    for evento, elemento in percurso:
+        tag = elemento.tag
+
+        if evento != "start":
+            if evento == "end":
+                for _ in range(empilhados.pop()):
+                    receptores.pop()
+            # O "tail" pertence ao elemento pai, então entra depois de desempilhar
+            # (comentários e instruções de processamento só geram este evento)
+            cauda = elemento.tail
+            if cauda and receptores:
+                cauda = cauda.strip()
+                if cauda:
+                    for receptor in receptores:
+                        receptor.adicionar(cauda)
+            continue
+
+        if tag in TAGS_REMOVIDAS:
+            # Tags removidas: ignora o conteúdo, mantém só o "tail"
+            percurso.skip_subtree()
+            empilhados.append(0)
+            continue
+
+        novos = 0
+        if tag == 'body':
+            receptores.append(corpo)
+            novos += 1
+
+        if len(conteineres) < len(SELETORES_CONTEUDO):
+            classes = elemento.get('class')
+            classes = classes.split() if classes else None
+            for indice, seletor in enumerate(SELETORES_CONTEUDO):
+                if indice not in conteineres and _seletor_casa(seletor, tag, classes):
+                    conteineres[indice] = _Texto(limite)
+                    receptores.append(conteineres[indice])
+                    novos += 1
+        empilhados.append(novos)
+
+        if tag == 'a':
+            href = elemento.get('href')
+            if href is not None and len(links) < MAX_LINKS:
+                texto_link = elemento.text_content().strip()
+                if len(texto_link) > 5:  # Links com texto significativo
+                    full_url = urljoin(url, href)
+                    # Links relativos são sempre internos; só os absolutos precisam de urlparse
+                    relativo = not href.startswith('//') and not PADRAO_ESQUEMA.match(href.strip())
+                    if relativo or urlparse(full_url).netloc == base_domain:
+                        links.append({'url': full_url, 'text': texto_link[:100]})
+        elif tag == 'iframe':
+            src = elemento.get('src')
+            if src and PADRAO_YOUTUBE.search(src) and 'youtube.com/embed/' in src:
+                youtube.append(_video_youtube(src, elemento.get('title', 'Vídeo YouTube')))
+        elif tag == 'video':
+            src = elemento.get('src')
+            if src:
+                html5.append({
+                    'platform': 'HTML5',
+                    'url': urljoin(url, src),
+                    'title': elemento.get('title', 'Vídeo HTML5')
+                })
+        elif tag == 'img':
+            src = elemento.get('src')
+            if src and len(imagens) < MAX_IMAGENS and not any(skip in src.lower() for skip in IMAGENS_IGNORADAS):
+                imagens.append({
+                    'url': urljoin(url, src),
+                    'alt': elemento.get('alt', ''),
+                    'title': elemento.get('title', '')
+                })
+
+        texto = elemento.text
+        if texto and receptores:
+            texto = texto.strip()
+            if texto:
+                for receptor in receptores:
+                    receptor.adicionar(texto)
+
+    # Primeiro seletor (em prioridade) encontrado; se vazio, o <body> inteiro
+    principal = next((conteineres[indice] for indice in range(len(SELETORES_CONTEUDO)) if indice in conteineres), None)
+    if principal is None or not principal.partes:
+        principal = corpo
+
+    return _resultado(url, titulo, principal.texto(), principal.palavras, links, youtube + html5, imagens)
@@ -0,0 +1,336 @@
+"""
+Cache HTTP em disco compartilhado pelos crawlers
+Respeita ETag, Last-Modified e Cache-Control: respostas ainda frescas não
+vão à rede e as demais são revalidadas com requisições condicionais (304).
+Corpos são armazenados uma única vez por hash (SHA-256), e o resultado do
+processamento de um corpo (ex.: parsing do HTML) é reaproveitado enquanto
+o conteúdo não mudar
+"""
+import os
+import copy
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DB = os.getenv("HTTP_CACHE_DB", "data/cache/http.db")
+
+TIMEOUT_TRAVA_SEGUNDOS = 10
+
+# Corpos maiores que isso não são guardados (vídeos, arquivos grandes)
+MAX_CORPO_BYTES = 5 * 1024 * 1024
+
+# Resultados processados mantidos em memória (por URL + hash do corpo)
+MAX_PROCESSADOS = 256
+
+
+@dataclass
+class RespostaHttp:
+    """Resposta servida pelo cache (mesma interface básica de requests.Response)"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoding: Optional[str] = None
+    corpo_hash: Optional[str] = None
+    origem: str = "rede"      # "rede" (corpo baixado), "304" (revalidado) ou "cache" (ainda fresco)
+    inalterado: bool = False  # corpo igual ao da última vez (304, fresco ou mesmo hash)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if not self.ok:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} para {self.url}", response=self)
+
+
+def _hash(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def _validade(headers) -> Optional[float]:
+    """
+    Horário (epoch) até o qual a resposta pode ser usada sem revalidar
+
+    Returns:
+        None se a resposta não deve ser guardada (no-store)
+    """
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    diretivas = {}
+    for parte in cache_control.split(","):
+        nome, _, valor = parte.strip().partition("=")
+        if nome:
+            diretivas[nome] = valor.strip('"')
+
+    if "no-store" in diretivas:
+        return None
+    agora = time.time()
+    if "no-cache" in diretivas:
+        return agora
+    if "max-age" in diretivas:
+        try:
+            idade = int(headers.get("Age") or 0)
+            return agora + max(0, int(diretivas["max-age"]) - idade)
+        except ValueError:
+            return agora
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return agora
+    # Sem informação de frescor: revalida a cada uso
+    return agora
+
+
+class HttpCache:
+    """Cache de respostas GET em SQLite, consultável por várias threads e processos"""
+
+    def __init__(self, caminho: str = HTTP_CACHE_DB):
+        """
+        Inicializa o cache
+
+        Args:
+            caminho: Arquivo SQLite (respostas e corpos)
+        """
+        self.caminho = caminho
+        self._inicializado = False
+        self._trava = threading.Lock()
+        self._processados = OrderedDict()
+        self._trava_processados = threading.Lock()
+
+    @contextmanager
+    def _conexao(self):
+        """Abre uma conexão curta; o bloco `with` é uma transação atômica"""
+        self._inicializar()
+        conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _inicializar(self):
+        if self._inicializado:
+            return
+
+        with self._trava:
+            if self._inicializado:
+                return
+
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+            try:
+                conexao.execute("PRAGMA journal_mode=WAL")
+                with conexao:
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS corpos (
+                            hash TEXT PRIMARY KEY,
+                            conteudo BLOB NOT NULL
+                        )
+                    """)
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS respostas (
+                            url TEXT PRIMARY KEY,
+                            status INTEGER NOT NULL,
+                            etag TEXT,
+                            last_modified TEXT,
+                            content_type TEXT,
+                            encoding TEXT,
+                            corpo_hash TEXT NOT NULL REFERENCES corpos(hash),
+                            expira_em REAL NOT NULL,
+                            atualizado_em REAL NOT NULL
+                        )
+                    """)
+                    conexao.execute("CREATE INDEX IF NOT EXISTS idx_respostas_hash ON respostas(corpo_hash)")
+            finally:
+                conexao.close()
+            self._inicializado = True
+
+    # === Leitura e gravação ===
+
+    def _entrada(self, url: str) -> Optional[Dict]:
+        with self._conexao() as conexao:
+            conexao.row_factory = sqlite3.Row
+            linha = conexao.execute(
+                """
+                SELECT r.*, c.conteudo FROM respostas r
+                JOIN corpos c ON c.hash = r.corpo_hash
+                WHERE r.url = ?
+                """,
+                (url,)
+            ).fetchone()
+        return dict(linha) if linha else None
+
+    def _resposta_da_entrada(self, entrada: Dict, origem: str) -> RespostaHttp:
+        headers = {}
+        if entrada["content_type"]:
+            headers["Content-Type"] = entrada["content_type"]
+        return RespostaHttp(
+            url=entrada["url"],
+            status_code=entrada["status"],
+            content=entrada["conteudo"],
+            headers=headers,
+            encoding=entrada["encoding"],
+            corpo_hash=entrada["corpo_hash"],
+            origem=origem,
+            inalterado=True
+        )
+
+    def _gravar(self, url: str, response, corpo_hash: str, expira_em: float, hash_anterior: Optional[str]):
+        with self._conexao() as conexao:
+            conexao.execute("INSERT OR IGNORE INTO corpos (hash, conteudo) VALUES (?, ?)",
+                            (corpo_hash, response.content))
+            conexao.execute(
+                """
+                INSERT INTO respostas
+                    (url, status, etag, last_modified, content_type, encoding, corpo_hash, expira_em, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status, etag = excluded.etag,
+                    last_modified = excluded.last_modified, content_type = excluded.content_type,
+                    encoding = excluded.encoding, corpo_hash = excluded.corpo_hash,
+                    expira_em = excluded.expira_em, atualizado_em = excluded.atualizado_em
+                """,
+                (url, response.status_code, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 response.headers.get("Content-Type"), response.encoding, corpo_hash, expira_em, time.time())
+            )
+            if hash_anterior and hash_anterior != corpo_hash:
+                self._remover_corpo_orfao(conexao, hash_anterior)
+
+    def _remover_corpo_orfao(self, conexao: sqlite3.Connection, corpo_hash: str):
+        conexao.execute(
+            "DELETE FROM corpos WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM respostas WHERE corpo_hash = ?)",
+            (corpo_hash, corpo_hash)
+        )
+
+    def _descartar(self, url: str):
+        with self._conexao() as conexao:
+            linha = conexao.execute("SELECT corpo_hash FROM respostas WHERE url = ?", (url,)).fetchone()
+            if linha:
+                conexao.execute("DELETE FROM respostas WHERE url = ?", (url,))
+                self._remover_corpo_orfao(conexao, linha[0])
+
+    # === API ===
+
+    def get(self, session, url: str, headers: Optional[Dict] = None, limitador=None, **kwargs) -> RespostaHttp:
+        """
+        GET com cache: usa a cópia fresca, revalida com If-None-Match/If-Modified-Since
+        ou baixa o corpo novamente
+
+        Args:
+            session: requests.Session (ou o módulo requests) que faz a requisição
+            url: URL da página
+            headers: Cabeçalhos extras da requisição
+            limitador: HostRateLimiter aplicado só quando a requisição vai à rede
+            **kwargs: Repassados a `session.get` (ex.: timeout)
+        """
+        try:
+            entrada = self._entrada(url)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache HTTP indisponível: {e}")
+            entrada = None
+
+        if entrada and entrada["expira_em"] > time.time():
+            return self._resposta_da_entrada(entrada, "cache")
+
+        cabecalhos = dict(headers or {})
+        if entrada:
+            if entrada["etag"]:
+                cabecalhos["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+
+        with limitador.slot(url) if limitador else nullcontext():
+            response = session.get(url, headers=cabecalhos or None, **kwargs)
+
+        if response.status_code == 304 and entrada:
+            expira_em = _validade(response.headers)
+            try:
+                with self._conexao() as conexao:
+                    conexao.execute(
+                        "UPDATE respostas SET expira_em = ?, atualizado_em = ?, "
+                        "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                        (expira_em if expira_em is not None else time.time(), time.time(),
+                         response.headers.get("ETag"), response.headers.get("Last-Modified"), url)
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Não foi possível atualizar o cache de {url}: {e}")
+            return self._resposta_da_entrada(entrada, "304")
+
+        conteudo = response.content
+        corpo_hash = _hash(conteudo)
+        resposta = RespostaHttp(
+            url=url,
+            status_code=response.status_code,
+            content=conteudo,
+            headers=dict(response.headers),
+            encoding=response.encoding,
+            corpo_hash=corpo_hash,
+            origem="rede",
+            inalterado=bool(entrada) and entrada["corpo_hash"] == corpo_hash
+        )
+
+        try:
+            expira_em = _validade(response.headers)
+            if response.status_code == 200 and expira_em is not None and len(conteudo) <= MAX_CORPO_BYTES:
+                self._gravar(url, response, corpo_hash, expira_em, entrada["corpo_hash"] if entrada else None)
+            elif entrada:
+                self._descartar(url)
+        except sqlite3.Error as e:
+            logger.warning(f"Não foi possível gravar {url} no cache HTTP: {e}")
+
+        return resposta
+
+    def processar(self, resposta: RespostaHttp, tipo: str, funcao: Callable[[RespostaHttp], object]):
+        """
+        Aplica `funcao` ao corpo, reaproveitando o resultado enquanto o corpo não mudar
+
+        Args:
+            resposta: Resposta retornada por `get`
+            tipo: Nome do processamento (separa parsers diferentes da mesma página)
+            funcao: Processamento do corpo (ex.: extração do HTML)
+
+        Returns:
+            Cópia do resultado (pode ser alterada livremente pelo chamador)
+        """
+        chave = (tipo, resposta.url, resposta.corpo_hash)
+        with self._trava_processados:
+            if chave in self._processados:
+                self._processados.move_to_end(chave)
+                return copy.deepcopy(self._processados[chave])
+
+        resultado = funcao(resposta)
+
+        with self._trava_processados:
+            self._processados[chave] = resultado
+            while len(self._processados) > MAX_PROCESSADOS:
+                self._processados.popitem(last=False)
+        return copy.deepcopy(resultado)
+
+    def limpar(self):
+        """Remove todas as respostas guardadas"""
+        with self._conexao() as conexao:
+            conexao.execute("DELETE FROM respostas")
+            conexao.execute("DELETE FROM corpos")
+        with self._trava_processados:
+            self._processados.clear()
+
+
+# Instância global (compartilhada pelos crawlers, sessões do Streamlit e agendador)
+http_cache = HttpCache()
@@ -1,101 +1,148 @@
 """
 Calculador de Métricas para Painel de Inteligência
 Processa dados de tendências e gera KPIs visuais
+Lê as coletas do banco de tendências e mantém os KPIs em cache até os dados mudarem
 """
-import json
-import statistics
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Dict, List, Tuple, Any
+import re
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple, Any, Optional
 import logging
+from utils.tendencias_store import PLATAFORMA_TODAS, tendencias_store_para
 
 logger = logging.getLogger(__name__)
 
+# Resultados calculados por banco, compartilhados entre instâncias (o painel cria uma a cada rerun):
+# caminho do banco -> {chave: (revisão dos dados, calculado em, valor)}
+_results_cache: Dict[str, Dict[Any, Tuple[tuple, datetime, Any]]] = {}
+_results_lock = threading.Lock()
+
+# Parâmetros por plataforma usados nas métricas simuladas
+PLATFORM_NAMES = {
+    'youtube': 'YouTube',
+    'tiktok': 'TikTok',
+    'instagram': 'Instagram',
+    'twitter': 'Twitter'
+}
+PLATFORM_LIKES = {'youtube': 45000, 'tiktok': 125000, 'instagram': 85000, 'twitter': 25000}
+PLATFORM_VIEWS = {'youtube': 850000, 'tiktok': 2100000, 'instagram': 650000, 'twitter': 180000}
+PLATFORM_ENGAGEMENT = {'youtube': 4.2, 'tiktok': 17.8, 'instagram': 6.4, 'twitter': 2.1}
+PLATFORM_WEIGHTS = {'tiktok': 1.5, 'youtube': 1.3, 'instagram': 1.2, 'twitter': 1.0}
+
+# Palavras-chave do tema em alta, comparadas às palavras dos títulos
+TRENDING_KEYWORDS = (
+    'viral', 'receita', 'dança', 'transformação', 'tutorial',
+    'gameplay', 'música', 'viagem', 'maquiagem', 'comédia',
+    'desafio', 'hack', 'trend', 'stories', 'reels'
+)
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+WEEKDAYS = ('Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom')
+
+
 class MetricsCalculator:
     """Calcula métricas e KPIs para o painel de inteligência"""
     
     def __init__(self):
-        self.data_dir = Path('data/tendencias')
         self.cache_duration = timedelta(hours=1)  # Cache de métricas por 1 hora
+        # Mesmo banco do TrendsManager e do importador (TENDENCIAS_DB)
+        self.store = tendencias_store_para()
+        with _results_lock:
+            self._results = _results_cache.setdefault(self.store.caminho, {})
+    
+    def _cached_result(self, key: Any, revision: tuple) -> Optional[Any]:
+        """Resultado já calculado para a mesma revisão, se ainda dentro de `cache_duration`"""
+        with _results_lock:
+            cached = self._results.get(key)
+        if cached and cached[0] == revision and datetime.now() - cached[1] < self.cache_duration:
+            return cached[2]
+        return None
+    
+    def _store_result(self, key: Any, revision: tuple, value: Any):
+        with _results_lock:
+            self._results[key] = (revision, datetime.now(), value)
         
     def get_global_metrics(self) -> Dict[str, Any]:
-        """Calcula métricas globais do painel"""
+        """Calcula métricas globais do painel (recalcula só quando os dados mudam)"""
         try:
             # Coleta dados de todas as plataformas
-            all_data = self._collect_all_platform_data()
+            revision = self.store.revisao()
+            cached = self._cached_result('global_metrics', revision)
+            if cached is not None:
+                return dict(cached)
+            
+            all_data = self.store.ultimas_coletas()
             
             if not all_data:
                 return self._get_fallback_metrics()
             
-            # Calcula KPIs principais
-            metrics = {
-                'total_posts': self._calculate_total_posts(all_data),
-                'avg_likes': self._calculate_avg_likes(all_data),
-                'total_views': self._calculate_total_views(all_data),
-                'avg_engagement': self._calculate_avg_engagement(all_data),
-                'top_platform': self._get_top_platform(all_data),
-                'trending_topic': self._get_trending_topic(all_data),
-                'platform_distribution': self._get_platform_distribution(all_data),
-                'engagement_trend': self._get_engagement_trend(all_data),
-                'last_update': datetime.now().strftime('%H:%M')
-            }
+            # Calcula KPIs principais (uma passada sobre as tendências)
+            metrics = self._calculate_kpis(all_data)
             
             logger.info(f"Métricas calculadas: {metrics['total_posts']} posts de {len(all_data)} plataformas")
-            return metrics
+            self._store_result('global_metrics', revision, metrics)
+            return dict(metrics)
             
         except Exception as e:
             logger.error(f"Erro ao calcular métricas: {e}")
             return self._get_fallback_metrics()
     
     def _collect_all_platform_data(self) -> Dict[str, List[Dict]]:
-        """Coleta dados de todas as plataformas"""
-        all_data = {}
+        """Coleta dados de todas as plataformas (última coleta de cada uma)"""
+        return self.store.ultimas_coletas()
+    
+    def _aggregate(self, all_data: Dict[str, List[Dict]]) -> Dict[str, Any]:
+        """
+        Agrega as tendências em uma única passada
+        
+        Returns:
+            Dict com posts por plataforma (`counts`) e títulos que citam
+            cada palavra-chave (`keywords`); os KPIs saem desses totais
+        """
+        counts = {}
+        keyword_counts = Counter()
+        keywords = set(TRENDING_KEYWORDS)
         
-        if not self.data_dir.exists():
-            return {}
+        for platform, trends in all_data.items():
+            counts[platform] = len(trends)
+            for trend in trends:
+                # Cada palavra-chave conta uma vez por título
+                tokens = set(TOKEN_PATTERN.findall((trend.get('titulo') or '').lower()))
+                keyword_counts.update(tokens & keywords)
         
-        # Processa arquivos de cache de cada plataforma
-        for cache_file in self.data_dir.glob('*.json'):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                platform = data.get('platform', cache_file.stem.split('_')[0])
-                trends = data.get('trends', [])
-                
-                if trends:
-                    all_data[platform] = trends
-                    
-            except Exception as e:
-                logger.warning(f"Erro ao ler {cache_file}: {e}")
-                continue
+        return {'counts': counts, 'keywords': keyword_counts}
+    
+    def _calculate_kpis(self, all_data: Dict[str, List[Dict]]) -> Dict[str, Any]:
+        """Calcula todos os KPIs a partir dos totais agregados"""
+        aggregates = self._aggregate(all_data)
+        counts = aggregates['counts']
         
-        return all_data
+        return {
+            'total_posts': self._calculate_total_posts(counts),
+            'avg_likes': self._calculate_avg_likes(counts),
+            'total_views': self._calculate_total_views(counts),
+            'avg_engagement': self._calculate_avg_engagement(counts),
+            'top_platform': self._get_top_platform(counts),
+            'trending_topic': self._get_trending_topic(aggregates['keywords'], counts),
+            'platform_distribution': self._get_platform_distribution(counts),
+            'engagement_trend': self._get_engagement_trend(),
+            'last_update': datetime.now().strftime('%H:%M')
+        }
     
-    def _calculate_total_posts(self, all_data: Dict[str, List[Dict]]) -> int:
+    def _calculate_total_posts(self, counts: Dict[str, int]) -> int:
         """Calcula total de posts virais detectados"""
-        return sum(len(trends) for trends in all_data.values())
+        return sum(counts.values())
     
-    def _calculate_avg_likes(self, all_data: Dict[str, List[Dict]]) -> str:
+    def _calculate_avg_likes(self, counts: Dict[str, int]) -> str:
         """Calcula média de curtidas (simulada baseada em padrões)"""
-        total_posts = self._calculate_total_posts(all_data)
+        total_posts = self._calculate_total_posts(counts)
         
         if total_posts == 0:
             return "0"
         
         # Simula métricas baseadas em padrões reais
-        platform_multipliers = {
-            'youtube': 45000,
-            'tiktok': 125000,
-            'instagram': 85000,
-            'twitter': 25000
-        }
-        
-        total_likes = 0
-        for platform, trends in all_data.items():
-            multiplier = platform_multipliers.get(platform, 50000)
-            total_likes += len(trends) * multiplier
-        
+        total_likes = sum(count * PLATFORM_LIKES.get(platform, 50000) for platform, count in counts.items())
         avg = total_likes / total_posts
         
         if avg >= 1000000:
@@ -105,25 +152,13 @@ class MetricsCalculator:
         else:
             return f"{avg:.0f}"
     
-    def _calculate_total_views(self, all_data: Dict[str, List[Dict]]) -> str:
+    def _calculate_total_views(self, counts: Dict[str, int]) -> str:
         """Calcula total de visualizações combinadas"""
-        total_posts = self._calculate_total_posts(all_data)
-        
-        if total_posts == 0:
+        if self._calculate_total_posts(counts) == 0:
             return "0"
         
         # Simula visualizações baseadas em padrões
-        platform_view_multipliers = {
-            'youtube': 850000,
-            'tiktok': 2100000,
-            'instagram': 650000,
-            'twitter': 180000
-        }
-        
-        total_views = 0
-        for platform, trends in all_data.items():
-            multiplier = platform_view_multipliers.get(platform, 800000)
-            total_views += len(trends) * multiplier
+        total_views = sum(count * PLATFORM_VIEWS.get(platform, 800000) for platform, count in counts.items())
         
         if total_views >= 1000000000:
             return f"{total_views/1000000000:.1f}B"
@@ -134,135 +169,86 @@ class MetricsCalculator:
         else:
             return f"{total_views:.0f}"
     
-    def _calculate_avg_engagement(self, all_data: Dict[str, List[Dict]]) -> str:
+    def _calculate_avg_engagement(self, counts: Dict[str, int]) -> str:
         """Calcula engajamento médio por rede social"""
-        if not all_data:
-            return "0%"
-        
         # Simula taxas de engajamento baseadas em benchmarks reais
-        platform_engagement = {
-            'youtube': 4.2,
-            'tiktok': 17.8,
-            'instagram': 6.4,
-            'twitter': 2.1
-        }
-        
-        total_engagement = 0
-        total_platforms = 0
+        rates = [PLATFORM_ENGAGEMENT[platform] for platform in counts if platform in PLATFORM_ENGAGEMENT]
         
-        for platform in all_data.keys():
-            if platform in platform_engagement:
-                total_engagement += platform_engagement[platform]
-                total_platforms += 1
-        
-        if total_platforms == 0:
+        if not rates:
             return "0%"
         
-        avg_engagement = total_engagement / total_platforms
-        return f"{avg_engagement:.1f}%"
+        return f"{sum(rates) / len(rates):.1f}%"
     
-    def _get_top_platform(self, all_data: Dict[str, List[Dict]]) -> str:
+    def _get_top_platform(self, counts: Dict[str, int]) -> str:
         """Identifica rede com maior volume de interações"""
-        if not all_data:
+        if not counts:
             return "N/A"
         
-        # Calcula "volume" baseado no número de tendências e multiplicadores
-        platform_scores = {}
-        platform_names = {
-            'youtube': 'YouTube',
-            'tiktok': 'TikTok',
-            'instagram': 'Instagram',
-            'twitter': 'Twitter'
+        # Score baseado em número de tendências e peso da plataforma
+        platform_scores = {
+            platform: count * PLATFORM_WEIGHTS.get(platform, 1.0)
+            for platform, count in counts.items()
         }
         
-        for platform, trends in all_data.items():
-            # Score baseado em número de tendências e peso da plataforma
-            platform_weights = {
-                'tiktok': 1.5,
-                'youtube': 1.3,
-                'instagram': 1.2,
-                'twitter': 1.0
-            }
-            
-            weight = platform_weights.get(platform, 1.0)
-            score = len(trends) * weight
-            platform_scores[platform] = score
-        
-        if not platform_scores:
-            return "N/A"
-        
         top_platform = max(platform_scores, key=platform_scores.get)
-        return platform_names.get(top_platform, top_platform.title())
+        return PLATFORM_NAMES.get(top_platform, top_platform.title())
     
-    def _get_trending_topic(self, all_data: Dict[str, List[Dict]]) -> str:
+    def _get_trending_topic(self, keyword_counts: Counter, counts: Dict[str, int]) -> str:
         """Identifica tag ou tema mais recorrente"""
-        # Analisa títulos para encontrar padrões
-        all_titles = []
-        
-        for trends in all_data.values():
-            for trend in trends:
-                title = trend.get('titulo', '').lower()
-                all_titles.append(title)
-        
-        if not all_titles:
+        if not self._calculate_total_posts(counts):
             return "N/A"
         
-        # Identifica palavras-chave mais comuns
-        common_keywords = [
-            'viral', 'receita', 'dança', 'transformação', 'tutorial',
-            'gameplay', 'música', 'viagem', 'maquiagem', 'comédia',
-            'desafio', 'hack', 'trend', 'stories', 'reels'
-        ]
-        
-        keyword_counts = {}
-        for keyword in common_keywords:
-            count = sum(1 for title in all_titles if keyword in title)
-            if count > 0:
-                keyword_counts[keyword] = count
-        
         if not keyword_counts:
             return "Conteúdo Criativo"
         
-        top_keyword = max(keyword_counts, key=keyword_counts.get)
+        # Em caso de empate vale a ordem de TRENDING_KEYWORDS
+        top_keyword = max(TRENDING_KEYWORDS, key=lambda keyword: keyword_counts[keyword])
         return f"#{top_keyword.title()}"
     
-    def _get_platform_distribution(self, all_data: Dict[str, List[Dict]]) -> Dict[str, int]:
+    def _get_platform_distribution(self, counts: Dict[str, int]) -> Dict[str, int]:
         """Retorna distribuição de posts por plataforma"""
-        distribution = {}
-        platform_names = {
-            'youtube': 'YouTube',
-            'tiktok': 'TikTok',
-            'instagram': 'Instagram',
-            'twitter': 'Twitter'
+        return {
+            PLATFORM_NAMES.get(platform, platform.title()): count
+            for platform, count in counts.items()
         }
-        
-        for platform, trends in all_data.items():
-            name = platform_names.get(platform, platform.title())
-            distribution[name] = len(trends)
-        
-        return distribution
     
-    def _get_engagement_trend(self, all_data: Dict[str, List[Dict]]) -> List[Dict]:
-        """Simula tendência de engajamento para gráfico"""
-        if not all_data:
-            return []
+    def _get_engagement_trend(self, days: int = 7) -> List[Dict]:
+        """
+        Série diária de engajamento real (janela móvel) a partir dos resumos do banco
         
-        # Simula dados de engajamento dos últimos 7 dias
-        days = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-        base_engagement = 15.2
+        Usa o resumo de todas as plataformas de cada dia: média, p50 e p90 são
+        calculados sobre o mesmo conjunto de amostras.
         
-        trend_data = []
-        for i, day in enumerate(days):
-            # Simula variação natural de engajamento
-            variation = (-1) ** i * (i * 0.8) + (i * 0.3)
-            engagement = max(base_engagement + variation, 5.0)
+        Returns:
+            Lista de {day, date, engagement, p50, p90, samples}, só dos dias com dados
+        """
+        return [
+            {
+                'day': WEEKDAYS[date.fromisoformat(row['dia']).weekday()],
+                'date': row['dia'],
+                'engagement': round(row['media'], 1),
+                'p50': round(row['p50'], 1),
+                'p90': round(row['p90'], 1),
+                'samples': row['amostras']
+            }
+            for row in self.store.engajamento_diario(days, plataformas=[PLATAFORMA_TODAS])
+        ]
+    
+    def get_engagement_trend(self, days: int = 7) -> List[Dict]:
+        """Tendência de engajamento dos últimos `days` dias (7, 30, 90...), em cache até nova coleta"""
+        try:
+            revision = self.store.revisao()
+            cached = self._cached_result(('engagement_trend', days), revision)
+            if cached is not None:
+                return list(cached)
             
-            trend_data.append({
-                'day': day,
-                'engagement': round(engagement, 1)
-            })
-        
-        return trend_data
+            trend_data = self._get_engagement_trend(days)
+            self._store_result(('engagement_trend', days), revision, trend_data)
+            return list(trend_data)
+            
+        except Exception as e:
+            logger.error(f"Erro ao calcular tendência de engajamento: {e}")
+            return []
     
     def _get_fallback_metrics(self) -> Dict[str, Any]:
         """Retorna métricas de fallback quando não há dados"""
@@ -281,7 +267,12 @@ class MetricsCalculator:
     def get_viral_posts_sample(self, limit: int = 12) -> List[Dict]:
         """Retorna amostra de posts virais para exibição"""
         try:
-            all_data = self._collect_all_platform_data()
+            revision = self.store.revisao()
+            cached = self._cached_result(('viral_posts', limit), revision)
+            if cached is not None:
+                return list(cached)
+            
+            all_data = self.store.ultimas_coletas()
             
             if not all_data:
                 return self._get_sample_posts()
@@ -296,6 +287,7 @@ class MetricsCalculator:
             
             # Ordena por "engajamento" simulado e retorna os top
             all_posts.sort(key=lambda x: x['engagement_score'], reverse=True)
+            self._store_result(('viral_posts', limit), revision, all_posts[:limit])
             return all_posts[:limit]
             
         except Exception as e:
@@ -6,17 +6,19 @@ import os
 import re
 import subprocess
 import tempfile
-import whisper
-import yt_dlp
 from urllib.parse import urlparse
-import streamlit as st
 from modules.cerebro import get_cerebro_context
 from services.ai_agents import gerar_roteiro_com_ia
-import anthropic
+from services.llm_gateway import llm_gateway
+from services.jobs import job_manager
+from services.transcription_cache import extrair_info_video, obter_transcricao, transcrever_com_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Raio-X transcreve sempre em português (as outras telas usam detecção automática)
+IDIOMA_TRANSCRICAO = 'pt'
+
 def detect_platform(url):
     """Detecta a plataforma do vídeo baseado na URL"""
     url_lower = url.lower()
@@ -66,78 +68,58 @@ def validate_video_url(url):
     
     return False, "URL não suportada ou formato inválido"
 
+# As funções abaixo rodam na thread do job (fora do Streamlit): em vez de
+# chamar st.error, levantam a exceção e process_video_complete devolve a
+# mensagem no erro do job
+
+def _cliente_ia():
+    """Gateway da API do Claude; levanta erro se a chave não estiver configurada"""
+    if not llm_gateway.configurado():
+        raise RuntimeError("Chave da API do Anthropic não encontrada. Configure no arquivo .env")
+    return llm_gateway
+
 def extract_video_metadata(url):
-    """Extrai metadados do vídeo usando yt-dlp"""
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            metadata = {
-                'title': info.get('title', 'Título não disponível'),
-                'uploader': info.get('uploader', 'Autor não disponível'),
-                'duration': info.get('duration', 0),
-                'view_count': info.get('view_count', 0),
-                'like_count': info.get('like_count', 0),
-                'description': info.get('description', ''),
-                'upload_date': info.get('upload_date', ''),
-                'thumbnail': info.get('thumbnail', ''),
-                'platform': detect_platform(url)
-            }
-            
-            return metadata
-            
-    except Exception as e:
-        st.error(f"Erro ao extrair metadados: {str(e)}")
-        return None
+    """Extrai metadados do vídeo usando yt-dlp (com cache por ID do vídeo)"""
+    info = extrair_info_video(url)
+    
+    return {
+        'video_id': info.get('video_id'),
+        'title': info.get('title') or 'Título não disponível',
+        'uploader': info.get('uploader') or 'Autor não disponível',
+        'duration': info.get('duration') or 0,
+        'view_count': info.get('view_count') or 0,
+        'like_count': info.get('like_count') or 0,
+        'description': info.get('description') or '',
+        'upload_date': info.get('upload_date') or '',
+        'thumbnail': info.get('thumbnail') or '',
+        'platform': detect_platform(url)
+    }
 
 def download_video_audio(url, output_path):
     """Baixa o áudio do vídeo usando yt-dlp"""
-    try:
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': output_path,
-            'extractaudio': True,
-            'audioformat': 'mp3',
-            'quiet': True,
-            'no_warnings': True,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-            
-        return True
-        
-    except Exception as e:
-        st.error(f"Erro ao baixar áudio: {str(e)}")
-        return False
+    import yt_dlp
+    
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': output_path,
+        'extractaudio': True,
+        'audioformat': 'mp3',
+        'quiet': True,
+        'no_warnings': True,
+    }
+    
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
 
-def transcribe_audio(audio_path):
-    """Transcreve o áudio usando OpenAI Whisper"""
-    try:
-        # Carrega o modelo Whisper
-        model = whisper.load_model("base")
-        
-        # Transcreve o áudio
-        result = model.transcribe(audio_path, language='pt')
-        
-        return result["text"]
-        
-    except Exception as e:
-        st.error(f"Erro na transcrição: {str(e)}")
-        return None
+def transcribe_audio(audio_path, video_id=None):
+    """Transcreve o áudio usando OpenAI Whisper (pool compartilhado e cache)"""
+    return transcrever_com_cache(audio_path, video_id=video_id, idioma=IDIOMA_TRANSCRICAO)
 
 def analyze_copy_structure(transcription, video_metadata):
     """Analisa a estrutura do copy usando IA"""
-    try:
-        client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        
-        prompt = f"""
+    client = _cliente_ia()
+    
+    prompt = f"""
 Analise a transcrição abaixo de um vídeo que performou bem e identifique a estrutura do copy:
 
 METADADOS DO VÍDEO:
@@ -172,31 +154,19 @@ Por favor, identifique e extraia:
 
 Seja específico e detalhado na análise.
 """
-        
-        response = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
-        
-    except Exception as e:
-        st.error(f"Erro na análise da estrutura: {str(e)}")
-        return None
-
-def generate_similar_copy(structure_analysis, transcription, video_metadata):
-    """Gera uma copy similar baseada na estrutura analisada"""
-    try:
-        client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        
-        # Obtém contexto do usuário
-        user_context = get_cerebro_context()
-        
-        prompt = f"""
-Com base na análise estrutural abaixo, crie uma nova copy seguindo o mesmo padrão de engajamento, mas adaptada ao contexto do usuário:
+    
+    response = client.criar_mensagem(
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=2000,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    
+    return response.content[0].text
 
-{user_context}
+def montar_prompt_copy(structure_analysis, transcription):
+    """Monta o prompt de geração da copy similar (o contexto do usuário vai em prefixo cacheado)"""
+    return f"""
+Com base na análise estrutural abaixo, crie uma nova copy seguindo o mesmo padrão de engajamento, mas adaptada ao contexto do usuário (perfil acima).
 
 ANÁLISE ESTRUTURAL DO VÍDEO ORIGINAL:
 {structure_analysis}
@@ -225,18 +195,21 @@ FORMATO DA RESPOSTA:
 ⏱️ DURAÇÃO ESTIMADA: [X] segundos
 📝 PALAVRAS: [X] palavras
 """
-        
-        response = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=3000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
-        
-    except Exception as e:
-        st.error(f"Erro na geração da copy: {str(e)}")
-        return None
+
+def generate_similar_copy_stream(structure_analysis, transcription, video_metadata):
+    """Gera a copy similar em streaming, produzindo trechos de texto conforme chegam"""
+    client = _cliente_ia()
+    
+    # Obtém contexto do usuário
+    user_context = get_cerebro_context()
+    prompt = montar_prompt_copy(structure_analysis, transcription)
+    
+    yield from client.stream_texto(
+        contexto_cacheavel=user_context,
+        model="claude-3-5-sonnet-20241022",
+        max_tokens=3000,
+        messages=[{"role": "user", "content": prompt}]
+    )
 
 def process_video_complete(url, progress_callback=None):
     """Processa o vídeo completo: download, transcrição e análise"""
@@ -253,44 +226,67 @@ def process_video_complete(url, progress_callback=None):
     if progress_callback:
         progress_callback("📋 Extraindo metadados...")
     
-    metadata = extract_video_metadata(url)
-    if not metadata:
-        return None, "Erro ao extrair metadados do vídeo"
+    try:
+        metadata = extract_video_metadata(url)
+    except Exception as e:
+        return None, f"Erro ao extrair metadados do vídeo: {str(e)}"
     
     # Criação de diretório temporário
     temp_dir = tempfile.mkdtemp()
     audio_path = os.path.join(temp_dir, "temp_audio.mp3")
     
     try:
-        # Download do áudio
-        if progress_callback:
-            progress_callback("🔄 Baixando áudio do vídeo...")
-        
-        if not download_video_audio(url, audio_path):
-            return None, "Erro ao baixar áudio do vídeo"
-        
-        # Transcrição
-        if progress_callback:
-            progress_callback("🧠 Transcrevendo áudio...")
+        # Transcrição já feita para este vídeo dispensa download e Whisper
+        transcription = obter_transcricao(video_id=metadata.get('video_id'), idioma=IDIOMA_TRANSCRICAO)
         
-        transcription = transcribe_audio(audio_path)
         if not transcription:
-            return None, "Erro na transcrição do áudio"
+            # Download do áudio
+            if progress_callback:
+                progress_callback("🔄 Baixando áudio do vídeo...")
+            
+            try:
+                download_video_audio(url, audio_path)
+            except Exception as e:
+                return None, f"Erro ao baixar áudio do vídeo: {str(e)}"
+            
+            # Transcrição
+            if progress_callback:
+                progress_callback("🧠 Transcrevendo áudio...")
+            
+            try:
+                transcription = transcribe_audio(audio_path, video_id=metadata.get('video_id'))
+            except Exception as e:
+                return None, f"Erro na transcrição do áudio: {str(e)}"
+            if not transcription:
+                return None, "Erro na transcrição do áudio: nenhum texto reconhecido"
         
         # Análise da estrutura
         if progress_callback:
             progress_callback("📊 Analisando estrutura do copy...")
         
-        structure_analysis = analyze_copy_structure(transcription, metadata)
+        try:
+            structure_analysis = analyze_copy_structure(transcription, metadata)
+        except Exception as e:
+            return None, f"Erro na análise da estrutura: {str(e)}"
         if not structure_analysis:
-            return None, "Erro na análise da estrutura"
+            return None, "Erro na análise da estrutura: resposta vazia da IA"
         
         # Geração da nova copy
         if progress_callback:
             progress_callback("✍️ Gerando nova copy personalizada...")
         
-        new_copy = generate_similar_copy(structure_analysis, transcription, metadata)
-        if not new_copy:
+        # Repassa a copy parcial ao callback conforme os trechos chegam
+        new_copy = ""
+        try:
+            for trecho in generate_similar_copy_stream(structure_analysis, transcription, metadata):
+                new_copy += trecho
+                if progress_callback:
+                    progress_callback("✍️ Gerando nova copy personalizada...", parcial=new_copy)
+        except Exception as e:
+            # Copy interrompida no meio não é entregue como resultado
+            return None, f"Erro na geração da nova copy: {str(e)}"
+        
+        if not new_copy.strip():
             return None, "Erro na geração da nova copy"
         
         # Resultado final
@@ -319,6 +315,10 @@ def process_video_complete(url, progress_callback=None):
         except:
             pass
 
+def enfileirar_processamento_video(url):
+    """Enfileira o processamento completo do vídeo em background e retorna o ID do job"""
+    return job_manager.submit(process_video_complete, url, descricao=f"Raio-X: {url}")
+
 def format_duration(seconds):
     """Formata duração em segundos para formato legível"""
     if seconds < 60:
@@ -0,0 +1,64 @@
+"""
+Controle de taxa por domínio para requisições HTTP concorrentes
+Limita conexões simultâneas (globais e por host) e o intervalo entre requisições ao mesmo host
+"""
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Politeness por domínio com limite global de conexões"""
+
+    def __init__(self, max_conexoes: int = 8, max_por_host: int = 2,
+                 intervalo_minimo: float = 0.5, intervalos_por_host: Optional[Dict[str, float]] = None,
+                 jitter: float = 0.0):
+        """
+        Inicializa o limitador
+
+        Args:
+            max_conexoes: Conexões simultâneas no total
+            max_por_host: Conexões simultâneas para um mesmo domínio
+            intervalo_minimo: Segundos entre o início de duas requisições ao mesmo domínio
+            intervalos_por_host: Intervalo próprio de alguns domínios (ex.: redes sociais)
+            jitter: Segundos aleatórios (0 a `jitter`) somados a cada intervalo
+        """
+        self.max_por_host = max(1, max_por_host)
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalos_por_host = intervalos_por_host or {}
+        self.jitter = jitter
+        self._global = threading.BoundedSemaphore(max(1, max_conexoes))
+        self._hosts = {}  # host -> semáforo
+        self._proximo_horario = {}  # host -> horário liberado para a próxima requisição
+        self._trava = threading.Lock()
+
+    def _semaforo_host(self, host: str) -> threading.BoundedSemaphore:
+        with self._trava:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._hosts[host]
+
+    def _reservar_horario(self, host: str) -> float:
+        """Reserva o próximo horário livre para o host e retorna quanto esperar"""
+        with self._trava:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo_horario.get(host, 0.0))
+            intervalo = self.intervalos_por_host.get(host, self.intervalo_minimo)
+            self._proximo_horario[host] = horario + intervalo + random.uniform(0, self.jitter)
+            return horario - agora
+
+    @contextmanager
+    def slot(self, url: str):
+        """Bloqueia até a requisição para `url` ser permitida"""
+        host = urlparse(url).netloc.lower()
+        semaforo_host = self._semaforo_host(host)
+
+        with semaforo_host:
+            espera = self._reservar_horario(host)
+            if espera > 0:
+                time.sleep(espera)
+            with self._global:
+                yield
@@ -0,0 +1,523 @@
+"""
+Armazenamento de tendências em SQLite
+Uma linha por tendência coletada (plataforma, horário, título, curtidas, views, tags),
+com índices para consultas por plataforma e intervalo de datas
+Resumo diário de engajamento (média, p50, p90) por plataforma, atualizado a cada coleta
+Substitui os arquivos {plataforma}_{AAAA-MM-DD}.json de data/tendencias
+
+Migração dos arquivos antigos:
+    python -m utils.tendencias_store --importar data/tendencias [--remover]
+"""
+import os
+import re
+import json
+import sqlite3
+import argparse
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TENDENCIAS_DB = os.getenv("TENDENCIAS_DB", "data/tendencias.db")
+
+# Diretório com os JSON diários antigos, importado na primeira abertura do banco
+TENDENCIAS_JSON_LEGADO = "data/tendencias"
+
+# Tempo de espera por uma trava de escrita de outra sessão/processo
+TIMEOUT_TRAVA_SEGUNDOS = 10
+
+# Campos guardados em colunas próprias; o restante da tendência vai em `extras`
+CHAVES_TITULO = ("titulo", "title")
+CHAVES_LIKES = ("likes", "curtidas")
+CHAVES_VIEWS = ("views", "visualizacoes")
+CHAVES_TAGS = ("tags", "hashtags")
+
+# Engajamento informado pelo crawler ou calculado por (curtidas + comentários + compartilhamentos) / views
+CHAVES_ENGAJAMENTO = ("engagement_rate", "engajamento")
+CHAVES_COMENTARIOS = ("comments", "comentarios")
+CHAVES_COMPARTILHAMENTOS = ("shares", "compartilhamentos")
+
+# Linha de engajamento_diario com todas as plataformas do dia juntas
+# (média e percentis sobre todas as amostras, não combinados por plataforma)
+PLATAFORMA_TODAS = "*"
+
+
+def _primeiro(tendencia: Dict, chaves: Tuple[str, ...]):
+    for chave in chaves:
+        if tendencia.get(chave) not in (None, ""):
+            return tendencia[chave]
+    return None
+
+
+def _inteiro(valor) -> Optional[int]:
+    """Converte contagens (int, float ou texto como "12.400") em inteiro"""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    digitos = re.sub(r"[^\d]", "", str(valor))
+    return int(digitos) if digitos else None
+
+
+def _tags(valor) -> List[str]:
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        valor = re.split(r"[,\s]+", valor)
+    return [str(tag).strip().lstrip("#").lower() for tag in valor if str(tag).strip().lstrip("#")]
+
+
+def _engajamento(tendencia: Dict, likes: Optional[int], views: Optional[int]) -> Optional[float]:
+    """Taxa de engajamento (%) da tendência ou None se não houver dados para calculá-la"""
+    informado = _primeiro(tendencia, CHAVES_ENGAJAMENTO)
+    if informado is not None:
+        try:
+            return float(str(informado).replace("%", "").replace(",", ".").strip())
+        except ValueError:
+            pass
+
+    if not views or likes is None:
+        return None
+    interacoes = likes + (_inteiro(_primeiro(tendencia, CHAVES_COMENTARIOS)) or 0) + \
+        (_inteiro(_primeiro(tendencia, CHAVES_COMPARTILHAMENTOS)) or 0)
+    return interacoes / views * 100
+
+
+def _percentil(ordenados: List[float], fracao: float) -> float:
+    """Percentil com interpolação linear sobre uma lista já ordenada"""
+    posicao = (len(ordenados) - 1) * fracao
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+class TendenciasStore:
+    """Coletas de tendências por plataforma, consultáveis por período"""
+
+    def __init__(self, caminho: str = TENDENCIAS_DB, json_legado: Optional[str] = TENDENCIAS_JSON_LEGADO):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            caminho: Arquivo SQLite
+            json_legado: Diretório de JSON diários a importar na primeira abertura
+        """
+        self.caminho = caminho
+        self.json_legado = json_legado
+        self._inicializado = False
+        self._trava = threading.Lock()
+
+    @contextmanager
+    def _conexao(self):
+        """Abre uma conexão curta; o bloco `with` é uma transação atômica"""
+        self._inicializar()
+        conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+        try:
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _inicializar(self):
+        if self._inicializado:
+            return
+
+        with self._trava:
+            if self._inicializado:
+                return
+
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=TIMEOUT_TRAVA_SEGUNDOS)
+            try:
+                # WAL: o painel lê enquanto o agendador grava
+                conexao.execute("PRAGMA journal_mode=WAL")
+                with conexao:
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS coletas (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            plataforma TEXT NOT NULL,
+                            coletado_em TEXT NOT NULL,
+                            origem TEXT UNIQUE
+                        )
+                    """)
+                    conexao.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_coletas_plataforma
+                        ON coletas (plataforma, coletado_em)
+                    """)
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS tendencias (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            coleta_id INTEGER NOT NULL REFERENCES coletas (id),
+                            plataforma TEXT NOT NULL,
+                            coletado_em TEXT NOT NULL,
+                            posicao INTEGER NOT NULL,
+                            titulo TEXT,
+                            likes INTEGER,
+                            views INTEGER,
+                            tags TEXT,
+                            extras TEXT,
+                            engajamento REAL
+                        )
+                    """)
+                    conexao.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_tendencias_plataforma
+                        ON tendencias (plataforma, coletado_em)
+                    """)
+                    colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(tendencias)")}
+                    if "engajamento" not in colunas:
+                        conexao.execute("ALTER TABLE tendencias ADD COLUMN engajamento REAL")
+                    conexao.execute("CREATE INDEX IF NOT EXISTS idx_tendencias_data ON tendencias (coletado_em)")
+                    conexao.execute("CREATE INDEX IF NOT EXISTS idx_tendencias_coleta ON tendencias (coleta_id)")
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS metadados (
+                            chave TEXT PRIMARY KEY,
+                            valor TEXT
+                        )
+                    """)
+                    conexao.execute("""
+                        CREATE TABLE IF NOT EXISTS engajamento_diario (
+                            dia TEXT NOT NULL,
+                            plataforma TEXT NOT NULL,
+                            amostras INTEGER NOT NULL,
+                            media REAL NOT NULL,
+                            p50 REAL NOT NULL,
+                            p90 REAL NOT NULL,
+                            PRIMARY KEY (dia, plataforma)
+                        )
+                    """)
+                    self._calcular_engajamento_existente(conexao)
+                    self._calcular_resumo_geral_existente(conexao)
+                    if not conexao.execute("SELECT 1 FROM metadados WHERE chave = 'json_importado'").fetchone():
+                        total = self._importar_diretorio(conexao, self.json_legado)
+                        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('json_importado', ?)",
+                                        (str(total),))
+            finally:
+                conexao.close()
+
+            self._inicializado = True
+
+    def _inserir_coleta(self, conexao: sqlite3.Connection, plataforma: str, tendencias: Iterable[Dict],
+                        coletado_em: str, origem: Optional[str] = None) -> Optional[int]:
+        cursor = conexao.execute(
+            "INSERT OR IGNORE INTO coletas (plataforma, coletado_em, origem) VALUES (?, ?, ?)",
+            (plataforma, coletado_em, origem)
+        )
+        if not cursor.rowcount:
+            return None  # origem já importada
+        coleta_id = cursor.lastrowid
+
+        linhas = []
+        for posicao, tendencia in enumerate(tendencias):
+            extras = {chave: valor for chave, valor in tendencia.items()
+                      if chave not in CHAVES_TITULO + CHAVES_LIKES + CHAVES_VIEWS + CHAVES_TAGS}
+            tags = _tags(_primeiro(tendencia, CHAVES_TAGS))
+            likes = _inteiro(_primeiro(tendencia, CHAVES_LIKES))
+            views = _inteiro(_primeiro(tendencia, CHAVES_VIEWS))
+            linhas.append((
+                coleta_id, plataforma, coletado_em, posicao,
+                _primeiro(tendencia, CHAVES_TITULO),
+                likes,
+                views,
+                json.dumps(tags, ensure_ascii=False) if tags else None,
+                json.dumps(extras, ensure_ascii=False, separators=(",", ":")) if extras else None,
+                _engajamento(tendencia, likes, views)
+            ))
+        conexao.executemany(
+            """
+            INSERT INTO tendencias
+                (coleta_id, plataforma, coletado_em, posicao, titulo, likes, views, tags, extras, engajamento)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            linhas
+        )
+        self._atualizar_resumo_diario(conexao, coletado_em[:10], plataforma)
+        self._atualizar_resumo_diario(conexao, coletado_em[:10], PLATAFORMA_TODAS)
+        return coleta_id
+
+    def _atualizar_resumo_diario(self, conexao: sqlite3.Connection, dia: str, plataforma: str):
+        """Recalcula o resumo de engajamento de um único (dia, plataforma) a partir do índice"""
+        inicio = date.fromisoformat(dia)
+        sql = """
+            SELECT engajamento FROM tendencias
+            WHERE coletado_em >= ? AND coletado_em < ? AND engajamento IS NOT NULL
+        """
+        parametros = [inicio.isoformat(), (inicio + timedelta(days=1)).isoformat()]
+        if plataforma != PLATAFORMA_TODAS:
+            sql += " AND plataforma = ?"
+            parametros.append(plataforma)
+        valores = sorted(valor for (valor,) in conexao.execute(sql, parametros))
+
+        if not valores:
+            conexao.execute("DELETE FROM engajamento_diario WHERE dia = ? AND plataforma = ?", (dia, plataforma))
+            return
+
+        conexao.execute(
+            """
+            INSERT INTO engajamento_diario (dia, plataforma, amostras, media, p50, p90)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(dia, plataforma) DO UPDATE SET
+                amostras = excluded.amostras, media = excluded.media,
+                p50 = excluded.p50, p90 = excluded.p90
+            """,
+            (dia, plataforma, len(valores), sum(valores) / len(valores),
+             _percentil(valores, 0.5), _percentil(valores, 0.9))
+        )
+
+    def _calcular_engajamento_existente(self, conexao: sqlite3.Connection):
+        """Preenche engajamento e resumos diários de bancos criados antes dessas colunas (uma vez)"""
+        if conexao.execute("SELECT 1 FROM metadados WHERE chave = 'engajamento_calculado'").fetchone():
+            return
+
+        atualizacoes = []
+        for id_, likes, views, extras in conexao.execute(
+                "SELECT id, likes, views, extras FROM tendencias WHERE engajamento IS NULL"):
+            valor = _engajamento(json.loads(extras) if extras else {}, likes, views)
+            if valor is not None:
+                atualizacoes.append((valor, id_))
+        conexao.executemany("UPDATE tendencias SET engajamento = ? WHERE id = ?", atualizacoes)
+
+        for dia, plataforma in conexao.execute(
+                "SELECT DISTINCT substr(coletado_em, 1, 10), plataforma FROM tendencias").fetchall():
+            self._atualizar_resumo_diario(conexao, dia, plataforma)
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('engajamento_calculado', '1')")
+
+    def _calcular_resumo_geral_existente(self, conexao: sqlite3.Connection):
+        """Preenche o resumo de todas as plataformas dos dias já resumidos por plataforma (uma vez)"""
+        if conexao.execute("SELECT 1 FROM metadados WHERE chave = 'resumo_geral_calculado'").fetchone():
+            return
+
+        for (dia,) in conexao.execute("SELECT DISTINCT dia FROM engajamento_diario").fetchall():
+            self._atualizar_resumo_diario(conexao, dia, PLATAFORMA_TODAS)
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('resumo_geral_calculado', '1')")
+
+    def _importar_diretorio(self, conexao: sqlite3.Connection, diretorio: Optional[str]) -> int:
+        """Importa os JSON {plataforma}_{AAAA-MM-DD}.json; arquivos já importados são ignorados"""
+        if not diretorio or not os.path.isdir(diretorio):
+            return 0
+
+        importados = 0
+        for arquivo in sorted(Path(diretorio).glob("*.json")):
+            try:
+                with open(arquivo, "r", encoding="utf-8") as f:
+                    dados = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Não foi possível importar {arquivo}: {e}")
+                continue
+
+            plataforma = dados.get("platform") or arquivo.stem.split("_")[0]
+            coletado_em = dados.get("timestamp") or \
+                datetime.fromtimestamp(arquivo.stat().st_mtime).isoformat()
+            if self._inserir_coleta(conexao, plataforma, dados.get("trends", []),
+                                    coletado_em, origem=arquivo.name):
+                importados += 1
+
+        if importados:
+            logger.info(f"{importados} arquivos de tendências importados de {diretorio}")
+        return importados
+
+    def importar_diretorio(self, diretorio: str) -> int:
+        """Importa um diretório de JSON diários (pode ser repetido sem duplicar)"""
+        with self._conexao() as conexao:
+            return self._importar_diretorio(conexao, diretorio)
+
+    def salvar_coleta(self, plataforma: str, tendencias: List[Dict],
+                      coletado_em: Optional[datetime] = None) -> int:
+        """Grava uma coleta inteira de uma plataforma em uma única transação e retorna seu ID"""
+        momento = (coletado_em or datetime.now()).isoformat()
+        with self._conexao() as conexao:
+            return self._inserir_coleta(conexao, plataforma, tendencias, momento)
+
+    def _para_dict(self, titulo, likes, views, tags, extras) -> Dict:
+        """Remonta a tendência no formato original dos crawlers"""
+        tendencia = json.loads(extras) if extras else {}
+        if titulo is not None:
+            tendencia["titulo"] = titulo
+        if likes is not None:
+            tendencia["likes"] = likes
+        if views is not None:
+            tendencia["views"] = views
+        if tags:
+            tendencia["tags"] = json.loads(tags)
+        return tendencia
+
+    def ultima_coleta(self, plataforma: str) -> Tuple[Optional[datetime], List[Dict]]:
+        """Horário e tendências da coleta mais recente da plataforma ((None, []) se não houver)"""
+        with self._conexao() as conexao:
+            coleta = conexao.execute(
+                "SELECT id, coletado_em FROM coletas WHERE plataforma = ? ORDER BY coletado_em DESC, id DESC LIMIT 1",
+                (plataforma,)
+            ).fetchone()
+            if not coleta:
+                return None, []
+            linhas = conexao.execute(
+                "SELECT titulo, likes, views, tags, extras FROM tendencias WHERE coleta_id = ? ORDER BY posicao",
+                (coleta[0],)
+            ).fetchall()
+        return datetime.fromisoformat(coleta[1]), [self._para_dict(*linha) for linha in linhas]
+
+    def ultimas_coletas(self) -> Dict[str, List[Dict]]:
+        """Tendências da coleta mais recente de cada plataforma"""
+        with self._conexao() as conexao:
+            linhas = conexao.execute("""
+                SELECT t.plataforma, t.titulo, t.likes, t.views, t.tags, t.extras
+                FROM tendencias t
+                JOIN (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY plataforma ORDER BY coletado_em DESC, id DESC
+                    ) AS ordem
+                    FROM coletas
+                ) ultima ON ultima.id = t.coleta_id AND ultima.ordem = 1
+                ORDER BY t.plataforma, t.posicao
+            """).fetchall()
+
+        por_plataforma = {}
+        for plataforma, *campos in linhas:
+            por_plataforma.setdefault(plataforma, []).append(self._para_dict(*campos))
+        return por_plataforma
+
+    def buscar(self, plataformas: Optional[Iterable[str]] = None, inicio: Optional[datetime] = None,
+               fim: Optional[datetime] = None, limite: Optional[int] = None) -> List[Dict]:
+        """
+        Tendências coletadas em um período, da mais recente para a mais antiga
+
+        Args:
+            plataformas: Plataformas a incluir (None = todas)
+            inicio: Início do período (inclusivo)
+            fim: Fim do período (exclusivo)
+            limite: Quantidade máxima de linhas
+
+        Returns:
+            Tendências com as colunas `plataforma` e `coletado_em` incluídas
+        """
+        condicoes = []
+        parametros = []
+        if plataformas:
+            plataformas = list(plataformas)
+            condicoes.append(f"plataforma IN ({', '.join('?' * len(plataformas))})")
+            parametros.extend(plataformas)
+        if inicio:
+            condicoes.append("coletado_em >= ?")
+            parametros.append(inicio.isoformat())
+        if fim:
+            condicoes.append("coletado_em < ?")
+            parametros.append(fim.isoformat())
+
+        sql = "SELECT plataforma, coletado_em, titulo, likes, views, tags, extras FROM tendencias"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY coletado_em DESC, posicao"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+
+        with self._conexao() as conexao:
+            linhas = conexao.execute(sql, parametros).fetchall()
+
+        resultado = []
+        for plataforma, coletado_em, *campos in linhas:
+            tendencia = self._para_dict(*campos)
+            tendencia["plataforma"] = plataforma
+            tendencia["coletado_em"] = coletado_em
+            resultado.append(tendencia)
+        return resultado
+
+    def engajamento_diario(self, dias: int = 7, plataformas: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Resumos diários de engajamento dos últimos `dias` (janela móvel até hoje)
+
+        Lê só a tabela de resumos (uma linha por dia e plataforma), sem varrer as tendências.
+
+        Args:
+            dias: Tamanho da janela (7, 30, 90...)
+            plataformas: Plataformas a incluir (None = todas, cada uma em sua linha;
+                [PLATAFORMA_TODAS] = uma linha por dia com todas as amostras juntas)
+
+        Returns:
+            Linhas {dia, plataforma, amostras, media, p50, p90} em ordem de dia
+        """
+        inicio = date.today() - timedelta(days=max(1, int(dias)) - 1)
+        sql = "SELECT dia, plataforma, amostras, media, p50, p90 FROM engajamento_diario WHERE dia >= ?"
+        parametros = [inicio.isoformat()]
+        if plataformas:
+            plataformas = list(plataformas)
+            sql += f" AND plataforma IN ({', '.join('?' * len(plataformas))})"
+            parametros.extend(plataformas)
+        else:
+            sql += " AND plataforma != ?"
+            parametros.append(PLATAFORMA_TODAS)
+
+        with self._conexao() as conexao:
+            linhas = conexao.execute(sql + " ORDER BY dia, plataforma", parametros).fetchall()
+
+        colunas = ("dia", "plataforma", "amostras", "media", "p50", "p90")
+        return [dict(zip(colunas, linha)) for linha in linhas]
+
+    def ultima_atualizacao(self, plataforma: Optional[str] = None) -> Optional[datetime]:
+        """Horário da coleta mais recente (de uma plataforma ou de todas)"""
+        sql = "SELECT MAX(coletado_em) FROM coletas"
+        parametros = []
+        if plataforma:
+            sql += " WHERE plataforma = ?"
+            parametros.append(plataforma)
+
+        with self._conexao() as conexao:
+            valor = conexao.execute(sql, parametros).fetchone()[0]
+        return datetime.fromisoformat(valor) if valor else None
+
+    def revisao(self) -> Tuple[int, int]:
+        """Muda sempre que uma coleta é incluída ou removida (para invalidar caches)"""
+        with self._conexao() as conexao:
+            return tuple(conexao.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM coletas").fetchone())
+
+
+# Uma instância por arquivo, compartilhada entre sessões do Streamlit e o agendador
+_stores: Dict[str, TendenciasStore] = {}
+_trava_stores = threading.Lock()
+
+
+def tendencias_store_para(caminho: str = TENDENCIAS_DB,
+                          json_legado: Optional[str] = TENDENCIAS_JSON_LEGADO) -> TendenciasStore:
+    """Retorna a instância compartilhada do banco em `caminho`"""
+    chave = os.path.abspath(caminho)
+    with _trava_stores:
+        if chave not in _stores:
+            _stores[chave] = TendenciasStore(caminho, json_legado)
+        return _stores[chave]
+
+
+# Instância global (compartilhada entre sessões do Streamlit)
+tendencias_store = tendencias_store_para()
+
+
+def main():
+    """Migra os JSON diários de tendências para o banco"""
+    parser = argparse.ArgumentParser(description="Migra data/tendencias/*.json para o banco SQLite")
+    parser.add_argument("--importar", default=TENDENCIAS_JSON_LEGADO, help="Diretório com os JSON diários")
+    parser.add_argument("--banco", default=TENDENCIAS_DB, help="Arquivo SQLite de destino")
+    parser.add_argument("--remover", action="store_true", help="Apaga os JSON após importar")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # json_legado=None: a importação explícita abaixo é a única
+    store = TendenciasStore(args.banco, json_legado=None)
+    importados = store.importar_diretorio(args.importar)
+    print(f"✅ {importados} arquivos novos importados para {args.banco}")
+
+    if args.remover:
+        with store._conexao() as conexao:
+            origens = {origem for (origem,) in conexao.execute(
+                "SELECT origem FROM coletas WHERE origem IS NOT NULL")}
+        removidos = 0
+        for arquivo in Path(args.importar).glob("*.json"):
+            if arquivo.name in origens:
+                arquivo.unlink()
+                removidos += 1
+        print(f"🗑️ {removidos} arquivos JSON removidos")
+
+
+if __name__ == "__main__":
+    main()
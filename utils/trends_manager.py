@@ -1,53 +1,55 @@
 """
 Gerenciador de Tendências - Sistema de Cache e Fallback
 Otimizado para performance e experiência do usuário
+As coletas ficam no banco de tendências (utils/tendencias_store)
 """
-import json
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 import logging
 from pathlib import Path
+from utils.tendencias_store import TENDENCIAS_JSON_LEGADO, tendencias_store_para
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tempo limite de cada plataforma na coleta paralela (segundos)
+TIMEOUT_COLETA_PLATAFORMA = float(os.getenv("TRENDS_TIMEOUT_PLATAFORMA", "120"))
+
 class TrendsManager:
-    def __init__(self, data_dir: str = "data/tendencias"):
-        self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, data_dir: Optional[str] = None):
+        if data_dir is None:
+            # Banco padrão (TENDENCIAS_DB), o mesmo usado pelo importador e pelo painel
+            self.data_dir = Path(TENDENCIAS_JSON_LEGADO)
+            self.store = tendencias_store_para()
+        else:
+            # data_dir -> data_dir.db (os JSON antigos são importados na primeira abertura)
+            self.data_dir = Path(data_dir)
+            self.store = tendencias_store_para(f"{self.data_dir}.db", json_legado=str(self.data_dir))
         self.cache_duration = 24  # horas
-    
-    def get_cache_file(self, platform: str) -> Path:
-        """Retorna o caminho do arquivo de cache para a plataforma"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        return self.data_dir / f"{platform}_{today}.json"
+        self.platform_timeouts = {}  # plataforma -> segundos (padrão: TIMEOUT_COLETA_PLATAFORMA)
+        self.last_collection_stats = {}
     
     def is_cache_valid(self, platform: str) -> bool:
         """Verifica se o cache é válido (menos de 24h)"""
-        cache_file = self.get_cache_file(platform)
+        last_update = self.store.ultima_atualizacao(platform)
         
-        if not cache_file.exists():
+        if last_update is None:
             return False
         
-        # Verifica idade do arquivo
-        file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-        age_hours = (datetime.now() - file_time).total_seconds() / 3600
+        # Verifica idade da última coleta
+        age_hours = (datetime.now() - last_update).total_seconds() / 3600
         
         return age_hours < self.cache_duration
     
     def save_trends(self, platform: str, trends: List[Dict]) -> bool:
         """Salva tendências no cache"""
         try:
-            cache_file = self.get_cache_file(platform)
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'platform': platform,
-                    'timestamp': datetime.now().isoformat(),
-                    'trends': trends
-                }, f, ensure_ascii=False, indent=2)
+            self.store.salvar_coleta(platform, trends)
             
             logger.info(f"Cache salvo para {platform}: {len(trends)} tendências")
             return True
@@ -57,21 +59,25 @@ class TrendsManager:
             return False
     
     def load_trends(self, platform: str) -> List[Dict]:
-        """Carrega tendências do cache"""
+        """Carrega tendências do cache (coleta mais recente da plataforma)"""
         try:
-            cache_file = self.get_cache_file(platform)
-            
-            if not cache_file.exists():
-                return []
-            
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('trends', [])
+            _, trends = self.store.ultima_coleta(platform)
+            return trends
                 
         except Exception as e:
             logger.error(f"Erro ao carregar cache para {platform}: {e}")
             return []
     
+    def load_trends_history(self, platforms: Optional[List[str]] = None,
+                            start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> List[Dict]:
+        """Tendências coletadas em um período (consulta indexada por plataforma/data)"""
+        try:
+            return self.store.buscar(platforms, start, end)
+        except Exception as e:
+            logger.error(f"Erro ao consultar histórico de tendências: {e}")
+            return []
+    
     def get_fallback_content(self) -> Dict[str, List[Dict]]:
         """Retorna conteúdo de fallback estético"""
         return {
@@ -149,7 +155,6 @@ class TrendsManager:
                 **self.get_fallback_content()
             }
         
-        all_trends = {}
         platforms = {
             'twitter': TwitterCrawler(),
             'tiktok': TikTokCrawler(),
@@ -157,26 +162,9 @@ class TrendsManager:
             'instagram': InstagramCrawler()
         }
         
-        # Coleta ou carrega do cache
-        for platform_name, crawler in platforms.items():
-            if self.is_cache_valid(platform_name):
-                # Usa cache válido
-                trends = self.load_trends(platform_name)
-                logger.info(f"Usando cache para {platform_name}: {len(trends)} tendências")
-            else:
-                # Coleta novos dados
-                try:
-                    trends = crawler.collect_all()
-                    if trends:
-                        self.save_trends(platform_name, trends)
-                    else:
-                        # Se falhou, tenta carregar cache antigo
-                        trends = self.load_trends(platform_name)
-                except Exception as e:
-                    logger.error(f"Erro ao coletar {platform_name}: {e}")
-                    trends = self.load_trends(platform_name)
-            
-            all_trends[platform_name] = trends
+        # Coleta todas as plataformas ao mesmo tempo, cada uma com seu tempo limite
+        all_trends, stats = self._collect_platforms_parallel(platforms)
+        self.last_collection_stats = stats
         
         # Verifica se tem dados suficientes
         total_trends = sum(len(trends) for trends in all_trends.values())
@@ -188,18 +176,108 @@ class TrendsManager:
         else:
             all_trends['fallback_active'] = False
         
+        # Duração e origem dos dados de cada plataforma (não é lista, então é ignorado por quem lê as tendências)
+        all_trends['platform_stats'] = stats
+        
         return all_trends
     
+    def _collect_platform(self, platform_name: str, crawler, cancelled: threading.Event) -> Dict:
+        """Coleta uma plataforma (cache válido, crawler ou cache antigo) e mede o tempo"""
+        start = time.monotonic()
+        
+        if self.is_cache_valid(platform_name):
+            # Usa cache válido
+            trends = self.load_trends(platform_name)
+            source = 'cache'
+            logger.info(f"Usando cache para {platform_name}: {len(trends)} tendências")
+        else:
+            # Coleta novos dados
+            try:
+                trends = crawler.collect_all()
+                source = 'crawler'
+                if cancelled.is_set():
+                    # Excedeu o tempo limite: o resultado tardio é descartado
+                    return {'trends': [], 'source': 'cancelled', 'duration': time.monotonic() - start}
+                if trends:
+                    self.save_trends(platform_name, trends)
+                else:
+                    # Se falhou, tenta carregar cache antigo
+                    trends = self.load_trends(platform_name)
+                    source = 'old_cache'
+            except Exception as e:
+                logger.error(f"Erro ao coletar {platform_name}: {e}")
+                trends = self.load_trends(platform_name)
+                source = 'old_cache'
+        
+        return {'trends': trends, 'source': source, 'duration': time.monotonic() - start}
+    
+    def _collect_platforms_parallel(self, platforms: Dict) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict]]:
+        """
+        Executa os crawlers em paralelo com tempo limite por plataforma
+        
+        Plataformas que excedem o tempo limite usam o cache antigo; o crawler
+        ainda em andamento é abandonado e seu resultado não é salvo.
+        
+        Returns:
+            (tendências por plataforma, {plataforma: {duration, source, count}})
+        """
+        all_trends = {}
+        stats = {}
+        cancelled = {name: threading.Event() for name in platforms}
+        start = time.monotonic()
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, len(platforms)), thread_name_prefix="tendencias")
+        try:
+            pending = {
+                executor.submit(self._collect_platform, name, crawler, cancelled[name]): name
+                for name, crawler in platforms.items()
+            }
+            deadlines = {
+                name: start + self.platform_timeouts.get(name, TIMEOUT_COLETA_PLATAFORMA)
+                for name in platforms
+            }
+            
+            while pending:
+                next_deadline = min(deadlines[name] for name in pending.values())
+                done, _ = wait(list(pending), timeout=max(0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Erro ao coletar {name}: {e}")
+                        result = {'trends': self.load_trends(name), 'source': 'old_cache',
+                                  'duration': time.monotonic() - start}
+                    all_trends[name] = result['trends']
+                    stats[name] = {'duration': round(result['duration'], 2), 'source': result['source'],
+                                   'count': len(result['trends'])}
+                
+                # Plataformas que excederam o tempo limite usam o cache antigo
+                now = time.monotonic()
+                for future, name in list(pending.items()):
+                    if now >= deadlines[name]:
+                        pending.pop(future)
+                        cancelled[name].set()
+                        future.cancel()
+                        trends = self.load_trends(name)
+                        logger.warning(f"Coleta de {name} excedeu o tempo limite; usando cache antigo")
+                        all_trends[name] = trends
+                        stats[name] = {'duration': round(now - start, 2), 'source': 'timeout',
+                                       'count': len(trends)}
+        finally:
+            # Não espera crawlers abandonados por tempo limite
+            executor.shutdown(wait=False)
+        
+        # Mantém a ordem original das plataformas
+        ordered = {name: all_trends[name] for name in platforms}
+        return ordered, {name: stats[name] for name in platforms}
+    
     def get_last_update_time(self) -> Optional[datetime]:
         """Retorna o horário da última atualização"""
         try:
-            cache_files = list(self.data_dir.glob("*_*.json"))
-            if not cache_files:
-                return None
-            
-            # Pega o arquivo mais recente
-            latest_file = max(cache_files, key=lambda f: f.stat().st_mtime)
-            return datetime.fromtimestamp(latest_file.stat().st_mtime)
+            return self.store.ultima_atualizacao()
             
         except Exception as e:
             logger.error(f"Erro ao obter última atualização: {e}")